@@ -0,0 +1,54 @@
+"""
+bench_config.py
+
+Cost of loading scope.yaml: parsing the YAML and compiling a snapshot
+(cold start or after an edit) next to reusing the JSON snapshot (unchanged
+file), and the per-call cost of checking for edits once it is loaded.
+
+Usage: python -m benchmarks.bench_config [--number N]
+"""
+import argparse
+import shutil
+import tempfile
+import timeit
+from pathlib import Path
+
+from bot_engine.config import ConfigStore, load_snapshot
+
+CONFIG_PATH = Path(__file__).resolve().parents[1] / "governance" / "config" / "scope.yaml"
+
+
+def run(number: int = 200) -> list[dict]:
+    rows = []
+    with tempfile.TemporaryDirectory() as tmp:
+        scope = Path(tmp) / "scope.yaml"
+        shutil.copy(CONFIG_PATH, scope)
+        cache = Path(tmp) / "scope.snapshot.json"
+
+        cold = min(timeit.repeat(lambda: load_snapshot(scope), number=number, repeat=3))
+        load_snapshot(scope, cache)
+        warm = min(timeit.repeat(lambda: load_snapshot(scope, cache), number=number, repeat=3))
+        rows.append({"name": "YAML parse + compile", "us": cold / number * 1e6})
+        rows.append({"name": "JSON snapshot + compile", "us": warm / number * 1e6})
+
+        store = ConfigStore(scope, cache, check_interval=2.0)
+        calls = number * 1000
+        hot = min(timeit.repeat(store.current, number=calls, repeat=3))
+        rows.append({"name": "current() between checks", "us": hot / calls * 1e6})
+        store.check_interval = 0
+        checked = min(timeit.repeat(store.current, number=number, repeat=3))
+        rows.append({"name": "current() with stat check", "us": checked / number * 1e6})
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Configuration load micro-benchmark")
+    parser.add_argument("--number", type=int, default=200, help="Loops per timing")
+    args = parser.parse_args()
+
+    for row in run(args.number):
+        print(f"{row['name']:28s} {row['us']:10.2f} us")
+
+
+if __name__ == "__main__":
+    main()
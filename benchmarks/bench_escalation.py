@@ -0,0 +1,99 @@
+"""
+bench_escalation.py
+
+Evaluations per second of the escalation rules from scope.yaml: the
+generated routing function, called per result and over a batch, next to a
+walk over one predicate closure per rule (the straightforward interpreter).
+Results are a mix that exercises every rule.
+
+Usage: python -m benchmarks.bench_escalation [--results N]
+"""
+import argparse
+import operator
+import random
+import time
+from pathlib import Path
+
+from bot_engine.config import load_snapshot
+from bot_engine.escalation import PHRASES, EscalationPolicy
+
+CONFIG_PATH = Path(__file__).resolve().parents[1] / "governance" / "config" / "scope.yaml"
+
+OPS = {"==": operator.eq, "!=": operator.ne, "<": operator.lt, "<=": operator.le,
+       ">": operator.gt, ">=": operator.ge}
+
+
+def closure_table(policy: EscalationPolicy) -> list:
+    """One predicate closure per rule, walked in order: the baseline."""
+    table = []
+    for rule in policy.rules:
+        condition = rule.condition
+        if condition is None:
+            predicate = lambda result: True
+        elif condition.lower() in PHRASES:
+            predicate = lambda result: result.get("degraded") or (
+                result.get("ticket_type") == "unknown" and not result.get("confidence_score")
+                and result.get("decision_stage") != "empty")
+        elif " " not in condition:
+            predicate = lambda result, field=condition: bool(result.get(field))
+        else:
+            field, op, value = condition.split(" ", 2)
+            value = float(value) if value.replace(".", "", 1).isdigit() else value
+            predicate = lambda result, field=field, op=OPS[op], value=value: op(result.get(field), value)
+        table.append((predicate, rule.target))
+    return table
+
+
+def walk(table: list, result: dict):
+    for predicate, target in table:
+        if predicate(result):
+            return target
+    return None
+
+
+def make_results(count: int) -> list[dict]:
+    rng = random.Random(3)
+    types = ["billing_question", "password_reset", "compliance_flag", "unknown"]
+    return [{
+        "ticket_type": rng.choice(types),
+        "confidence_score": round(rng.random(), 2),
+        "contains_pii": rng.random() < 0.1,
+        "decision_stage": "llm",
+    } for _ in range(count)]
+
+
+def _rate(func, count: int) -> float:
+    best = float("inf")
+    for _ in range(3):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return count / best
+
+
+def run(count: int = 200000) -> list[dict]:
+    policy = load_snapshot(CONFIG_PATH)[0].escalation
+    results = make_results(count)
+    table = closure_table(policy)
+    assert [walk(table, r) for r in results[:1000]] == policy.route_many(results[:1000])
+
+    route = policy.route
+    return [
+        {"name": "closure walk (per rule)", "per_second": _rate(lambda: [walk(table, r) for r in results], count)},
+        {"name": "compiled route()", "per_second": _rate(lambda: [route(r) for r in results], count)},
+        {"name": "compiled route_many()", "per_second": _rate(lambda: policy.route_many(results), count)},
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Escalation rule evaluation micro-benchmark")
+    parser.add_argument("--results", type=int, default=200000, help="Results per timing")
+    args = parser.parse_args()
+
+    for row in run(args.results):
+        print(f"{row['name']:26s} {row['per_second'] / 1e6:8.2f} M evaluations/s "
+              f"({1e9 / row['per_second']:6.0f} ns each)")
+
+
+if __name__ == "__main__":
+    main()
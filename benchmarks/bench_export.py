@@ -0,0 +1,94 @@
+"""
+bench_export.py
+
+Benchmark for fallback_viewer exports: CSV through csv.DictWriter against
+the columnar `.fbc` format, for writing and for reloading the typed columns
+(timestamp, category, confidence, PII flag) the way an analytics notebook
+would.
+
+Usage: python -m benchmarks.bench_export [--entries N]
+"""
+import argparse
+import csv
+import random
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+from tools.fallback_columnar import ColumnarReader, ColumnarWriter, timestamp_micros
+from tools.fallback_viewer import CsvExporter
+
+CATEGORIES = ["billing_question", "software_issue", "access_request", "hardware_issue", "unknown"]
+
+
+def make_entries(count: int, seed: int = 13) -> list[dict]:
+    rng = random.Random(seed)
+    start = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    return [
+        {
+            "ticket": f"Ticket {i}: " + "VPN drops every few minutes since Monday " * rng.randint(1, 4),
+            "result": {
+                "ticket_type": rng.choice(CATEGORIES),
+                "confidence_score": round(rng.random() * 0.6, 2),
+                "contains_pii": rng.random() < 0.1,
+            },
+            "timestamp": (start + timedelta(seconds=i * 7)).isoformat(),
+        }
+        for i in range(count)
+    ]
+
+
+def load_csv_columns(path: Path) -> dict:
+    columns = {"timestamp": [], "ticket_type": [], "confidence_score": [], "contains_pii": []}
+    with path.open(newline="", encoding="utf-8") as f:
+        for row in csv.DictReader(f):
+            columns["timestamp"].append(timestamp_micros(row["timestamp"]))
+            columns["ticket_type"].append(row["ticket_type"])
+            columns["confidence_score"].append(float(row["confidence_score"]))
+            columns["contains_pii"].append(row["contains_pii"] == "True")
+    return columns
+
+
+def timed(func):
+    started = time.perf_counter()
+    func()
+    return (time.perf_counter() - started) * 1000
+
+
+def export(exporter, entries):
+    with exporter:
+        for entry in entries:
+            exporter.write(entry)
+
+
+def run(entries: int = 200_000) -> list[dict]:
+    data = make_entries(entries)
+    rows = []
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_path = Path(tmp) / "export.csv"
+        fbc_path = Path(tmp) / "export.fbc"
+        rows.append({"name": "write csv", "ms": timed(lambda: export(CsvExporter(csv_path), data))})
+        rows.append({"name": "write fbc", "ms": timed(lambda: export(ColumnarWriter(fbc_path), data))})
+        rows.append({"name": "reload typed columns from csv", "ms": timed(lambda: load_csv_columns(csv_path))})
+        rows.append({"name": "reload typed columns from fbc",
+                     "ms": timed(lambda: ColumnarReader(fbc_path).read_columns())})
+        for path in (csv_path, fbc_path):
+            rows.append({"name": f"{path.suffix[1:]} size", "mb": path.stat().st_size / 1e6})
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fallback export format benchmark")
+    parser.add_argument("--entries", type=int, default=200_000, help="Entries to export")
+    args = parser.parse_args()
+
+    for row in run(args.entries):
+        if "ms" in row:
+            print(f"{row['name']:40s} {row['ms']:10.1f} ms")
+        else:
+            print(f"{row['name']:40s} {row['mb']:10.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
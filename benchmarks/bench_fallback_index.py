@@ -0,0 +1,93 @@
+"""
+bench_fallback_index.py
+
+Benchmark for `--date-range 1` on a large fallback log: the streaming scan
+against the sidecar index, plus the cost of building the index and of an
+incremental update after new lines are appended.
+
+Usage: python -m benchmarks.bench_fallback_index [--entries N] [--days D]
+"""
+import argparse
+import json
+import random
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+from tools.fallback_index import FallbackIndex
+from tools.fallback_viewer import FallbackLogStream, category_filter, date_range_filter
+
+CATEGORIES = ["billing_question", "software_issue", "access_request", "hardware_issue", "unknown"]
+
+
+def write_log(path: Path, entries: int, days: int, now: datetime, seed: int = 11):
+    rng = random.Random(seed)
+    start = now - timedelta(days=days)
+    step = timedelta(days=days) / entries
+    with path.open("w") as f:
+        for i in range(entries):
+            entry = {
+                "ticket": f"Ticket {i}: " + "printer offline again after the update " * rng.randint(1, 4),
+                "result": {
+                    "ticket_type": rng.choice(CATEGORIES),
+                    "confidence_score": round(rng.random() * 0.6, 2),
+                    "contains_pii": rng.random() < 0.1,
+                    "model": "gemini-2.5-flash",
+                },
+                "prompt_version": "3f2a9c1b7d44",
+                "timestamp": (start + step * i).isoformat(),
+            }
+            f.write(json.dumps(entry) + "\n")
+
+
+def timed(func):
+    started = time.perf_counter()
+    value = func()
+    return value, (time.perf_counter() - started) * 1000
+
+
+def run(entries: int = 300_000, days: int = 365) -> list[dict]:
+    now = datetime.now(timezone.utc)
+    rows = []
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "fallback_log.jsonl"
+        write_log(path, entries, days, now)
+        size_mb = path.stat().st_size / 1e6
+
+        index = FallbackIndex(path)
+        _, build_ms = timed(index.update)
+        rows.append({"name": f"build index ({entries} entries, {size_mb:.0f} MB)", "ms": build_ms})
+
+        with path.open("a") as f:
+            f.write(path.read_text().splitlines(keepends=True)[-1] * 100)
+        _, update_ms = timed(FallbackIndex(path).update)
+        rows.append({"name": "incremental update (+100 entries)", "ms": update_ms})
+
+        for label, make_filters in (
+            ("--date-range 1", lambda: [date_range_filter(1, now=now)]),
+            ("--date-range 1 --category billing_question",
+             lambda: [date_range_filter(1, now=now), category_filter("billing_question")]),
+        ):
+            scanned, scan_ms = timed(lambda: sum(1 for _ in FallbackLogStream(path, make_filters())))
+            indexed, index_ms = timed(
+                lambda: sum(1 for _ in FallbackLogStream(path, make_filters(), index=FallbackIndex(path)))
+            )
+            assert scanned == indexed
+            rows.append({"name": f"{label}: full scan ({scanned} matches)", "ms": scan_ms})
+            rows.append({"name": f"{label}: indexed", "ms": index_ms})
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fallback log index benchmark")
+    parser.add_argument("--entries", type=int, default=300_000, help="Log entries to generate")
+    parser.add_argument("--days", type=int, default=365, help="Days of history the log spans")
+    args = parser.parse_args()
+
+    for row in run(args.entries, args.days):
+        print(f"{row['name']:66s} {row['ms']:10.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""
+bench_import.py
+
+Startup cost of the bot_engine entry points, measured in fresh interpreters
+with `python -X importtime`, and the heavy modules each one pulls in. The
+Gemini SDK, .env loading and the client are deferred to the first LLM call,
+so none of them should appear. Exits with status 1 when a module goes over
+its budget or loads a deferred module, so it can gate CI.
+
+Usage: python -m benchmarks.bench_import [--repeat N] [--scale X]
+"""
+import argparse
+import re
+import subprocess
+import sys
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+
+# Median cumulative import time allowed, in milliseconds (before --scale)
+BUDGETS_MS = {
+    "bot_engine": 15,
+    "bot_engine.router": 200,
+    "bot_engine.serve": 250,
+    "bot_engine.bulk": 250,
+}
+
+DEFERRED = ("google.genai", "dotenv", "httpx", "pydantic")
+
+IMPORTTIME_LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|(\s*)(\S+)")
+
+
+def measure(module: str) -> tuple[float, set[str]]:
+    """Cumulative import time of `module` in milliseconds and every module it loaded."""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=PROJECT_ROOT, capture_output=True, text=True, check=True,
+    )
+    total_us, loaded = 0, set()
+    for line in proc.stderr.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if not match:
+            continue
+        loaded.add(match.group(4))
+        if match.group(4) == module:
+            total_us = int(match.group(2))
+    return total_us / 1000, loaded
+
+
+def run(repeat: int = 5, scale: float = 1.0) -> list[dict]:
+    rows = []
+    for module, budget in BUDGETS_MS.items():
+        samples, loaded = [], set()
+        for _ in range(repeat):
+            ms, loaded = measure(module)
+            samples.append(ms)
+        samples.sort()
+        rows.append({
+            "module": module,
+            "ms": samples[len(samples) // 2],
+            "budget_ms": budget * scale,
+            "deferred_loaded": [name for name in DEFERRED if name in loaded],
+        })
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Import-time budget check")
+    parser.add_argument("--repeat", type=int, default=5, help="Fresh interpreters per module (median is used)")
+    parser.add_argument("--scale", type=float, default=1.0, help="Multiply every budget, for slower machines")
+    args = parser.parse_args()
+
+    failed = False
+    for row in run(args.repeat, args.scale):
+        over = row["ms"] > row["budget_ms"]
+        status = "OVER BUDGET" if over else "ok"
+        if row["deferred_loaded"]:
+            status = f"loads {', '.join(row['deferred_loaded'])}"
+        failed = failed or over or bool(row["deferred_loaded"])
+        print(f"{row['module']:20s} {row['ms']:8.1f} ms   budget {row['budget_ms']:6.0f} ms   {status}")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
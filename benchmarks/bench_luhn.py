@@ -0,0 +1,56 @@
+"""
+bench_luhn.py
+
+Micro-benchmark for card validation: the table-driven `luhn_valid` against
+the list-building `_luhn_check` reference, plus a full scan of a ticket full of
+card-shaped order IDs (every candidate is validated).
+
+Usage: python -m benchmarks.bench_luhn [--number N]
+"""
+import argparse
+import random
+import timeit
+
+from risk_controls.pii_filters import _luhn_check, find_pii, luhn_valid
+
+
+def make_candidates(count: int, seed: int = 3) -> list[str]:
+    rng = random.Random(seed)
+    candidates = []
+    for _ in range(count):
+        digits = "".join(rng.choice("0123456789") for _ in range(rng.choice((13, 15, 16, 19))))
+        if rng.random() < 0.5:
+            digits = " ".join(digits[i:i + 4] for i in range(0, len(digits), 4))
+        candidates.append(digits)
+    return candidates
+
+
+def run(number: int = 20) -> list[dict]:
+    candidates = make_candidates(10_000)
+    assert [luhn_valid(c) for c in candidates] == [_luhn_check(c) for c in candidates]
+
+    rows = []
+    for name, func in (("_luhn_check", _luhn_check), ("luhn_valid", luhn_valid)):
+        seconds = min(timeit.repeat(lambda: [func(c) for c in candidates], number=number, repeat=3))
+        rows.append({"name": name, "ns_per_candidate": seconds / number / len(candidates) * 1e9})
+
+    ticket = " ".join(f"order {c} shipped," for c in make_candidates(200, seed=4) if not _luhn_check(c))
+    seconds = min(timeit.repeat(lambda: find_pii(ticket), number=number, repeat=3))
+    rows.append({"name": "find_pii (ticket of ~180 failing card candidates)", "us_per_ticket": seconds / number * 1e6})
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Luhn validation micro-benchmark")
+    parser.add_argument("--number", type=int, default=20, help="Loops per timing")
+    args = parser.parse_args()
+
+    for row in run(args.number):
+        if "ns_per_candidate" in row:
+            print(f"{row['name']:50s} {row['ns_per_candidate']:10.1f} ns/candidate")
+        else:
+            print(f"{row['name']:50s} {row['us_per_ticket']:10.1f} us/ticket")
+
+
+if __name__ == "__main__":
+    main()
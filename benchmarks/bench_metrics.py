@@ -0,0 +1,97 @@
+"""
+bench_metrics.py
+
+Per-call overhead of timing a function: the previous latency_tracker
+(time.time() and one JSONL event per call through the audit log writer)
+next to the metrics registry (perf_counter_ns into a histogram), both as
+the track_latency decorator and as the inline timer the router uses.
+Overheads are the timed call minus an untimed call of the same function.
+
+Usage: python -m benchmarks.bench_metrics [--number N]
+"""
+import argparse
+import tempfile
+import time
+import timeit
+from functools import wraps
+from pathlib import Path
+
+from bot_engine.metrics import MetricsRegistry
+from governance.audit_log import AuditLogWriter
+from scripts.performance.latency_tracker import track_latency
+
+
+def work():
+    return None
+
+
+def per_line_tracker(writer: AuditLogWriter, path: Path, name: str, warn_ms: int = 500, error_ms: int = 2000):
+    """The previous track_latency: wall clock in ms and one log event per call."""
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            start = time.time()
+            try:
+                result = func(*args, **kwargs)
+                status = "ok"
+                return result
+            finally:
+                elapsed_ms = int((time.time() - start) * 1000)
+                if elapsed_ms >= error_ms:
+                    status = "error"
+                elif elapsed_ms >= warn_ms:
+                    status = "warn"
+                writer.write(path, {
+                    "timestamp": time.strftime("%Y-%m-%d %H:%M:%S"),
+                    "component": name,
+                    "metric": "latency_ms",
+                    "value": elapsed_ms,
+                    "status": status,
+                    "thresholds": {"warn_ms": warn_ms, "error_ms": error_ms},
+                })
+        return wrapper
+    return decorator
+
+
+def _ns(func, number: int) -> float:
+    return min(timeit.repeat(func, number=number, repeat=5)) / number * 1e9
+
+
+def run(number: int = 200000) -> list[dict]:
+    registry = MetricsRegistry()
+    histogram = registry.histogram("bench_seconds", stage="work")
+    perf_counter_ns = time.perf_counter_ns
+
+    def inline():
+        start = perf_counter_ns()
+        work()
+        histogram.observe_ns(perf_counter_ns() - start)
+
+    def context():
+        with histogram.time():
+            work()
+
+    baseline = _ns(work, number)
+    rows = []
+    with tempfile.TemporaryDirectory() as tmp:
+        writer = AuditLogWriter(queue_size=number * 6)
+        old = per_line_tracker(writer, Path(tmp) / "pipeline_health.txt", "work")(work)
+        rows.append({"name": "per-call JSONL event (previous)", "ns": _ns(old, number // 4) - baseline})
+        writer.close()
+    rows.append({"name": "track_latency (registry)", "ns": _ns(track_latency("work")(work), number) - baseline})
+    rows.append({"name": "inline perf_counter_ns timer", "ns": _ns(inline, number) - baseline})
+    rows.append({"name": "Histogram.time() context", "ns": _ns(context, number) - baseline})
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Metrics overhead micro-benchmark")
+    parser.add_argument("--number", type=int, default=200000, help="Calls per timing")
+    args = parser.parse_args()
+
+    for row in run(args.number):
+        print(f"{row['name']:34s} {row['ns']:10.0f} ns/call overhead")
+
+
+if __name__ == "__main__":
+    main()
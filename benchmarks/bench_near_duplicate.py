@@ -0,0 +1,86 @@
+"""
+bench_near_duplicate.py
+
+Cost of near-duplicate reuse with a full index: signing a ticket, and looking
+it up through the LSH bands next to a linear scan over every stored
+signature. Tickets are random words from a generated vocabulary; the reworded
+queries drop or swap a word of a stored ticket, the fresh ones share nothing.
+
+Usage: python -m benchmarks.bench_near_duplicate [--entries N] [--queries N]
+"""
+import argparse
+import operator
+import random
+import string
+import time
+
+from bot_engine.near_duplicate import NearDuplicateIndex
+
+
+def make_tickets(rng: random.Random, vocabulary: list[str], count: int) -> list[str]:
+    return [" ".join(rng.choice(vocabulary) for _ in range(rng.randint(6, 14))) for _ in range(count)]
+
+
+def reword(rng: random.Random, ticket: str, vocabulary: list[str]) -> str:
+    words = ticket.split()
+    words[rng.randrange(len(words))] = rng.choice(vocabulary)
+    return " ".join(words).upper() + "!!"
+
+
+def linear_lookup(index: NearDuplicateIndex, ticket_text: str):
+    _, signature = index.signature(ticket_text)
+    best, best_similarity = None, index.similarity
+    for source, entry in index._entries.items():
+        similarity = sum(map(operator.eq, signature, entry.signature)) / index.num_perm
+        if similarity >= best_similarity:
+            best, best_similarity = source, similarity
+    return best
+
+
+def run(entries: int = 50000, queries: int = 1000) -> list[dict]:
+    rng = random.Random(7)
+    vocabulary = ["".join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(3, 9)))
+                  for _ in range(3000)]
+    stored = make_tickets(rng, vocabulary, entries)
+    index = NearDuplicateIndex(max_entries=entries)
+    for ticket in stored:
+        index.add(ticket, "access_request", 0.9)
+
+    reworded = [reword(rng, rng.choice(stored), vocabulary) for _ in range(queries // 2)]
+    fresh = make_tickets(rng, vocabulary, queries - len(reworded))
+
+    rows = []
+    start = time.perf_counter()
+    for ticket in reworded + fresh:
+        index.signature(ticket)
+    rows.append({"name": "signature", "us": (time.perf_counter() - start) / queries * 1e6})
+
+    start = time.perf_counter()
+    hits = sum(index.lookup(ticket) is not None for ticket in reworded)
+    misses = sum(index.lookup(ticket) is None for ticket in fresh)
+    rows.append({"name": f"LSH lookup ({entries} entries)", "us": (time.perf_counter() - start) / queries * 1e6,
+                 "reworded_hits": hits / len(reworded), "fresh_misses": misses / len(fresh)})
+
+    sample = (reworded[:10] + fresh[:10])
+    start = time.perf_counter()
+    for ticket in sample:
+        linear_lookup(index, ticket)
+    rows.append({"name": f"linear scan ({entries} entries)", "us": (time.perf_counter() - start) / len(sample) * 1e6})
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Near-duplicate index micro-benchmark")
+    parser.add_argument("--entries", type=int, default=50000, help="Stored tickets")
+    parser.add_argument("--queries", type=int, default=1000, help="Lookups to time")
+    args = parser.parse_args()
+
+    for row in run(args.entries, args.queries):
+        line = f"{row['name']:32s} {row['us']:12.1f} us"
+        if "reworded_hits" in row:
+            line += f"   {row['reworded_hits']:5.0%} reworded found, {row['fresh_misses']:5.0%} fresh missed"
+        print(line)
+
+
+if __name__ == "__main__":
+    main()
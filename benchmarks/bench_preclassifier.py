@@ -0,0 +1,83 @@
+"""
+bench_preclassifier.py
+
+Per-ticket cost of the local pre-classifier: the rules from scope.yaml alone,
+and rules plus a full-size hashed linear model (2^18 features x 7 classes,
+memory-mapped from disk), next to the share of tickets each answers without
+the LLM. The model has random weights, so only its cost is meaningful.
+
+Usage: python -m benchmarks.bench_preclassifier [--number N]
+"""
+import argparse
+import random
+import tempfile
+import timeit
+from array import array
+from pathlib import Path
+
+import yaml
+
+from bot_engine.preclassifier import HashedLinearModel, PreClassifier, RuleSet
+
+CONFIG_PATH = Path(__file__).resolve().parents[1] / "governance" / "config" / "scope.yaml"
+
+TICKETS = [
+    "I forgot my password and cannot log in",
+    "Please resend the invoice for March",
+    "My laptop won't boot after the update",
+    "Need access to the finance shared drive",
+    "Outlook crashes whenever I open an attachment",
+    "The VPN disconnects every few minutes",
+    "Can someone check why I was billed twice?",
+    "Printer is jammed on the third floor",
+    "Teams shows me offline although I am signed in",
+    "Request permission to the HR reporting dashboard",
+]
+
+
+def make_model(path: Path, classes: list[str], bits: int = 18) -> HashedLinearModel:
+    rng = random.Random(5)
+    weights = array("f", (rng.gauss(0.0, 0.5) for _ in range((1 << bits) * len(classes))))
+    HashedLinearModel(classes, weights, [0.0] * len(classes), bits=bits).save(path)
+    return HashedLinearModel.load(path)
+
+
+def run(number: int = 200) -> list[dict]:
+    config = yaml.safe_load(CONFIG_PATH.read_text())
+    ticket_types = config["ticket_types"]
+    rules = RuleSet(config["preclassifier"]["rules"])
+
+    rows = []
+    with tempfile.TemporaryDirectory() as tmp:
+        model_path = Path(tmp) / "preclassifier.bin"
+        model = make_model(model_path, [t for t in ticket_types if t != "unknown"] + ["unknown"])
+        load_seconds = min(timeit.repeat(lambda: HashedLinearModel.load(model_path), number=10, repeat=3)) / 10
+
+        for name, pre in (("rules", PreClassifier(rules)), ("rules + model", PreClassifier(rules, model))):
+            seconds = min(timeit.repeat(lambda: [pre.classify(t, ticket_types) for t in TICKETS],
+                                        number=number, repeat=3))
+            local = sum(pre.classify(t, ticket_types) is not None for t in TICKETS)
+            rows.append({
+                "name": name,
+                "us_per_ticket": seconds / number / len(TICKETS) * 1e6,
+                "local_share": local / len(TICKETS),
+            })
+        rows.append({"name": "model load (8 MB, mmap)", "ms": load_seconds * 1e3})
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pre-classifier micro-benchmark")
+    parser.add_argument("--number", type=int, default=200, help="Loops per timing")
+    args = parser.parse_args()
+
+    for row in run(args.number):
+        if "ms" in row:
+            print(f"{row['name']:30s} {row['ms']:10.2f} ms")
+        else:
+            print(f"{row['name']:30s} {row['us_per_ticket']:10.1f} us/ticket   "
+                  f"{row['local_share']:5.0%} answered locally")
+
+
+if __name__ == "__main__":
+    main()
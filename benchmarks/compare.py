@@ -0,0 +1,116 @@
+"""
+compare.py
+
+Compares two reports written by benchmarks.suite, e.g. from the base branch
+and from a change, benchmark by benchmark. A regression is throughput down
+or p50 latency up by more than `--threshold`, or p95/p99 up by more than
+`--tail-threshold` (tails are noisier). Exits 1 when there is a regression,
+so CI can run the suite on both commits and fail the build.
+
+Reports from different corpus sizes, fault rates or machines are still
+compared, with a warning, since the numbers are not like for like.
+
+Usage: python -m benchmarks.compare BASELINE.json CURRENT.json [--threshold 0.10]
+                                    [--tail-threshold 0.25]
+"""
+import argparse
+import json
+import sys
+from pathlib import Path
+
+from benchmarks.suite import REPORT_FORMAT
+
+# (field, higher is better, uses the tail threshold)
+METRICS = (
+    ("per_second", True, False),
+    ("p50_us", False, False),
+    ("p95_us", False, True),
+    ("p99_us", False, True),
+)
+
+
+def load_report(path: Path) -> dict:
+    try:
+        report = json.loads(Path(path).read_text(encoding="utf-8"))
+    except (OSError, ValueError) as e:
+        raise ValueError(f"Cannot read report {path}: {e}") from e
+    if not isinstance(report, dict) or report.get("format") != REPORT_FORMAT:
+        raise ValueError(f"{path} is not a benchmarks.suite report (format {REPORT_FORMAT})")
+    return report
+
+
+def mismatches(baseline: dict, current: dict) -> list[str]:
+    """Settings and environment that differ between the two runs."""
+    notes = []
+    for key in sorted(set(baseline["settings"]) | set(current["settings"])):
+        before, after = baseline["settings"].get(key), current["settings"].get(key)
+        if before != after:
+            notes.append(f"{key}: {before} -> {after}")
+    for key in ("python", "platform", "cpu_count"):
+        if baseline.get(key) != current.get(key):
+            notes.append(f"{key}: {baseline.get(key)} -> {current.get(key)}")
+    return notes
+
+
+def run(baseline: dict, current: dict, threshold: float = 0.10, tail_threshold: float = 0.25) -> list[dict]:
+    """One row per benchmark and metric present in both reports; `regression` marks the failures."""
+    rows = []
+    for name, after in current["results"].items():
+        before = baseline["results"].get(name)
+        if before is None:
+            continue
+        for field, higher_is_better, tail in METRICS:
+            old, new = before.get(field), after.get(field)
+            if not old or new is None:
+                continue
+            change = (new - old) / old
+            worse = -change if higher_is_better else change
+            rows.append({
+                "name": name,
+                "metric": field,
+                "baseline": old,
+                "current": new,
+                "change": change,
+                "regression": worse > (tail_threshold if tail else threshold),
+            })
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare two benchmark suite reports")
+    parser.add_argument("baseline", type=Path, help="Report from the reference commit")
+    parser.add_argument("current", type=Path, help="Report from the commit under test")
+    parser.add_argument("--threshold", type=float, default=0.10,
+                        help="Allowed throughput drop / p50 increase (fraction)")
+    parser.add_argument("--tail-threshold", type=float, default=0.25,
+                        help="Allowed p95/p99 increase (fraction)")
+    args = parser.parse_args()
+
+    try:
+        baseline, current = load_report(args.baseline), load_report(args.current)
+    except ValueError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(2)
+
+    print(f"baseline {(baseline['commit'] or '?')[:12]}  current {(current['commit'] or '?')[:12]}")
+    for note in mismatches(baseline, current):
+        print(f"Warning: runs differ in {note}")
+    missing = sorted(set(baseline["results"]) ^ set(current["results"]))
+    if missing:
+        print(f"Warning: only in one report: {', '.join(missing)}")
+
+    rows = run(baseline, current, args.threshold, args.tail_threshold)
+    print(f"{'benchmark':16s} {'metric':11s} {'baseline':>12s} {'current':>12s} {'change':>8s}")
+    for row in rows:
+        flag = "  REGRESSION" if row["regression"] else ""
+        print(f"{row['name']:16s} {row['metric']:11s} {row['baseline']:12.1f} {row['current']:12.1f} "
+              f"{row['change']:+7.1%}{flag}")
+
+    regressions = [row for row in rows if row["regression"]]
+    if regressions:
+        print(f"{len(regressions)} regression(s) beyond the thresholds")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
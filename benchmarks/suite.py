@@ -0,0 +1,377 @@
+"""
+suite.py
+
+End-to-end benchmark suite for the triage pipeline over a synthetic ticket
+corpus. It runs on the fake Gemini client, so no API key is needed. The
+seeded corpus and client make each run inject the same latency and faults.
+For every ticket (or load) it records the wall time and reports
+throughput with p50/p95/p99 latency:
+
+    classify_ticket   the full router path: prompt, fake LLM call, JSON
+                      parsing, PII flag, escalation route, fallback logging
+    contains_pii      risk_controls.pii_filters on each ticket
+    sanitize_input    scripts/validation redaction on each ticket
+    validate_output   scripts/quality check on one classification per ticket
+    fallback_viewer   FallbackLogViewer loading a fallback log (per load)
+
+classify_ticket sends every ticket to the LLM: the cache, near-duplicate
+index, pre-classifier and circuit breaker are switched off. Quota and server
+errors are retried as configured, but backoff is not slept; the time it would
+have taken is reported as simulated_backoff_seconds. Audit logs go to a
+temporary directory. Each benchmark runs `--rounds` times on the same corpus
+and the fastest round is reported, which keeps run-to-run noise well under
+the thresholds benchmarks.compare applies.
+
+The report is saved as JSON, by default under benchmarks/results/ named
+after the commit, so two runs can be compared with benchmarks.compare.
+Latencies carry the metrics histograms' precision (within 6.25%).
+
+Usage: python -m benchmarks.suite [--tickets N] [--latency SPEC] [--error-rate R]
+                                  [--rate-limit-rate R] [--malformed-rate R] [--seed S]
+                                  [--rounds N] [--only NAME ...] [--output PATH]
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+import zlib
+from collections import Counter
+from datetime import datetime, timezone
+from pathlib import Path
+from time import perf_counter_ns
+from unittest.mock import patch
+
+from benchmarks.bench_fallback_index import write_log
+from bot_engine import router
+from bot_engine.fake_client import FakeGeminiClient, latency_distribution
+from bot_engine.metrics import Histogram
+from bot_engine.rate_limit import LoadShedError, RateLimiter
+from governance import audit_log
+from risk_controls.pii_filters import contains_pii
+from scripts.quality import output_validator
+from scripts.validation import input_sanitizer
+from tools.fallback_viewer import FallbackLogViewer
+
+ROOT = Path(__file__).resolve().parents[1]
+RESULTS_DIR = ROOT / "benchmarks" / "results"
+
+REPORT_FORMAT = 1
+
+BENCHMARKS = ("classify_ticket", "contains_pii", "sanitize_input", "validate_output", "fallback_viewer")
+
+# Templates per category; each starts with the keyword the fake LLM answers from
+TEMPLATES = {
+    "access_request": [
+        "access: please grant {name} access to the {system} share for the {team} team",
+        "access: new starter on {team} needs permission to {system} from Monday",
+    ],
+    "password_reset": [
+        "password: I forgot my password for {system} and I am locked out",
+        "password: reset required, {system} says my password expired",
+    ],
+    "software_issue": [
+        "crash: {system} crashes on startup since the last update",
+        "crash: {system} shows error 0x{code:04x} when saving a file",
+    ],
+    "hardware_issue": [
+        "hardware: my {device} will not power on after the weekend",
+        "hardware: the {device} on floor {floor} is making a grinding noise",
+    ],
+    "billing_question": [
+        "invoice: we were billed twice for {system} licences this month",
+        "invoice: please send a copy of invoice INV-{code} for the {team} team",
+    ],
+    "compliance_flag": [
+        "audit: {name} shared {system} exports with an outside contractor",
+        "audit: retention policy breach suspected in the {team} archive",
+    ],
+    "unknown": [
+        "hello, quick question about the thing we discussed last week",
+        "see attached",
+    ],
+}
+KEYWORDS = {template.split(":", 1)[0]: category
+            for category, templates in TEMPLATES.items() for template in templates if ":" in template}
+
+NAMES = ["alex", "sam", "jordan", "casey", "riley", "morgan", "taylor", "jamie"]
+SYSTEMS = ["VPN", "Outlook", "SAP", "Jira", "Salesforce", "SharePoint", "Workday", "Slack"]
+TEAMS = ["finance", "sales", "support", "legal", "platform", "marketing"]
+DEVICES = ["laptop", "monitor", "printer", "docking station", "desk phone"]
+LOG_WORDS = ["ERROR", "at", "line", "42", "timeout", "retrying", "connection", "reset", "by", "peer"]
+
+
+def make_tickets(count: int, seed: int = 7) -> list[str]:
+    """
+    Deterministic corpus: templated tickets across every category, ~10%
+    with a phone number, email or card number, ~5% with a pasted log tail
+    and ~1% blank. Ticket numbers keep the texts distinct.
+    """
+    rng = random.Random(seed)
+    categories = list(TEMPLATES)
+    tickets = []
+    for number in range(count):
+        if rng.random() < 0.01:
+            tickets.append("   ")
+            continue
+        template = rng.choice(TEMPLATES[rng.choice(categories)])
+        name = rng.choice(NAMES)
+        text = f"#{number} " + template.format(
+            name=name, system=rng.choice(SYSTEMS), team=rng.choice(TEAMS), device=rng.choice(DEVICES),
+            floor=rng.randint(1, 9), code=rng.randint(0, 0xFFFF))
+        pii = rng.random()
+        if pii < 0.04:
+            text += f". Call me on 502-555-{rng.randint(0, 9999):04d}"
+        elif pii < 0.08:
+            text += f". Reply to {name}@example.com"
+        elif pii < 0.10:
+            text += ". Card 4111 1111 1111 1111 was charged"
+        if rng.random() < 0.05:
+            text += "\n" + " ".join(rng.choice(LOG_WORDS) for _ in range(rng.randint(50, 400)))
+        tickets.append(text)
+    return tickets
+
+
+def keyword_responder(prompt: str) -> dict:
+    """Fake model: category from the ticket's keyword, confidence from a hash of the prompt."""
+    ticket = prompt.rpartition("Ticket: ")[2]
+    category = KEYWORDS.get(ticket.partition(" ")[2].partition(":")[0], "unknown")
+    confidence = 0.35 + (zlib.crc32(prompt.encode()) % 65) / 100
+    return {"category": category, "confidence": round(confidence, 2)}
+
+
+def summarize(name: str, unit: str, histogram: Histogram, seconds: float, **extra) -> dict:
+    """One result row: throughput plus latency quantiles in microseconds."""
+    count = histogram.count
+    return {
+        "name": name,
+        "unit": unit,
+        "count": count,
+        "seconds": round(seconds, 6),
+        "per_second": count / seconds if seconds else 0.0,
+        "p50_us": histogram.quantile(0.50) / 1e3,
+        "p95_us": histogram.quantile(0.95) / 1e3,
+        "p99_us": histogram.quantile(0.99) / 1e3,
+        "max_us": histogram.max_ns / 1e3,
+        "extra": extra,
+    }
+
+
+def timed_each(func, items) -> tuple[Histogram, float, list]:
+    """Calls `func` on every item, recording each call; (histogram, total seconds, results)."""
+    histogram = Histogram()
+    observe = histogram.observe_ns
+    results = []
+    append = results.append
+    started = perf_counter_ns()
+    for item in items:
+        start = perf_counter_ns()
+        append(func(item))
+        observe(perf_counter_ns() - start)
+    return histogram, (perf_counter_ns() - started) / 1e9, results
+
+
+def bench_classify_ticket(tickets: list[str], settings: dict, tmp: Path) -> dict:
+    fake = FakeGeminiClient(
+        keyword_responder,
+        latency=latency_distribution(settings["latency"], settings["seed"]),
+        error_rate=settings["error_rate"],
+        rate_limit_rate=settings["rate_limit_rate"],
+        malformed_rate=settings["malformed_rate"],
+        seed=settings["seed"],
+    )
+    retry = router.config.get("rate_limit", {})
+    limiter = RateLimiter(max_retries=int(retry.get("max_retries", 4)),
+                          base_delay=float(retry.get("base_delay", 0.5)),
+                          max_delay=float(retry.get("max_delay", 30.0)),
+                          adaptive=False, sleep=lambda seconds: None)
+    shed = 0
+
+    def classify(ticket: str):
+        nonlocal shed
+        try:
+            return router.classify_ticket(ticket)["decision_stage"]
+        except LoadShedError:
+            shed += 1
+            return "shed"
+
+    with patch.object(router, "client", fake), patch.object(router, "rate_limiter", limiter), \
+            patch.object(router, "circuit_breaker", None), patch.object(router, "cache", None), \
+            patch.object(router, "near_duplicates", None), patch.object(router, "preclassifier", None), \
+            patch.object(router, "get_project_root", lambda: tmp):
+        histogram, seconds, stages = timed_each(classify, tickets)
+        # Include writing the audit entries the run queued
+        started = time.perf_counter()
+        audit_log.flush()
+        seconds += time.perf_counter() - started
+
+    fallback_entries = 0
+    fallback_log = tmp / "fallback_log.jsonl"
+    if fallback_log.exists():
+        with fallback_log.open("rb") as f:
+            fallback_entries = sum(1 for _ in f)
+    return summarize(
+        "classify_ticket", "ticket", histogram, seconds,
+        llm_calls=fake.calls,
+        faults=dict(sorted(fake.faults.items())),
+        retries=limiter.stats.retries,
+        shed=shed,
+        simulated_backoff_seconds=round(limiter.stats.backoff_seconds, 3),
+        decision_stages=dict(sorted(Counter(stages).items())),
+        fallback_entries=fallback_entries,
+    )
+
+
+def bench_contains_pii(tickets: list[str], settings: dict, tmp: Path) -> dict:
+    histogram, seconds, flags = timed_each(contains_pii, tickets)
+    return summarize("contains_pii", "ticket", histogram, seconds, flagged=sum(flags))
+
+
+def bench_sanitize_input(tickets: list[str], settings: dict, tmp: Path) -> dict:
+    with patch.object(input_sanitizer, "SANITIZED_LOG", tmp / "sanitizer.jsonl"):
+        histogram, seconds, results = timed_each(input_sanitizer.sanitize_input, tickets)
+        audit_log.flush()
+    return summarize("sanitize_input", "ticket", histogram, seconds,
+                     redacted=sum(1 for result in results if result["flags"]))
+
+
+def bench_validate_output(tickets: list[str], settings: dict, tmp: Path) -> dict:
+    rng = random.Random(settings["seed"])
+    payloads = []
+    for number, ticket in enumerate(tickets):
+        answer = keyword_responder(ticket)
+        payload = {"ticket_id": f"T{number}", "type": answer["category"],
+                   "confidence": answer["confidence"], "actions": ["route_to:automated_response"]}
+        if rng.random() < 0.05:
+            del payload[rng.choice(list(payload))]  # some answers are missing a field
+        payloads.append(payload)
+    with patch.object(output_validator, "LOG_FILE", tmp / "validator.jsonl"):
+        histogram, seconds, results = timed_each(output_validator.validate_output, payloads)
+        audit_log.flush()
+    return summarize("validate_output", "payload", histogram, seconds, passed=sum(results))
+
+
+def bench_fallback_viewer(tickets: list[str], settings: dict, tmp: Path) -> dict:
+    entries = min(len(tickets), settings["log_entries"])
+    path = tmp / "viewer" / "fallback_log.jsonl"
+    path.parent.mkdir()
+    write_log(path, entries, days=90, now=datetime.now(timezone.utc), seed=settings["seed"])
+
+    def load(_):
+        with contextlib.redirect_stdout(io.StringIO()):
+            return len(FallbackLogViewer(path).entries)
+
+    histogram, seconds, loaded = timed_each(load, range(settings["repeat"]))
+    assert loaded == [entries] * settings["repeat"]
+    return summarize("fallback_viewer", "load", histogram, seconds, entries=entries,
+                     size_mb=round(path.stat().st_size / 1e6, 2),
+                     entries_per_second=entries * settings["repeat"] / seconds if seconds else 0.0)
+
+
+RUNNERS = {
+    "classify_ticket": bench_classify_ticket,
+    "contains_pii": bench_contains_pii,
+    "sanitize_input": bench_sanitize_input,
+    "validate_output": bench_validate_output,
+    "fallback_viewer": bench_fallback_viewer,
+}
+
+
+def git_revision() -> tuple:
+    """(commit, dirty) of the working tree, or (None, None) outside a git checkout."""
+    try:
+        commit = subprocess.run(["git", "rev-parse", "HEAD"], cwd=ROOT, capture_output=True,
+                                text=True, check=True).stdout.strip()
+        status = subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], cwd=ROOT,
+                                capture_output=True, text=True, check=True).stdout
+    except (OSError, subprocess.CalledProcessError):
+        return None, None
+    return commit, bool(status.strip())
+
+
+def run(tickets: int = 10_000, latency: str = "0", error_rate: float = 0.0, rate_limit_rate: float = 0.0,
+        malformed_rate: float = 0.0, seed: int = 7, log_entries: int = 100_000, repeat: int = 3,
+        rounds: int = 3, only: tuple = BENCHMARKS) -> dict:
+    """Runs the selected benchmarks and returns the report (see REPORT_FORMAT)."""
+    settings = {
+        "tickets": tickets, "latency": latency, "error_rate": error_rate, "rate_limit_rate": rate_limit_rate,
+        "malformed_rate": malformed_rate, "seed": seed, "log_entries": log_entries, "repeat": repeat,
+        "rounds": rounds,
+    }
+    if tickets < 1 or rounds < 1 or repeat < 1:
+        raise ValueError("--tickets, --rounds and --repeat must be at least 1")
+    latency_distribution(latency)  # reject a bad spec before generating the corpus
+    corpus = make_tickets(tickets, seed)
+    commit, dirty = git_revision()
+    results = {}
+    for name in BENCHMARKS:
+        if name not in only:
+            continue
+        rows = []
+        for _ in range(rounds):
+            with tempfile.TemporaryDirectory() as tmp:
+                rows.append(RUNNERS[name](corpus, settings, Path(tmp)))
+        # The fastest round is the one least disturbed by the rest of the machine
+        results[name] = max(rows, key=lambda row: row["per_second"])
+    return {
+        "format": REPORT_FORMAT,
+        "created": datetime.now(timezone.utc).isoformat(),
+        "commit": commit,
+        "dirty": dirty,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "settings": settings,
+        "results": results,
+    }
+
+
+def default_output(report: dict) -> Path:
+    commit = (report["commit"] or "nogit")[:12] + ("-dirty" if report["dirty"] else "")
+    return RESULTS_DIR / f"{commit}-{report['settings']['tickets']}.json"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="End-to-end triage pipeline benchmark suite")
+    parser.add_argument("--tickets", type=int, default=10_000, help="Synthetic corpus size (1k - 1M)")
+    parser.add_argument("--latency", default="0",
+                        help="Fake LLM latency: 0.05, uniform:0.01,0.2, exp:0.05 or lognormal:0.3,0.5 (seconds)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of LLM calls failing with 503")
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0, help="Fraction of LLM calls failing with 429")
+    parser.add_argument("--malformed-rate", type=float, default=0.0,
+                        help="Fraction of LLM calls answering with malformed JSON")
+    parser.add_argument("--seed", type=int, default=7, help="Seed for the corpus and the injected faults")
+    parser.add_argument("--log-entries", type=int, default=100_000,
+                        help="Largest fallback log loaded by the viewer benchmark")
+    parser.add_argument("--repeat", type=int, default=3, help="Fallback log loads")
+    parser.add_argument("--rounds", type=int, default=3, help="Runs of each benchmark; the fastest is kept")
+    parser.add_argument("--only", nargs="+", choices=BENCHMARKS, default=BENCHMARKS, help="Benchmarks to run")
+    parser.add_argument("--output", type=Path, help="Report path (default: benchmarks/results/<commit>-<tickets>.json)")
+    args = parser.parse_args()
+
+    try:
+        report = run(args.tickets, args.latency, args.error_rate, args.rate_limit_rate, args.malformed_rate,
+                     args.seed, args.log_entries, args.repeat, args.rounds, tuple(args.only))
+    except ValueError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(2)
+
+    print(f"{'benchmark':16s} {'count':>9s} {'per second':>12s} {'p50':>10s} {'p95':>10s} {'p99':>10s}")
+    for row in report["results"].values():
+        print(f"{row['name']:16s} {row['count']:9d} {row['per_second']:12.0f} "
+              f"{row['p50_us']:8.1f}us {row['p95_us']:8.1f}us {row['p99_us']:8.1f}us")
+
+    output = args.output or default_output(report)
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2) + "\n", encoding="utf-8")
+    print(f"Saved {output}")
+
+
+if __name__ == "__main__":
+    main()
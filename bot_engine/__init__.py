@@ -1,7 +1,27 @@
 """
 Bot Engine Package
 Contains the core classification logic and LLM routing.
+
+The router is imported on first use of one of its exports, so `import bot_engine`
+(and submodules such as `bot_engine.cache`) stay cheap for tools that never
+classify.
 """
-from .router import classify_ticket
+import importlib
+
+_EXPORTS = {
+    'classify_ticket': '.router',
+    'classify_tickets': '.router',
+    'classify_ticket_async': '.router',
+    'aclassify_many': '.router',
+    'LoadShedError': '.rate_limit',
+}
+
+__all__ = ['classify_ticket', 'classify_tickets', 'classify_ticket_async', 'aclassify_many', 'LoadShedError']
+
 
-__all__ = ['classify_ticket']
+def __getattr__(name):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(_EXPORTS[name], __name__), name)
+    globals()[name] = value
+    return value
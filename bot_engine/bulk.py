@@ -0,0 +1,359 @@
+"""
+Bulk Classifier
+Classifies a JSONL or CSV ticket export with bounded concurrency and a
+resumable checkpoint.
+
+Input is streamed, never loaded whole. Results go to a JSONL or CSV file
+either in input order or, with --unordered, as soon as they finish. A
+checkpoint next to the output records how far the input is done and how
+much of the output is valid, so after a crash, Ctrl-C or abort the same
+command resumes without re-classifying finished tickets.
+
+Usage:
+    python -m bot_engine.bulk tickets.jsonl -o results.jsonl
+    python -m bot_engine.bulk export.csv -o results.csv --text-field body --concurrency 32
+"""
+import argparse
+import asyncio
+import csv
+import json
+import os
+import sys
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Iterator, Optional
+
+from governance import audit_log
+from . import router
+from .circuit_breaker import CircuitOpenError
+from .rate_limit import LoadShedError
+
+RESULT_FIELDS = ["ticket_type", "confidence_score", "contains_pii", "model", "decision_stage", "route"]
+
+
+@dataclass
+class TicketRecord:
+    """One input ticket and where it ends in the input file."""
+    index: int
+    record_id: Any
+    text: str
+    end_offset: int
+
+
+# --- Input ---
+
+def _input_format(path: Path, override: Optional[str]) -> str:
+    return override or ("csv" if path.suffix.lower() == ".csv" else "jsonl")
+
+
+def read_records(path: Path, input_format: str, text_field: str, id_field: str,
+                 start_offset: int = 0, start_index: int = 0) -> Iterator[TicketRecord]:
+    """
+    Streams ticket records from `start_offset`, tracking each record's end offset.
+
+    JSONL lines may be objects (text in `text_field`) or bare strings. CSV
+    rows are read with the header from the top of the file, so quoted
+    multi-line fields resume correctly.
+    """
+    with path.open("rb") as f:
+        position = start_offset
+        header = None
+        if input_format == "csv":
+            header_line = f.readline()
+            header = next(csv.reader([header_line.decode("utf-8-sig")]))
+            position = max(position, len(header_line))
+        f.seek(position)
+
+        def lines():
+            nonlocal position
+            for raw in f:
+                position += len(raw)
+                yield raw.decode("utf-8")
+
+        index = start_index
+        if input_format == "csv":
+            for row in csv.DictReader(lines(), fieldnames=header):
+                yield TicketRecord(index, row.get(id_field) or index, row.get(text_field) or "", position)
+                index += 1
+            return
+
+        for line in lines():
+            if not line.strip():
+                continue
+            try:
+                item = json.loads(line)
+            except ValueError:
+                print(f"Error: skipping malformed input line ending at byte {position}", file=sys.stderr)
+                continue
+            if isinstance(item, dict):
+                text = item.get(text_field)
+                record_id = item.get(id_field, index)
+            else:
+                text, record_id = item, index
+            yield TicketRecord(index, record_id, text if isinstance(text, str) else "", position)
+            index += 1
+
+
+# --- Output ---
+
+class ResultWriter:
+    """Appends results as JSONL (`{"id", "result"}`) or CSV (id plus result columns)."""
+
+    def __init__(self, path: Path, output_format: str, truncate_to: int):
+        self.path = path
+        self.output_format = output_format
+        exists = path.exists()
+        if output_format == "csv" and truncate_to > 0:
+            with path.open(encoding="utf-8", newline="") as f:
+                if next(csv.reader(f), None) != ["id", *RESULT_FIELDS]:
+                    raise ValueError(f"{path} was written with other CSV columns; rerun with --restart")
+        self._file = path.open("r+b" if exists else "wb")
+        self._file.truncate(truncate_to)
+        self._file.seek(truncate_to)
+        self._text = open(self._file.fileno(), "w", encoding="utf-8", newline="", closefd=False)
+        self._csv = csv.writer(self._text) if output_format == "csv" else None
+        if self._csv is not None and truncate_to == 0:
+            self._csv.writerow(["id", *RESULT_FIELDS])
+
+    def write(self, record: TicketRecord, result: dict):
+        if self._csv is not None:
+            self._csv.writerow([record.record_id, *(result.get(name, "") for name in RESULT_FIELDS)])
+        else:
+            self._text.write(json.dumps({"id": record.record_id, "result": result}) + "\n")
+
+    def flush(self) -> int:
+        """Flushes to the OS and returns the number of valid output bytes."""
+        self._text.flush()
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        return self._file.tell()
+
+    def close(self):
+        self._text.close()
+        self._file.close()
+
+
+# --- Checkpoint ---
+
+@dataclass
+class Checkpoint:
+    """
+    Resume point: every record before `next_index` (ending at `input_offset`)
+    is written, as are the records in `done_above`; the output is valid up to
+    `output_bytes`.
+    """
+    input_path: str
+    input_offset: int = 0
+    next_index: int = 0
+    done_above: dict = field(default_factory=dict)
+    output_bytes: int = 0
+    complete: bool = False
+
+    @classmethod
+    def load(cls, path: Path) -> Optional["Checkpoint"]:
+        try:
+            data = json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return None
+        data["done_above"] = {int(k): v for k, v in data.get("done_above", {}).items()}
+        return cls(**data)
+
+    def save(self, path: Path):
+        tmp_path = path.with_name(path.name + ".tmp")
+        data = dict(self.__dict__, done_above={str(k): v for k, v in self.done_above.items()})
+        tmp_path.write_text(json.dumps(data), encoding="utf-8")
+        os.replace(tmp_path, path)
+
+    def mark_done(self, record: TicketRecord):
+        """Records a finished ticket and advances the low-water mark."""
+        self.done_above[record.index] = record.end_offset
+        while self.next_index in self.done_above:
+            self.input_offset = self.done_above.pop(self.next_index)
+            self.next_index += 1
+
+
+# --- Runner ---
+
+class Progress:
+    """Periodic progress and throughput lines on stderr."""
+
+    def __init__(self, total_bytes: int, interval: float = 2.0):
+        self.total_bytes = total_bytes
+        self.interval = interval
+        self.done = 0
+        self.started = time.monotonic()
+        self._last = self.started
+
+    def update(self, offset: int, force: bool = False):
+        now = time.monotonic()
+        if not force and now - self._last < self.interval:
+            return
+        self._last = now
+        rate = self.done / max(now - self.started, 1e-9)
+        percent = 100.0 * offset / self.total_bytes if self.total_bytes else 100.0
+        print(f"{self.done:,} tickets classified ({rate:,.1f}/s), {percent:5.1f}% of input", file=sys.stderr)
+
+
+async def _cancel(tasks):
+    """Cancels in-flight tasks and waits for them; their failures are dropped (one is already raised)."""
+    tasks = list(tasks)
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+
+
+async def classify_file(records: Iterator[TicketRecord], classify: Callable, emit: Callable,
+                        concurrency: int = 16, ordered: bool = True):
+    """
+    Classifies `records` with at most `concurrency` tickets in flight.
+
+    In ordered mode a window of up to 4 x `concurrency` tickets is started
+    and results are emitted strictly in input order; unordered mode emits
+    each result as soon as it completes.
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+
+    def start(record: TicketRecord):
+        return asyncio.ensure_future(classify(record.text, semaphore))
+
+    if ordered:
+        window = deque()
+        try:
+            while True:
+                while len(window) < 4 * concurrency:
+                    record = next(records, None)
+                    if record is None:
+                        break
+                    window.append((record, start(record)))
+                if not window:
+                    return
+                record, task = window.popleft()
+                emit(record, await task)
+        finally:
+            await _cancel(task for _, task in window)
+
+    pending = {}
+    try:
+        while True:
+            while len(pending) < concurrency:
+                record = next(records, None)
+                if record is None:
+                    break
+                pending[start(record)] = record
+            if not pending:
+                return
+            done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                emit(pending.pop(task), task.result())
+    finally:
+        await _cancel(pending)
+
+
+def run(input_path: Path, output_path: Path, input_format: Optional[str] = None,
+        text_field: str = "ticket", id_field: str = "id", concurrency: int = 16,
+        ordered: bool = True, timeout: Optional[float] = 30.0,
+        checkpoint_path: Optional[Path] = None, restart: bool = False,
+        checkpoint_every: int = 1000, checkpoint_seconds: float = 5.0) -> Checkpoint:
+    """Classifies `input_path` into `output_path`, resuming from the checkpoint if present."""
+    input_format = _input_format(input_path, input_format)
+    output_format = "csv" if output_path.suffix.lower() == ".csv" else "jsonl"
+    checkpoint_path = checkpoint_path or output_path.with_name(output_path.name + ".checkpoint.json")
+
+    checkpoint = None if restart else Checkpoint.load(checkpoint_path)
+    if checkpoint is not None and checkpoint.input_path != str(input_path.resolve()):
+        raise ValueError(f"{checkpoint_path} belongs to {checkpoint.input_path}; use --restart")
+    if checkpoint is None:
+        checkpoint = Checkpoint(input_path=str(input_path.resolve()))
+    elif checkpoint.complete:
+        print(f"Already complete according to {checkpoint_path}", file=sys.stderr)
+        return checkpoint
+    else:
+        print(f"Resuming at ticket {checkpoint.next_index:,} (byte {checkpoint.input_offset:,})",
+              file=sys.stderr)
+
+    already_done = set(checkpoint.done_above)
+    records = (
+        record for record in read_records(input_path, input_format, text_field, id_field,
+                                          checkpoint.input_offset, checkpoint.next_index)
+        if record.index not in already_done
+    )
+    writer = ResultWriter(output_path, output_format, truncate_to=checkpoint.output_bytes)
+    progress = Progress(input_path.stat().st_size)
+    unsaved = 0
+    last_save = time.monotonic()
+
+    def save():
+        nonlocal unsaved, last_save
+        checkpoint.output_bytes = writer.flush()
+        checkpoint.save(checkpoint_path)
+        unsaved = 0
+        last_save = time.monotonic()
+
+    def emit(record: TicketRecord, result: dict):
+        nonlocal unsaved
+        writer.write(record, result)
+        checkpoint.mark_done(record)
+        progress.done += 1
+        progress.update(checkpoint.input_offset)
+        unsaved += 1
+        if unsaved >= checkpoint_every or time.monotonic() - last_save >= checkpoint_seconds:
+            save()
+
+    async def classify(ticket_text: str, semaphore: asyncio.Semaphore) -> dict:
+        # Stop at the checkpoint rather than backfill (and audit-log) placeholder results;
+        # the tickets are classified on resume
+        return await router.classify_ticket_async(ticket_text, timeout=timeout, semaphore=semaphore,
+                                                  degrade=False)
+
+    try:
+        asyncio.run(classify_file(records, classify, emit, concurrency=concurrency, ordered=ordered))
+        checkpoint.complete = True
+    finally:
+        save()
+        writer.close()
+        audit_log.flush()
+        progress.update(checkpoint.input_offset, force=True)
+    return checkpoint
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Classify a JSONL/CSV ticket file with checkpointing")
+    parser.add_argument("input", type=Path, help="Input .jsonl or .csv file")
+    parser.add_argument("-o", "--output", type=Path, required=True,
+                        help="Results file (.csv for CSV, otherwise JSONL)")
+    parser.add_argument("--input-format", choices=("jsonl", "csv"),
+                        help="Input format (default: from the file extension)")
+    parser.add_argument("--text-field", default="ticket", help="Field/column holding the ticket text")
+    parser.add_argument("--id-field", default="id", help="Field/column copied to the output as the id")
+    parser.add_argument("--concurrency", type=int, default=16, help="Tickets classified at once")
+    parser.add_argument("--unordered", action="store_true",
+                        help="Write results as they finish instead of in input order")
+    parser.add_argument("--timeout", type=float, default=30.0, help="Per-ticket LLM deadline in seconds")
+    parser.add_argument("--checkpoint", type=Path, help="Checkpoint file (default: <output>.checkpoint.json)")
+    parser.add_argument("--restart", action="store_true", help="Ignore an existing checkpoint and start over")
+    parser.add_argument("--fake", action="store_true", help="Answer from the local fake LLM (no API calls)")
+    args = parser.parse_args(argv)
+
+    if args.fake:
+        from .fake_client import FakeGeminiClient
+        router.client = FakeGeminiClient()
+
+    try:
+        run(args.input, args.output, input_format=args.input_format, text_field=args.text_field,
+            id_field=args.id_field, concurrency=args.concurrency, ordered=not args.unordered,
+            timeout=args.timeout, checkpoint_path=args.checkpoint, restart=args.restart)
+    except KeyboardInterrupt:
+        print("Interrupted; rerun the same command to resume from the checkpoint", file=sys.stderr)
+        sys.exit(130)
+    except (LoadShedError, CircuitOpenError) as e:
+        print(f"Error: {e}. Rerun the same command later to resume from the checkpoint", file=sys.stderr)
+        sys.exit(75)
+    except ValueError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,196 @@
+"""
+Classification Cache
+Content-addressed cache for LLM classifications, so duplicate tickets do not
+pay for another Gemini call.
+
+Keys hash the normalized ticket text together with everything that can change
+the answer (model name, prompt template version, ticket categories). Changing
+any of these produces new keys, so stale labels are never served; old entries
+simply age out of the backend.
+"""
+import hashlib
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Callable, Optional
+
+CachedClassification = tuple[str, float]
+
+
+def normalize_ticket_text(ticket_text: str) -> str:
+    """Collapses whitespace and case so trivially different copies share a key."""
+    return " ".join(ticket_text.split()).casefold()
+
+
+def make_cache_key(ticket_text: str, model_name: str, prompt_version: str, ticket_types) -> str:
+    """Builds the content address for a ticket under the current model/prompt/categories."""
+    parts = [normalize_ticket_text(ticket_text), model_name, prompt_version, *ticket_types]
+    return hashlib.sha256("\x1f".join(parts).encode("utf-8")).hexdigest()
+
+
+@dataclass
+class CacheStats:
+    """Counters exposed for monitoring cache effectiveness."""
+    hits: int = 0
+    misses: int = 0
+    stores: int = 0
+    evictions: int = 0
+    expirations: int = 0
+
+    def as_dict(self) -> dict:
+        return asdict(self)
+
+
+class MemoryCache:
+    """In-process LRU cache with a per-entry time-to-live."""
+
+    def __init__(self, max_entries: int = 10000, ttl_seconds: float = 86400,
+                 clock: Callable[[], float] = time.monotonic):
+        if max_entries < 1:
+            raise ValueError("max_entries must be at least 1")
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.clock = clock
+        self.stats = CacheStats()
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[CachedClassification]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.stats.misses += 1
+                return None
+            value, expires_at = entry
+            if self.clock() >= expires_at:
+                del self._entries[key]
+                self.stats.expirations += 1
+                self.stats.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.stats.hits += 1
+            return value
+
+    def set(self, key: str, value: CachedClassification):
+        with self._lock:
+            self._entries[key] = (value, self.clock() + self.ttl_seconds)
+            self._entries.move_to_end(key)
+            self.stats.stores += 1
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.stats.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class SQLiteCache:
+    """On-disk LRU cache with a time-to-live that survives process restarts."""
+
+    def __init__(self, path: Path, max_entries: int = 100000, ttl_seconds: float = 86400,
+                 clock: Callable[[], float] = time.time):
+        if max_entries < 1:
+            raise ValueError("max_entries must be at least 1")
+        self.path = Path(path)
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.clock = clock
+        self.stats = CacheStats()
+        self._lock = threading.Lock()
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS classifications ("
+            " key TEXT PRIMARY KEY, category TEXT NOT NULL, confidence REAL NOT NULL,"
+            " expires_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS classifications_accessed ON classifications (accessed_at)"
+        )
+        (self._count,) = self._conn.execute("SELECT COUNT(*) FROM classifications").fetchone()
+
+    def get(self, key: str) -> Optional[CachedClassification]:
+        now = self.clock()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT category, confidence, expires_at FROM classifications WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                self.stats.misses += 1
+                return None
+            category, confidence, expires_at = row
+            if now >= expires_at:
+                self._conn.execute("DELETE FROM classifications WHERE key = ?", (key,))
+                self._count -= 1
+                self.stats.expirations += 1
+                self.stats.misses += 1
+                return None
+            self._conn.execute("UPDATE classifications SET accessed_at = ? WHERE key = ?", (now, key))
+            self.stats.hits += 1
+            return category, confidence
+
+    def set(self, key: str, value: CachedClassification):
+        now = self.clock()
+        category, confidence = value
+        with self._lock:
+            updated = self._conn.execute(
+                "UPDATE classifications SET category = ?, confidence = ?, expires_at = ?, accessed_at = ?"
+                " WHERE key = ?",
+                (category, confidence, now + self.ttl_seconds, now, key),
+            ).rowcount
+            if not updated:
+                self._conn.execute(
+                    "INSERT INTO classifications VALUES (?, ?, ?, ?, ?)",
+                    (key, category, confidence, now + self.ttl_seconds, now),
+                )
+                self._count += 1
+            self.stats.stores += 1
+            excess = self._count - self.max_entries
+            if excess > 0:
+                self._conn.execute(
+                    "DELETE FROM classifications WHERE key IN ("
+                    " SELECT key FROM classifications ORDER BY accessed_at LIMIT ?)",
+                    (excess,),
+                )
+                self._count -= excess
+                self.stats.evictions += excess
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM classifications")
+            self._count = 0
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def __len__(self) -> int:
+        return self._count
+
+
+def build_cache(settings: dict, project_root: Path):
+    """Creates the cache backend named in the `cache` section of scope.yaml (or None)."""
+    backend = settings.get("backend", "memory")
+    max_entries = int(settings.get("max_entries", 10000))
+    ttl_seconds = float(settings.get("ttl_seconds", 86400))
+
+    if backend in (None, "none", False):
+        return None
+    if backend == "memory":
+        return MemoryCache(max_entries=max_entries, ttl_seconds=ttl_seconds)
+    if backend == "sqlite":
+        path = Path(settings.get("sqlite_path", "governance/cache/classification_cache.sqlite3"))
+        if not path.is_absolute():
+            path = project_root / path
+        return SQLiteCache(path, max_entries=max_entries, ttl_seconds=ttl_seconds)
+    raise ValueError(f"Unknown cache backend: {backend}")
@@ -0,0 +1,190 @@
+"""
+Circuit Breaker
+Fails Gemini calls fast while the API is down instead of waiting for every
+request to time out.
+
+The breaker watches the outcome of the most recent calls. Once enough of them
+fail it opens, and calls are refused immediately with CircuitOpenError so the
+router can take its degraded path. After `open_seconds` it lets a few probe
+calls through (half-open). A successful probe closes the circuit; a failed
+one opens it again.
+"""
+import sys
+import threading
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Optional
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(ConnectionError):
+    """Raised instead of calling the API while the circuit is open."""
+
+    def __init__(self, message: str, retry_after: float = 0.0):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class CircuitBreaker:
+    """
+    Closed/open/half-open breaker over a sliding window of call outcomes.
+
+    Args:
+        window: Number of most recent calls the failure rate is computed over.
+        failure_rate: Fraction of failures in the window that opens the circuit.
+        min_calls: Calls needed in the window before the rate is trusted.
+        open_seconds: How long the circuit stays open before probing.
+        half_open_probes: Concurrent probe calls allowed while half-open.
+        ignore: Exception types that say nothing about API health (e.g.
+            LoadShedError); they count as neither success nor failure.
+    """
+
+    def __init__(self, window: int = 20, failure_rate: float = 0.5, min_calls: int = 5,
+                 open_seconds: float = 30.0, half_open_probes: int = 1, ignore: tuple = (),
+                 clock: Callable[[], float] = time.monotonic):
+        if window < 1 or min_calls < 1 or half_open_probes < 1:
+            raise ValueError("window, min_calls and half_open_probes must be at least 1")
+        if not 0 < failure_rate <= 1:
+            raise ValueError("failure_rate must be in (0, 1]")
+        self.window = window
+        self.failure_rate = failure_rate
+        self.min_calls = min(min_calls, window)
+        self.open_seconds = open_seconds
+        self.half_open_probes = half_open_probes
+        self.ignore = ignore
+        self.clock = clock
+        self.state = CLOSED
+        self.opened_count = 0
+        self.rejected = 0
+        self._outcomes = deque(maxlen=window)
+        self._opened_at = 0.0
+        self._probes = 0
+        self._lock = threading.Lock()
+
+    # --- State ---
+
+    def _transition(self, state: str):
+        if state == self.state:
+            return
+        previous, self.state = self.state, state
+        if state == OPEN:
+            self._opened_at = self.clock()
+            self.opened_count += 1
+        if state == CLOSED:
+            self._outcomes.clear()
+        self._probes = 0
+        print(f"Warning: Gemini circuit breaker {previous} -> {state}", file=sys.stderr)
+
+    def allow(self) -> bool:
+        """Whether a call may go out now. Every allowed call must be followed by a record_* call."""
+        with self._lock:
+            if self.state == OPEN and self.clock() - self._opened_at >= self.open_seconds:
+                self._transition(HALF_OPEN)
+            if self.state == CLOSED:
+                return True
+            if self.state == HALF_OPEN and self._probes < self.half_open_probes:
+                self._probes += 1
+                return True
+            self.rejected += 1
+            return False
+
+    def record_success(self):
+        with self._lock:
+            if self.state == HALF_OPEN:
+                self._transition(CLOSED)
+            else:
+                self._outcomes.append(False)
+
+    def record_failure(self):
+        with self._lock:
+            if self.state == HALF_OPEN:
+                self._transition(OPEN)
+                return
+            self._outcomes.append(True)
+            if (self.state == CLOSED and len(self._outcomes) >= self.min_calls
+                    and sum(self._outcomes) >= self.failure_rate * len(self._outcomes)):
+                self._transition(OPEN)
+
+    def record_ignored(self):
+        """Releases a probe slot for a call whose outcome says nothing about API health."""
+        with self._lock:
+            if self.state == HALF_OPEN and self._probes:
+                self._probes -= 1
+
+    def retry_after(self) -> float:
+        with self._lock:
+            if self.state != OPEN:
+                return 0.0
+            return max(0.0, self.open_seconds - (self.clock() - self._opened_at))
+
+    def _refuse(self):
+        raise CircuitOpenError(
+            f"Gemini circuit breaker is {self.state}; failing fast",
+            retry_after=self.retry_after(),
+        )
+
+    def _record(self, error: Optional[BaseException]):
+        if error is None:
+            self.record_success()
+        elif isinstance(error, Exception) and not isinstance(error, self.ignore):
+            self.record_failure()
+        else:
+            # Ignored errors and cancellation
+            self.record_ignored()
+
+    # --- Calls ---
+
+    def call(self, request: Callable[[], Any]) -> Any:
+        """Runs `request()` if the circuit allows it, recording the outcome."""
+        if not self.allow():
+            self._refuse()
+        try:
+            result = request()
+        except BaseException as e:
+            self._record(e)
+            raise
+        self._record(None)
+        return result
+
+    async def call_async(self, request: Callable[[], Awaitable[Any]]) -> Any:
+        """Async counterpart of `call`. A cancelled call releases its probe slot."""
+        if not self.allow():
+            self._refuse()
+        try:
+            result = await request()
+        except BaseException as e:
+            self._record(e)
+            raise
+        self._record(None)
+        return result
+
+    def snapshot(self) -> dict:
+        """Breaker state and counters for health endpoints."""
+        retry_after = self.retry_after()
+        with self._lock:
+            failures = sum(self._outcomes)
+            return {
+                "state": self.state,
+                "failure_rate": failures / len(self._outcomes) if self._outcomes else 0.0,
+                "window_calls": len(self._outcomes),
+                "opened_count": self.opened_count,
+                "rejected": self.rejected,
+                "retry_after_seconds": round(retry_after, 1),
+            }
+
+
+def build_circuit_breaker(settings: dict, ignore: tuple = ()) -> Optional[CircuitBreaker]:
+    """Creates the breaker described by the `circuit_breaker` section of scope.yaml (or None)."""
+    if not settings.get("enabled", True):
+        return None
+    return CircuitBreaker(
+        window=int(settings.get("window", 20)),
+        failure_rate=float(settings.get("failure_rate", 0.5)),
+        min_calls=int(settings.get("min_calls", 5)),
+        open_seconds=float(settings.get("open_seconds", 30.0)),
+        half_open_probes=int(settings.get("half_open_probes", 1)),
+        ignore=ignore,
+    )
@@ -0,0 +1,257 @@
+"""
+Configuration Snapshots
+Compiles governance/config/scope.yaml into an immutable, validated
+`ConfigSnapshot` and swaps in a new one when the file changes, so the
+confidence threshold, model, categories and escalation rules can be changed
+without a restart.
+
+Parsed YAML is cached as JSON next to the other caches, keyed by the SHA-256
+of the file; while the file is unchanged, startup reads the JSON and skips
+PyYAML altogether.
+"""
+import hashlib
+import json
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from pathlib import Path
+from types import MappingProxyType
+from typing import Any, Callable, Mapping, Optional
+
+from .escalation import EscalationPolicy, EscalationRuleError
+
+SNAPSHOT_FORMAT = 1
+
+# Sections read by other components; each must be a mapping when present
+SECTIONS = ("bot_config", "cache", "near_duplicates", "preclassifier", "rate_limit",
+            "circuit_breaker", "serve", "audit_log", "metrics")
+
+
+class ConfigError(ValueError):
+    """scope.yaml is unreadable or fails validation."""
+
+
+@dataclass(frozen=True)
+class ConfigSnapshot:
+    """One validated version of scope.yaml. Nested sections are read-only."""
+    source_hash: str
+    data: Mapping[str, Any]
+    ticket_types: tuple[str, ...]
+    categories: frozenset[str]
+    confidence_threshold: float
+    model_name: str
+    request_timeout_seconds: float
+    prompt_reload_seconds: float
+    config_reload_seconds: float
+    escalation_rules: tuple[str, ...]
+    fallback_protocol: tuple[str, ...]
+    escalation: EscalationPolicy = field(compare=False)
+
+    def section(self, name: str) -> Mapping[str, Any]:
+        """A top-level section, or an empty mapping if it is missing."""
+        return self.data.get(name) or MappingProxyType({})
+
+
+def freeze(value):
+    """Read-only copy of parsed YAML: mappings become MappingProxyType, lists tuples."""
+    if isinstance(value, dict):
+        return MappingProxyType({key: freeze(item) for key, item in value.items()})
+    if isinstance(value, list):
+        return tuple(freeze(item) for item in value)
+    return value
+
+
+def _number(settings: Mapping, key: str, default: float, problems: list, minimum: float = 0.0,
+            maximum: Optional[float] = None) -> float:
+    value = settings.get(key, default)
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        problems.append(f"bot_config.{key} must be a number")
+        return default
+    if value < minimum or (maximum is not None and value > maximum):
+        bound = f"between {minimum} and {maximum}" if maximum is not None else f"at least {minimum}"
+        problems.append(f"bot_config.{key} must be {bound}")
+    return float(value)
+
+
+def compile_snapshot(data: Any, source_hash: str) -> ConfigSnapshot:
+    """Validates parsed scope.yaml and compiles it; raises ConfigError listing every problem."""
+    if not isinstance(data, dict):
+        raise ConfigError("scope.yaml must contain a mapping")
+    problems = []
+    for name in SECTIONS:
+        if data.get(name) is not None and not isinstance(data[name], dict):
+            problems.append(f"{name} must be a mapping")
+    bot_config = data.get("bot_config") if isinstance(data.get("bot_config"), dict) else {}
+
+    ticket_types = data.get("ticket_types")
+    if not isinstance(ticket_types, list) or not ticket_types \
+            or not all(isinstance(t, str) and t for t in ticket_types):
+        problems.append("ticket_types must be a non-empty list of names")
+        ticket_types = []
+    else:
+        duplicates = sorted(t for t, count in Counter(ticket_types).items() if count > 1)
+        if duplicates:
+            problems.append(f"ticket_types has duplicates: {', '.join(duplicates)}")
+        if "unknown" not in ticket_types:
+            problems.append("ticket_types must include 'unknown' (the fallback category)")
+
+    model_name = bot_config.get("model_name", "gemini-1.5-flash")
+    if not isinstance(model_name, str) or not model_name:
+        problems.append("bot_config.model_name must be a non-empty string")
+
+    rule_lists = {}
+    for name in ("escalation_rules", "fallback_protocol"):
+        rules = data.get(name) or []
+        if not isinstance(rules, list) or not all(isinstance(rule, str) for rule in rules):
+            problems.append(f"{name} must be a list of strings")
+            rules = []
+        rule_lists[name] = tuple(rules)
+    try:
+        escalation = EscalationPolicy(rule_lists["escalation_rules"], rule_lists["fallback_protocol"])
+    except EscalationRuleError as e:
+        problems.append(f"escalation rules: {e}")
+        escalation = EscalationPolicy()
+
+    snapshot = ConfigSnapshot(
+        source_hash=source_hash,
+        data=freeze(data),
+        ticket_types=tuple(ticket_types),
+        categories=frozenset(ticket_types),
+        confidence_threshold=_number(bot_config, "confidence_threshold", 0.5, problems, 0.0, 1.0),
+        model_name=model_name,
+        request_timeout_seconds=_number(bot_config, "request_timeout_seconds", 30, problems, 0.001),
+        prompt_reload_seconds=_number(bot_config, "prompt_reload_seconds", 2.0, problems),
+        config_reload_seconds=_number(bot_config, "config_reload_seconds", 2.0, problems),
+        escalation_rules=rule_lists["escalation_rules"],
+        fallback_protocol=rule_lists["fallback_protocol"],
+        escalation=escalation,
+    )
+    if problems:
+        raise ConfigError("Invalid scope.yaml: " + "; ".join(problems))
+    return snapshot
+
+
+def _read_cached(cache_path: Optional[Path], source_hash: str) -> Optional[dict]:
+    if cache_path is None:
+        return None
+    try:
+        cached = json.loads(cache_path.read_bytes())
+    except (OSError, ValueError):
+        return None
+    if cached.get("format") != SNAPSHOT_FORMAT or cached.get("source_hash") != source_hash:
+        return None
+    return cached.get("data")
+
+
+def _write_cached(cache_path: Optional[Path], source_hash: str, data: dict):
+    if cache_path is None:
+        return
+    try:
+        payload = json.dumps({"format": SNAPSHOT_FORMAT, "source_hash": source_hash, "data": data})
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = cache_path.with_name(cache_path.name + ".tmp")
+        tmp.write_text(payload, encoding="utf-8")
+        os.replace(tmp, cache_path)
+    except (OSError, TypeError, ValueError):
+        # Values JSON cannot represent (dates, ...) or a read-only tree: parse YAML every time
+        pass
+
+
+def load_snapshot(path: Path, cache_path: Optional[Path] = None) -> tuple[ConfigSnapshot, bool]:
+    """Reads and compiles `path`, reusing the JSON cache when the file hash matches; (snapshot, cache hit)."""
+    try:
+        raw = Path(path).read_bytes()
+    except OSError as e:
+        raise ConfigError(f"Cannot read {path}: {e}") from e
+    source_hash = hashlib.sha256(raw).hexdigest()
+
+    data = _read_cached(cache_path, source_hash)
+    cache_hit = data is not None
+    if not cache_hit:
+        import yaml  # only needed when the cache is cold or stale
+
+        try:
+            data = yaml.safe_load(raw)
+        except yaml.YAMLError as e:
+            raise ConfigError(f"Cannot parse {path}: {e}") from e
+    snapshot = compile_snapshot(data, source_hash)
+    if not cache_hit:
+        _write_cached(cache_path, source_hash, data)
+    return snapshot, cache_hit
+
+
+class ConfigStore:
+    """
+    Serves the current snapshot of a config file.
+
+    Like the prompt registry, the file is stat()-ed at most once every
+    `check_interval` seconds. When its mtime or size changes, it is recompiled
+    and the new snapshot replaces the old one in a single assignment. Readers
+    see either the old or the new snapshot, never a mix. An edit that fails
+    validation is reported on stderr, and the last good snapshot stays in use.
+    """
+
+    def __init__(self, path: Path, cache_path: Optional[Path] = None, check_interval: Optional[float] = None,
+                 clock: Callable[[], float] = time.monotonic):
+        self.path = Path(path)
+        self.cache_path = Path(cache_path) if cache_path is not None else None
+        self.clock = clock
+        self.stats = Counter()
+        self.last_load_ms = 0.0
+        self._lock = threading.Lock()
+        self._stat_key = self._stat()
+        self._snapshot = self._load()
+        self.check_interval = self._snapshot.config_reload_seconds if check_interval is None else check_interval
+        self._checked_at = clock()
+
+    def _stat(self) -> Optional[tuple[int, int]]:
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            # Keep serving the last good snapshot if the file is mid-replace
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def _load(self) -> ConfigSnapshot:
+        start = time.perf_counter()
+        snapshot, cache_hit = load_snapshot(self.path, self.cache_path)
+        self.last_load_ms = (time.perf_counter() - start) * 1000
+        self.stats["loads"] += 1
+        self.stats["snapshot_cache_hits"] += cache_hit
+        return snapshot
+
+    def current(self) -> ConfigSnapshot:
+        """The current snapshot, recompiled first if the file changed since the last check."""
+        now = self.clock()
+        if now - self._checked_at < self.check_interval:
+            return self._snapshot
+        with self._lock:
+            if now - self._checked_at >= self.check_interval:
+                stat_key = self._stat()
+                if stat_key is not None and stat_key != self._stat_key:
+                    self._stat_key = stat_key
+                    self._reload()
+                self._checked_at = now
+        return self._snapshot
+
+    def _reload(self):
+        try:
+            snapshot = self._load()
+        except ConfigError as e:
+            self.stats["reload_errors"] += 1
+            print(f"Error: {e}. Keeping the previous configuration.", file=sys.stderr)
+            return
+        if snapshot.source_hash != self._snapshot.source_hash:
+            self._snapshot = snapshot
+            self.stats["reloads"] += 1
+
+    def snapshot(self) -> dict:
+        """Version and reload counters, for /healthz."""
+        return {
+            "source_hash": self._snapshot.source_hash[:12],
+            "last_load_ms": round(self.last_load_ms, 2),
+            **self.stats,
+        }
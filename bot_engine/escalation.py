@@ -0,0 +1,182 @@
+"""
+Escalation Rules
+Compiles `escalation_rules` and `fallback_protocol` from scope.yaml into a
+single routing function that decides where each classification goes:
+
+    if ticket_type == compliance_flag: escalate_to: human_agent
+    if confidence_score < 0.7: escalate_to: human_agent
+    if contains_pii: escalate_to: human_agent
+    else: route_to: automated_response
+
+A condition is `field`, `not field` or `field <op> value` (==, !=, <, <=, >,
+>=), joined with `and` / `or`. Values are numbers, true/false/null, quoted
+strings or bare words. The fallback protocol may also use the phrase
+"LLM fails to classify" (a degraded result, or an `unknown` result with no
+confidence, whether it came from the LLM, the cache or a near-duplicate;
+blank tickets are not classification failures). Its rules are checked first. The first
+matching rule sets the result's `route`.
+
+Rules are parsed once per configuration version. They are turned into the
+source of one Python function that holds the comparisons inline, so
+evaluating a result costs one call instead of a walk over rule objects.
+`notify` rules describe operator alerts rather than routes. They are kept for
+reference and not evaluated per ticket.
+"""
+import re
+from typing import Iterable, NamedTuple, Optional
+
+ROUTING_ACTIONS = ("escalate_to", "route_to")
+NOTIFY_ACTION = "notify"
+
+ORDERING = frozenset({"<", "<=", ">", ">="})
+
+FIELD_PATTERN = re.compile(r"[A-Za-z_][A-Za-z0-9_]*\Z")
+COMPARISON_PATTERN = re.compile(r"\s*([A-Za-z_][A-Za-z0-9_]*)\s*(==|!=|<=|>=|<|>)\s*(.+?)\s*\Z")
+
+# Plain-language conditions used by the fallback protocol, as generated expressions
+PHRASES = {
+    "llm fails to classify": (
+        "(get('degraded') or (get('ticket_type') == 'unknown' and not get('confidence_score')"
+        " and get('decision_stage') != 'empty'))"
+    ),
+}
+
+
+class EscalationRuleError(ValueError):
+    """A rule in scope.yaml cannot be parsed."""
+
+
+class EscalationRule(NamedTuple):
+    """One parsed rule; `condition` is None for `else`."""
+    text: str
+    condition: Optional[str]
+    action: str
+    target: str
+
+
+def parse_rule(text: str) -> EscalationRule:
+    """Splits `if <condition>: <action>: <target>` or `else: <action>: <target>`."""
+    head, sep, rest = text.partition(":")
+    action, sep2, target = rest.partition(":")
+    head, action, target = head.strip(), action.strip(), target.strip()
+    if not sep or not sep2 or not action or not target:
+        raise EscalationRuleError(f"expected 'if <condition>: <action>: <target>', got {text!r}")
+    if head == "else":
+        condition = None
+    elif head.startswith("if ") and head[3:].strip():
+        condition = head[3:].strip()
+    else:
+        raise EscalationRuleError(f"rule must start with 'if' or 'else': {text!r}")
+    if action not in ROUTING_ACTIONS and action != NOTIFY_ACTION:
+        raise EscalationRuleError(f"unknown action {action!r} in {text!r}")
+    return EscalationRule(text, condition, action, target)
+
+
+def _literal(token: str):
+    lowered = token.lower()
+    if lowered in ("true", "false"):
+        return lowered == "true"
+    if lowered in ("null", "none"):
+        return None
+    if len(token) >= 2 and token[0] == token[-1] and token[0] in "'\"":
+        return token[1:-1]
+    try:
+        return int(token)
+    except ValueError:
+        pass
+    try:
+        return float(token)
+    except ValueError:
+        return token
+
+
+class _Compiler:
+    """Turns conditions into Python expressions over `get` (the result's dict.get)."""
+
+    def __init__(self):
+        self.constants = {}
+
+    def constant(self, value) -> str:
+        name = f"c{len(self.constants)}"
+        self.constants[name] = value
+        return name
+
+    def term(self, text: str) -> str:
+        text = text.strip()
+        phrase = PHRASES.get(" ".join(text.lower().split()))
+        if phrase is not None:
+            return phrase
+        if text.startswith("not "):
+            field = text[4:].strip()
+            if FIELD_PATTERN.match(field):
+                return f"not get({field!r})"
+        if FIELD_PATTERN.match(text):
+            return f"get({text!r})"
+        match = COMPARISON_PATTERN.match(text)
+        if match is None:
+            raise EscalationRuleError(f"cannot parse condition {text!r}")
+        field, op, value = match.groups()
+        value = self.constant(_literal(value))
+        if op in ORDERING:
+            # Missing fields never match an ordering comparison instead of raising TypeError
+            return f"((v := get({field!r})) is not None and v {op} {value})"
+        return f"get({field!r}) {op} {value}"
+
+    def condition(self, text: str) -> str:
+        alternatives = []
+        for alternative in re.split(r"\s+or\s+", text):
+            terms = [self.term(term) for term in re.split(r"\s+and\s+", alternative)]
+            alternatives.append(terms[0] if len(terms) == 1 else "(" + " and ".join(terms) + ")")
+        return alternatives[0] if len(alternatives) == 1 else " or ".join(alternatives)
+
+
+class EscalationPolicy:
+    """
+    Compiled escalation rules. `route(result)` is the generated function: it
+    returns the route of the first matching rule, or None if no rule matches.
+
+    Args:
+        escalation_rules: `escalation_rules` from scope.yaml, in priority order.
+        fallback_protocol: `fallback_protocol` from scope.yaml; its routing
+            rules are checked before the escalation rules.
+    """
+
+    def __init__(self, escalation_rules: Iterable[str] = (), fallback_protocol: Iterable[str] = ()):
+        fallback = [parse_rule(text) for text in fallback_protocol]
+        escalation = [parse_rule(text) for text in escalation_rules]
+        self.notifications = tuple(rule for rule in fallback + escalation if rule.action == NOTIFY_ACTION)
+        self.rules = tuple(rule for rule in fallback + escalation if rule.action != NOTIFY_ACTION)
+        self.source, constants = self._generate()
+        namespace = dict(constants)
+        exec(compile(self.source, "<escalation_rules>", "exec"), namespace)
+        self.route = namespace["route"]
+
+    def _generate(self) -> tuple[str, dict]:
+        compiler = _Compiler()
+        lines = ["def route(result):", "    get = result.get"]
+        for rule in self.rules:
+            target = compiler.constant(rule.target)
+            if rule.condition is None:
+                lines.append(f"    return {target}")
+                break  # rules after `else` can never match
+            lines.append(f"    if {compiler.condition(rule.condition)}:")
+            lines.append(f"        return {target}")
+        else:
+            lines.append("    return None")
+        return "\n".join(lines) + "\n", compiler.constants
+
+    def route_many(self, results: Iterable[dict]) -> list[Optional[str]]:
+        """Routes for many results, in order."""
+        return list(map(self.route, results))
+
+    def apply(self, result: dict) -> dict:
+        """Adds `route` to a result that does not have one yet (degraded results do)."""
+        if "route" not in result:
+            route = self.route(result)
+            if route is not None:
+                result["route"] = route
+        return result
+
+    def apply_many(self, results: Iterable[dict]) -> list[dict]:
+        """`apply` over many results, e.g. a bulk job's output."""
+        return [self.apply(result) for result in results]
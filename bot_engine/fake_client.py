@@ -0,0 +1,169 @@
+"""
+Fake Gemini client for tests and local load experiments.
+
+Mimics the parts of `google.genai.Client` the router uses
+(`models.generate_content` and `aio.models.generate_content`) without any
+network access. Responses and latency are configurable, and a fraction of
+calls can be made to fail the way the real API does: server errors, quota
+errors (429) and answers that are not valid JSON. Faults are drawn from a
+seeded generator, so a given seed injects the same faults on every run.
+"""
+import asyncio
+import json
+import math
+import random
+import re
+import threading
+import time
+from collections import Counter
+from types import SimpleNamespace
+from typing import Callable, Optional
+
+# Matches the numbered lines written by router.prepare_batch_prompt
+BATCH_LINE = re.compile(r"^\[(\d+)\] ", re.MULTILINE)
+
+MALFORMED_TEXT = '{"category": "unknown", "confidence": '
+
+
+class FakeAPIError(Exception):
+    """
+    Injected API failure with the attributes of `google.genai.errors.APIError`
+    (`code`, `status`, `details`), so the rate limiter and circuit breaker
+    treat it like the real thing without importing the SDK.
+    """
+
+    def __init__(self, code: int, status: str, details: Optional[dict] = None):
+        super().__init__(f"{code} {status}")
+        self.code = code
+        self.status = status
+        self.details = details or {"error": {"code": code, "status": status, "details": []}}
+
+
+def default_responder(prompt: str):
+    """Answers every ticket in the prompt as a confident `unknown`."""
+    answer = {"category": "unknown", "confidence": 0.0}
+    ticket_ids = [int(n) for n in BATCH_LINE.findall(prompt)]
+    if ticket_ids:
+        return [dict(answer, id=n) for n in ticket_ids]
+    return answer
+
+
+def latency_distribution(spec: str, seed: Optional[int] = None) -> Callable[[], float]:
+    """
+    Per-call delay from a short spec (all values in seconds):
+
+        0.05                  fixed
+        uniform:0.01,0.2      uniform between two bounds
+        exp:0.05              exponential with this mean
+        lognormal:0.3,0.5     log-normal with this median and sigma (long tail)
+    """
+    kind, _, args = spec.partition(":")
+    rng = random.Random(seed)
+    try:
+        if not args:
+            delay = float(kind)
+            if delay < 0:
+                raise ValueError
+            return lambda: delay
+        values = [float(v) for v in args.split(",")]
+        if kind == "uniform" and len(values) == 2:
+            low, high = values
+            return lambda: rng.uniform(low, high)
+        if kind == "exp" and len(values) == 1 and values[0] > 0:
+            return lambda: rng.expovariate(1.0 / values[0])
+        if kind == "lognormal" and len(values) == 2 and values[0] > 0:
+            mu, sigma = math.log(values[0]), values[1]
+            return lambda: rng.lognormvariate(mu, sigma)
+    except ValueError:
+        pass
+    raise ValueError(f"invalid latency spec {spec!r}; expected e.g. 0.05, uniform:0.01,0.2, "
+                     "exp:0.05 or lognormal:0.3,0.5")
+
+
+class FakeGeminiClient:
+    """
+    Stand-in for `genai.Client` that answers from a local responder.
+
+    Args:
+        responder: Callable taking the prompt and returning a dict/list (sent
+            as JSON) or a string (sent verbatim, e.g. to simulate bad JSON).
+        latency: Seconds to wait per call, or a zero-argument callable
+            returning the delay for each call (see `latency_distribution`).
+        error_rate: Fraction of calls failing with a 503 server error.
+        rate_limit_rate: Fraction of calls failing with a 429 quota error.
+        malformed_rate: Fraction of calls answering with truncated JSON.
+        seed: Seed for drawing the injected faults.
+    """
+
+    def __init__(self, responder=None, latency=0.0, error_rate: float = 0.0, rate_limit_rate: float = 0.0,
+                 malformed_rate: float = 0.0, seed: Optional[int] = None):
+        if not 0.0 <= error_rate + rate_limit_rate + malformed_rate <= 1.0:
+            raise ValueError("error_rate, rate_limit_rate and malformed_rate must add up to at most 1")
+        self.responder = responder or default_responder
+        self.latency = latency
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.malformed_rate = malformed_rate
+        self.calls = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.faults = Counter()
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self.models = SimpleNamespace(generate_content=self._generate_content)
+        self.aio = SimpleNamespace(models=SimpleNamespace(generate_content=self._generate_content_async))
+
+    def _delay(self) -> float:
+        return self.latency() if callable(self.latency) else self.latency
+
+    def _enter(self) -> Optional[str]:
+        """Counts the call and draws its fault (None for a normal answer)."""
+        with self._lock:
+            self.calls += 1
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+            if not (self.error_rate or self.rate_limit_rate or self.malformed_rate):
+                return None
+            draw = self._rng.random()
+            for fault, rate in (("server_error", self.error_rate), ("rate_limited", self.rate_limit_rate),
+                                ("malformed", self.malformed_rate)):
+                if draw < rate:
+                    self.faults[fault] += 1
+                    return fault
+                draw -= rate
+            return None
+
+    def _exit(self):
+        with self._lock:
+            self.in_flight -= 1
+
+    def _respond(self, prompt: str, fault: Optional[str]):
+        if fault == "server_error":
+            raise FakeAPIError(503, "UNAVAILABLE")
+        if fault == "rate_limited":
+            raise FakeAPIError(429, "RESOURCE_EXHAUSTED")
+        if fault == "malformed":
+            return SimpleNamespace(text=MALFORMED_TEXT)
+        answer = self.responder(prompt)
+        text = answer if isinstance(answer, str) else json.dumps(answer)
+        return SimpleNamespace(text=text)
+
+    def _generate_content(self, model, contents, config=None):
+        fault = self._enter()
+        try:
+            delay = self._delay()
+            if delay:
+                time.sleep(delay)
+            return self._respond(contents, fault)
+        finally:
+            self._exit()
+
+    async def _generate_content_async(self, model, contents, config=None):
+        fault = self._enter()
+        try:
+            delay = self._delay()
+            if delay:
+                await asyncio.sleep(delay)
+            return self._respond(contents, fault)
+        finally:
+            self._exit()
@@ -0,0 +1,247 @@
+"""
+Near-duplicate Index
+Reuses recent confident classifications for tickets that say the same thing
+in slightly different words ("can't log in to VPN" / "cannot login to the
+VPN!!"), which the exact-match cache misses.
+
+Tickets are normalized (case, punctuation, contractions, stop words) and
+cut into character shingles. A MinHash signature estimates the Jaccard
+similarity of two shingle sets, and LSH banding finds candidate matches
+without scanning the whole index. The signature uses one-permutation
+hashing (one hash per shingle, split into bins, empty bins densified), which
+keeps signing at tens of microseconds in pure Python. Memory is bounded by
+`max_entries` and `ttl_seconds`, with the oldest entries evicted first.
+"""
+import hashlib
+import operator
+import re
+import threading
+import time
+import zlib
+from array import array
+from collections import Counter, OrderedDict
+from typing import Callable, NamedTuple, Optional
+
+CONTRACTIONS = [
+    (re.compile(r"\bcan'?t\b"), "cannot"),
+    (re.compile(r"\bwon'?t\b"), "will not"),
+    (re.compile(r"n't\b"), " not"),
+]
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+# Fibonacci hashing constant; spreads CRC-32 values before splitting into bin and value
+_MIX = 0x9E3779B1
+_EMPTY = 0xFFFFFFFF
+
+STOP_WORDS = frozenset({
+    "a", "an", "and", "at", "for", "i", "im", "in", "is", "it", "me", "my",
+    "of", "on", "please", "the", "this", "to",
+})
+
+
+class NearDuplicateMatch(NamedTuple):
+    """A reusable earlier classification and how it was found."""
+    category: str
+    confidence: float
+    similarity: float
+    source: str
+    age_seconds: float
+
+    def provenance(self) -> dict:
+        return {
+            "similarity": round(self.similarity, 3),
+            "source": self.source,
+            "age_seconds": round(self.age_seconds, 1),
+        }
+
+
+class _Entry(NamedTuple):
+    signature: array
+    category: str
+    confidence: float
+    context: str
+    created: float
+    band_keys: tuple
+
+
+def normalize_for_similarity(ticket_text: str) -> str:
+    """Lowercases, expands contractions and drops punctuation and stop words."""
+    text = ticket_text.lower()
+    for pattern, replacement in CONTRACTIONS:
+        text = pattern.sub(replacement, text)
+    return " ".join(t for t in TOKEN_PATTERN.findall(text) if t not in STOP_WORDS)
+
+
+class NearDuplicateIndex:
+    """
+    MinHash/LSH index of recent classifications.
+
+    Args:
+        similarity: Minimum estimated Jaccard similarity for reuse.
+        min_confidence: Only results at or above this confidence are stored.
+        num_perm: MinHash signature length (bins); a power of two.
+        bands: LSH bands; `num_perm / bands` rows per band.
+        max_candidates: Most LSH candidates verified per lookup, taken in
+            order of shared bands, so crowded buckets cannot stall a lookup.
+        shingle_size: Characters per shingle.
+        max_entries: Size bound; the oldest entries are evicted first.
+        ttl_seconds: Age after which entries are dropped.
+    """
+
+    def __init__(self, similarity: float = 0.6, min_confidence: float = 0.85, num_perm: int = 64,
+                 bands: int = 16, shingle_size: int = 3, max_entries: int = 50000,
+                 ttl_seconds: float = 3600, max_candidates: int = 64,
+                 clock: Callable[[], float] = time.monotonic):
+        if num_perm & (num_perm - 1) or num_perm % bands:
+            raise ValueError("num_perm must be a power of two and a multiple of bands")
+        if max_entries < 1:
+            raise ValueError("max_entries must be at least 1")
+        self.similarity = similarity
+        self.min_confidence = min_confidence
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.shingle_size = shingle_size
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.max_candidates = max_candidates
+        self.clock = clock
+        self._bin_shift = 32 - (num_perm.bit_length() - 1)
+        self._value_mask = (1 << self._bin_shift) - 1
+        self.stats = Counter()
+        self._entries = OrderedDict()
+        self._buckets = [{} for _ in range(bands)]
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    # --- Signatures ---
+
+    def signature(self, ticket_text: str) -> Optional[tuple[str, array]]:
+        """(source id, MinHash signature) for a ticket, or None if it has no content."""
+        normalized = normalize_for_similarity(ticket_text)
+        if not normalized:
+            return None
+        size = self.shingle_size
+        encoded = normalized.encode("utf-8")
+        bins = [_EMPTY] * self.num_perm
+        shift, mask = self._bin_shift, self._value_mask
+        for i in range(max(1, len(encoded) - size + 1)):
+            h = (zlib.crc32(encoded[i:i + size]) * _MIX) & 0xFFFFFFFF
+            b = h >> shift
+            if h & mask < bins[b]:
+                bins[b] = h & mask
+        self._densify(bins)
+        source = hashlib.sha256(encoded).hexdigest()[:16]
+        return source, array("I", bins)
+
+    def _densify(self, bins: list):
+        """Fills each empty bin from the next non-empty bin to its right, tagged with the distance."""
+        count = len(bins)
+        start = next((i for i in range(count - 1, -1, -1) if bins[i] != _EMPTY), None)
+        if start is None:
+            return
+        # Walk right to left from the last filled bin, carrying the nearest filled value
+        shift = self._bin_shift
+        nearest, distance = bins[start], 0
+        for step in range(1, count):
+            i = (start - step) % count
+            if bins[i] == _EMPTY:
+                distance += 1
+                # Values fit below the bin shift, so the distance tag sits above them
+                bins[i] = nearest | (distance << shift)
+            else:
+                nearest, distance = bins[i], 0
+
+    def _band_keys(self, signature: array) -> tuple:
+        rows = self.rows
+        return tuple(signature[i * rows:(i + 1) * rows].tobytes() for i in range(self.bands))
+
+    # --- Maintenance ---
+
+    def _remove(self, source: str):
+        entry = self._entries.pop(source)
+        for bucket, key in zip(self._buckets, entry.band_keys):
+            members = bucket.get(key)
+            if members is not None:
+                members.discard(source)
+                if not members:
+                    del bucket[key]
+
+    def _expire(self, now: float):
+        while self._entries:
+            source, entry = next(iter(self._entries.items()))
+            if now - entry.created < self.ttl_seconds:
+                return
+            self._remove(source)
+            self.stats["expirations"] += 1
+
+    # --- Public API ---
+
+    def add(self, ticket_text: str, category: str, confidence: float, context: str = ""):
+        """Stores a confident classification; `context` must match on lookup (model, prompt, ...)."""
+        if category == "unknown" or confidence < self.min_confidence:
+            return
+        signed = self.signature(ticket_text)
+        if signed is None:
+            return
+        source, signature = signed
+        band_keys = self._band_keys(signature)
+        with self._lock:
+            now = self.clock()
+            self._expire(now)
+            if source in self._entries:
+                self._remove(source)
+            self._entries[source] = _Entry(signature, category, confidence, context, now, band_keys)
+            for bucket, key in zip(self._buckets, band_keys):
+                bucket.setdefault(key, set()).add(source)
+            self.stats["adds"] += 1
+            while len(self._entries) > self.max_entries:
+                self._remove(next(iter(self._entries)))
+                self.stats["evictions"] += 1
+
+    def lookup(self, ticket_text: str, context: str = "") -> Optional[NearDuplicateMatch]:
+        """The most similar stored classification at or above the threshold, if any."""
+        signed = self.signature(ticket_text)
+        if signed is None:
+            return None
+        _, signature = signed
+        band_keys = self._band_keys(signature)
+        with self._lock:
+            now = self.clock()
+            self._expire(now)
+            candidates = Counter()
+            for bucket, key in zip(self._buckets, band_keys):
+                members = bucket.get(key)
+                if members:
+                    candidates.update(members)
+
+            best, best_similarity = None, self.similarity
+            for source, _ in candidates.most_common(self.max_candidates):
+                entry = self._entries[source]
+                if entry.context != context:
+                    continue
+                similarity = sum(map(operator.eq, signature, entry.signature)) / self.num_perm
+                if similarity >= best_similarity:
+                    best, best_similarity = source, similarity
+            if best is None:
+                self.stats["misses"] += 1
+                return None
+            self.stats["hits"] += 1
+            entry = self._entries[best]
+            return NearDuplicateMatch(entry.category, entry.confidence, best_similarity, best, now - entry.created)
+
+
+def build_near_duplicate_index(settings: dict) -> Optional[NearDuplicateIndex]:
+    """Creates the index described by the `near_duplicates` section of scope.yaml (or None)."""
+    if not settings.get("enabled", False):
+        return None
+    return NearDuplicateIndex(
+        similarity=float(settings.get("similarity", 0.6)),
+        min_confidence=float(settings.get("min_confidence", 0.85)),
+        num_perm=int(settings.get("num_perm", 64)),
+        bands=int(settings.get("bands", 16)),
+        shingle_size=int(settings.get("shingle_size", 3)),
+        max_entries=int(settings.get("max_entries", 50000)),
+        ttl_seconds=float(settings.get("ttl_seconds", 3600)),
+    )
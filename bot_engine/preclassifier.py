@@ -0,0 +1,226 @@
+"""
+Pre-classifier
+Fast local first stage that answers easy tickets without a Gemini call.
+
+Two parts, tried in order:
+
+- keyword/regex rules from the `preclassifier` section of scope.yaml
+  ("password reset" -> password_reset). A ticket matching rules for more
+  than one category is left to the next stage.
+- an optional hashed bag-of-words linear model trained on labeled history,
+  stored in a small binary file that is memory-mapped at startup.
+
+Answers are mapped onto the configured ticket types. Anything below
+`threshold`, or an `unknown`, goes on to the LLM.
+"""
+import json
+import math
+import mmap
+import re
+import struct
+import sys
+import zlib
+from array import array
+from collections import Counter
+from pathlib import Path
+from typing import Iterable, NamedTuple, Optional, Sequence
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9']+")
+
+# Model file: MAGIC, uint32 header length, JSON header, padding to 8 bytes,
+# float32 weights [n_features x n_classes] then float32 bias [n_classes], little-endian
+MODEL_MAGIC = b"AITPCM1\n"
+HEADER_LENGTH = struct.Struct("<I")
+
+
+class Decision(NamedTuple):
+    """A local classification and the stage that produced it."""
+    category: str
+    confidence: float
+    stage: str
+
+
+def hashed_features(ticket_text: str, bits: int = 18, ngram: int = 2) -> list[int]:
+    """
+    Feature indices for a ticket: hashed word unigrams up to `ngram`-grams.
+
+    Features are binary (each index appears once) and hashed with CRC-32,
+    so training and serving agree without storing a vocabulary.
+    """
+    mask = (1 << bits) - 1
+    tokens = TOKEN_PATTERN.findall(ticket_text.lower())
+    grams = set(tokens)
+    for n in range(2, ngram + 1):
+        grams.update(" ".join(tokens[i:i + n]) for i in range(len(tokens) - n + 1))
+    return sorted({zlib.crc32(gram.encode("utf-8")) & mask for gram in grams})
+
+
+# --- Rules ---
+
+class RuleSet:
+    """Keyword/regex rules; each category's patterns are compiled into one regex."""
+
+    def __init__(self, rules: Iterable[dict]):
+        self.rules = []
+        for rule in rules:
+            patterns = rule.get("patterns", [])
+            if not patterns:
+                continue
+            combined = re.compile("|".join(f"(?:{p})" for p in patterns), re.IGNORECASE)
+            self.rules.append((rule["ticket_type"], float(rule.get("confidence", 0.95)), combined))
+
+    def match(self, ticket_text: str) -> Optional[tuple[str, float]]:
+        """The single category whose rules match, or None when none or several do."""
+        matched = {}
+        for category, confidence, pattern in self.rules:
+            if pattern.search(ticket_text):
+                matched[category] = max(confidence, matched.get(category, 0.0))
+        if len(matched) != 1:
+            return None
+        return next(iter(matched.items()))
+
+
+# --- Linear model ---
+
+class HashedLinearModel:
+    """
+    Multinomial logistic regression over `hashed_features`.
+
+    Weights live in a flat float32 buffer (row per feature, column per class),
+    normally a read-only memory map of the model file, so loading costs a
+    header parse regardless of model size.
+    """
+
+    def __init__(self, classes: Sequence[str], weights, bias, bits: int = 18, ngram: int = 2,
+                 metadata: Optional[dict] = None):
+        self.classes = list(classes)
+        self.weights = weights
+        # Stored as float32, so keep in-memory and loaded models identical
+        self.bias = list(array("f", bias))
+        self.bits = bits
+        self.ngram = ngram
+        self.metadata = metadata or {}
+        self._mmap = None
+        if len(weights) != (1 << bits) * len(self.classes):
+            raise ValueError("weights do not match bits x classes")
+
+    def scores(self, ticket_text: str) -> list[float]:
+        features = hashed_features(ticket_text, self.bits, self.ngram)
+        scores = list(self.bias)
+        if not features:
+            return scores
+        # Binary features, L2-normalized per ticket
+        scale = 1.0 / math.sqrt(len(features))
+        width = len(self.classes)
+        weights = self.weights
+        for feature in features:
+            row = feature * width
+            for j in range(width):
+                scores[j] += weights[row + j] * scale
+        return scores
+
+    def predict(self, ticket_text: str) -> tuple[str, float]:
+        """Most likely class and its softmax probability."""
+        scores = self.scores(ticket_text)
+        top = max(range(len(scores)), key=scores.__getitem__)
+        total = sum(math.exp(s - scores[top]) for s in scores)
+        return self.classes[top], 1.0 / total
+
+    def save(self, path: Path):
+        header = json.dumps({
+            "classes": self.classes, "bits": self.bits, "ngram": self.ngram, "metadata": self.metadata,
+        }).encode("utf-8")
+        prefix = MODEL_MAGIC + HEADER_LENGTH.pack(len(header)) + header
+        padding = b"\0" * (-len(prefix) % 8)
+        weights = array("f", self.weights)
+        bias = array("f", self.bias)
+        if sys.byteorder != "little":
+            weights.byteswap()
+            bias.byteswap()
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(path.name + ".tmp")
+        with tmp_path.open("wb") as f:
+            f.write(prefix + padding)
+            weights.tofile(f)
+            bias.tofile(f)
+        tmp_path.replace(path)
+
+    @classmethod
+    def load(cls, path: Path) -> "HashedLinearModel":
+        with open(path, "rb") as f:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if mapped[:len(MODEL_MAGIC)] != MODEL_MAGIC:
+            mapped.close()
+            raise ValueError(f"{path} is not a pre-classifier model file")
+        start = len(MODEL_MAGIC) + HEADER_LENGTH.size
+        (header_length,) = HEADER_LENGTH.unpack_from(mapped, len(MODEL_MAGIC))
+        header = json.loads(mapped[start:start + header_length])
+        offset = start + header_length
+        offset += -offset % 8
+        count = (1 << header["bits"]) * len(header["classes"])
+        if sys.byteorder == "little":
+            weights = memoryview(mapped)[offset:offset + count * 4].cast("f")
+        else:
+            weights = array("f", mapped[offset:offset + count * 4])
+            weights.byteswap()
+        bias = array("f", mapped[offset + count * 4:offset + (count + len(header["classes"])) * 4])
+        if sys.byteorder != "little":
+            bias.byteswap()
+        model = cls(header["classes"], weights, bias, header["bits"], header["ngram"], header.get("metadata"))
+        model._mmap = mapped
+        return model
+
+
+# --- Pipeline ---
+
+class PreClassifier:
+    """
+    Rules, then the optional model; returns a Decision only at or above `threshold`.
+
+    Args:
+        rules: RuleSet (may be empty).
+        model: HashedLinearModel, or None to use rules only.
+        threshold: Minimum confidence for a local answer.
+    """
+
+    def __init__(self, rules: RuleSet, model: Optional[HashedLinearModel] = None, threshold: float = 0.9):
+        self.rules = rules
+        self.model = model
+        self.threshold = threshold
+        self.stats = Counter()
+
+    def classify(self, ticket_text: str, ticket_types: Sequence[str]) -> Optional[Decision]:
+        """Local answer for the ticket, or None to send it to the LLM."""
+        decision = None
+        matched = self.rules.match(ticket_text)
+        if matched is not None:
+            decision = Decision(matched[0], matched[1], "rules")
+        elif self.model is not None:
+            decision = Decision(*self.model.predict(ticket_text), "model")
+
+        if (decision is None or decision.confidence < self.threshold
+                or decision.category == "unknown" or decision.category not in ticket_types):
+            self.stats["deferred"] += 1
+            return None
+        self.stats[decision.stage] += 1
+        return decision
+
+
+def build_preclassifier(settings: dict, project_root: Path) -> Optional[PreClassifier]:
+    """Creates the pre-classifier from the `preclassifier` section of scope.yaml (or None)."""
+    if not settings.get("enabled", False):
+        return None
+    model = None
+    model_path = settings.get("model_path")
+    if model_path:
+        path = Path(model_path)
+        if not path.is_absolute():
+            path = project_root / path
+        try:
+            model = HashedLinearModel.load(path)
+        except FileNotFoundError:
+            print(f"Warning: pre-classifier model {path} not found; using rules only", file=sys.stderr)
+        except (OSError, ValueError) as e:
+            print(f"Error: could not load pre-classifier model {path}: {e}", file=sys.stderr)
+    return PreClassifier(RuleSet(settings.get("rules", [])), model, float(settings.get("threshold", 0.9)))
@@ -0,0 +1,116 @@
+"""
+Prompt Registry
+Loads prompt templates once, keeps their rendered text in memory and picks up
+edits to the template files without a restart.
+
+Each template carries a short content hash (`version`) that caches and audit
+logs record, so a classification can always be traced to the exact prompt
+that produced it.
+"""
+import hashlib
+import os
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable
+
+# Rendered prompts kept per template before the memo is reset
+MAX_RENDERED = 256
+
+
+@dataclass(frozen=True)
+class PromptTemplate:
+    """One loaded template file and the identity of the bytes it was read from."""
+    name: str
+    text: str
+    version: str
+    mtime_ns: int
+    size: int
+
+
+def _load_template(name: str, path: Path) -> PromptTemplate:
+    data = path.read_bytes()
+    stat = path.stat()
+    return PromptTemplate(
+        name=name,
+        text=data.decode("utf-8"),
+        version=hashlib.sha256(data).hexdigest()[:12],
+        mtime_ns=stat.st_mtime_ns,
+        size=stat.st_size,
+    )
+
+
+class PromptRegistry:
+    """
+    Serves templates from `directory` (`<name>.txt`) out of memory.
+
+    The file is stat()-ed at most once every `check_interval` seconds; when
+    its mtime or size changes the template is re-read and everything
+    rendered from the old version is dropped.
+    """
+
+    def __init__(self, directory: Path, check_interval: float = 2.0,
+                 clock: Callable[[], float] = time.monotonic):
+        self.directory = Path(directory)
+        self.check_interval = check_interval
+        self.clock = clock
+        self._templates = {}
+        self._checked_at = {}
+        self._rendered = {}
+        self._lock = threading.Lock()
+
+    def path_for(self, name: str) -> Path:
+        return self.directory / f"{name}.txt"
+
+    def get(self, name: str) -> PromptTemplate:
+        """Returns the current template, reloading it if the file changed."""
+        template = self._templates.get(name)
+        now = self.clock()
+        if template is not None and now - self._checked_at[name] < self.check_interval:
+            return template
+
+        with self._lock:
+            template = self._templates.get(name)
+            path = self.path_for(name)
+            if template is None:
+                template = _load_template(name, path)
+            else:
+                try:
+                    stat = os.stat(path)
+                except FileNotFoundError:
+                    # Keep serving the last good template if the file is mid-replace
+                    stat = None
+                if stat and (stat.st_mtime_ns, stat.st_size) != (template.mtime_ns, template.size):
+                    template = _load_template(name, path)
+            if self._templates.get(name) is not template:
+                self._templates[name] = template
+                self._rendered.pop(name, None)
+            self._checked_at[name] = now
+            return template
+
+    def version(self, *names: str) -> str:
+        """Version hash of one template, or a combined hash over several."""
+        if len(names) == 1:
+            return self.get(names[0]).version
+        combined = "\x1f".join(self.get(name).version for name in names)
+        return hashlib.sha256(combined.encode("utf-8")).hexdigest()[:12]
+
+    def render(self, name: str, **fields) -> str:
+        """
+        Formats a template, memoizing the result per template version.
+
+        Tuple fields are rendered as comma-separated lists, which is how the
+        prompts list the allowed categories. Field values must be hashable.
+        """
+        template = self.get(name)
+        key = (template.version, *sorted(fields.items()))
+        rendered = self._rendered.setdefault(name, {})
+        text = rendered.get(key)
+        if text is None:
+            values = {k: ", ".join(v) if isinstance(v, tuple) else v for k, v in fields.items()}
+            text = template.text.format(**values)
+            if len(rendered) >= MAX_RENDERED:
+                rendered.clear()
+            rendered[key] = text
+        return text
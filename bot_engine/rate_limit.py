@@ -0,0 +1,340 @@
+"""
+Rate Limiting
+Client-side rate limiter and retry policy for Gemini calls.
+
+Every call reserves capacity from token buckets (requests/minute and
+tokens/minute) shared by all threads and asyncio tasks in the process.
+Quota (429) and server (5xx) errors are retried with exponential backoff and
+full jitter. Each 429 also halves the request rate, which then creeps back
+up with every success (AIMD), so the limiter learns the real quota even when
+none is configured. When a call would have to wait longer than
+`max_queue_wait`, or the quota stays exhausted after every retry, the call
+is shed with LoadShedError instead of becoming an `unknown` fallback.
+"""
+import asyncio
+import random
+import re
+import threading
+import time
+from collections import deque
+from dataclasses import asdict, dataclass
+from typing import Any, Awaitable, Callable, Optional
+
+# HTTP status codes worth retrying: quota exhausted and transient server errors
+RETRYABLE_STATUS = frozenset({429, 500, 502, 503, 504})
+THROTTLED_STATUS = 429
+
+
+class LoadShedError(RuntimeError):
+    """Raised when a call is refused because the API quota cannot absorb it."""
+
+    def __init__(self, message: str, retry_after: float = 1.0):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+def error_status(error: BaseException) -> Optional[int]:
+    """HTTP status of an SDK error (`google.genai.errors.APIError.code`), if any."""
+    code = getattr(error, "code", None)
+    return code if isinstance(code, int) else None
+
+
+def retry_delay_hint(error: BaseException) -> Optional[float]:
+    """Server-suggested delay from a RetryInfo detail (e.g. `"retryDelay": "23s"`)."""
+    details = getattr(error, "details", None)
+    if isinstance(details, dict):
+        details = details.get("error", details).get("details")
+    for detail in details if isinstance(details, list) else []:
+        if isinstance(detail, dict):
+            match = re.fullmatch(r"(\d+(?:\.\d+)?)s", str(detail.get("retryDelay", "")))
+            if match:
+                return float(match.group(1))
+    return None
+
+
+def estimate_tokens(prompt: str, output_tokens: int = 64) -> int:
+    """Rough token cost of a call: ~4 characters per prompt token plus the answer."""
+    return len(prompt) // 4 + output_tokens
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket that hands out reservations.
+
+    `reserve` debits the bucket immediately (it may go negative) and returns
+    how long the caller must wait, so the same bucket serves threads
+    (time.sleep) and asyncio tasks (asyncio.sleep) alike.
+    """
+
+    def __init__(self, rate: float, capacity: float, clock: Callable[[], float] = time.monotonic):
+        if rate <= 0 or capacity <= 0:
+            raise ValueError("rate and capacity must be positive")
+        self.rate = rate
+        self.capacity = capacity
+        self.clock = clock
+        self._level = capacity
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        now = self.clock()
+        self._level = min(self.capacity, self._level + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def reserve(self, amount: float, max_wait: Optional[float] = None) -> Optional[float]:
+        """Takes `amount` and returns the wait in seconds, or None if it would exceed `max_wait`."""
+        with self._lock:
+            self._refill()
+            wait = max(0.0, (amount - self._level) / self.rate)
+            if max_wait is not None and wait > max_wait:
+                return None
+            self._level -= amount
+            return wait
+
+    def refund(self, amount: float):
+        with self._lock:
+            self._level = min(self.capacity, self._level + amount)
+
+    def set_rate(self, rate: float, capacity: float):
+        with self._lock:
+            self._refill()
+            self.rate = rate
+            self.capacity = capacity
+            self._level = min(self._level, capacity)
+
+
+@dataclass
+class RateLimitStats:
+    """Counters separating time spent waiting for capacity from time spent in the API."""
+    requests: int = 0
+    retries: int = 0
+    throttled: int = 0
+    shed: int = 0
+    queue_wait_seconds: float = 0.0
+    max_queue_wait_seconds: float = 0.0
+    backoff_seconds: float = 0.0
+    api_seconds: float = 0.0
+
+    def as_dict(self) -> dict:
+        return asdict(self)
+
+
+class RateLimiter:
+    """
+    Shared rate limiter plus retry policy around a single API call.
+
+    Args:
+        requests_per_minute: Request quota; 0 means unknown until the first
+            429, after which the limiter works from the observed rate.
+        tokens_per_minute: Token quota; 0 disables the token bucket.
+        burst_seconds: Bucket capacity, in seconds' worth of quota.
+        max_retries: Retries for a retryable error before giving up.
+        base_delay, max_delay: Exponential backoff range in seconds.
+        max_queue_wait: Longest a call may wait for capacity before it is shed.
+        adaptive: Learn the request rate from 429s (AIMD).
+        increase_per_success: Requests/minute added back after each success.
+    """
+
+    def __init__(self, requests_per_minute: float = 0, tokens_per_minute: float = 0,
+                 burst_seconds: float = 1.0, max_retries: int = 4, base_delay: float = 0.5,
+                 max_delay: float = 30.0, max_queue_wait: float = 30.0, adaptive: bool = True,
+                 min_requests_per_minute: float = 1.0, increase_per_success: float = 0.1,
+                 clock: Callable[[], float] = time.monotonic,
+                 sleep: Callable[[float], Any] = time.sleep,
+                 jitter: Callable[[], float] = random.random):
+        self.ceiling_rpm = float(requests_per_minute) or None
+        self.requests_per_minute = self.ceiling_rpm
+        self.burst_seconds = burst_seconds
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.max_queue_wait = max_queue_wait
+        self.adaptive = adaptive
+        self.min_requests_per_minute = min_requests_per_minute
+        self.increase_per_success = increase_per_success
+        self.clock = clock
+        self.sleep = sleep
+        self.jitter = jitter
+        self.stats = RateLimitStats()
+        self._lock = threading.Lock()
+        self._requests = self._bucket(self.requests_per_minute)
+        self._tokens = self._bucket(float(tokens_per_minute) or None)
+        self._recent = deque()
+        self._last_decrease = float("-inf")
+
+    def _bucket(self, per_minute: Optional[float]) -> Optional[TokenBucket]:
+        if per_minute is None:
+            return None
+        rate = per_minute / 60.0
+        return TokenBucket(rate, max(1.0, rate * self.burst_seconds), self.clock)
+
+    # --- Capacity ---
+
+    def _reserve(self, tokens: int) -> float:
+        """Reserves one request plus `tokens`; returns the wait or sheds the call."""
+        with self._lock:
+            buckets = [(self._requests, 1), (self._tokens, tokens)]
+        wait = 0.0
+        taken = []
+        for bucket, amount in buckets:
+            if bucket is None:
+                continue
+            bucket_wait = bucket.reserve(amount, self.max_queue_wait)
+            if bucket_wait is None:
+                for reserved, reserved_amount in taken:
+                    reserved.refund(reserved_amount)
+                with self._lock:
+                    self.stats.shed += 1
+                raise LoadShedError(
+                    f"Rate limit reached: a Gemini call would wait more than {self.max_queue_wait}s",
+                    retry_after=self.max_queue_wait,
+                )
+            taken.append((bucket, amount))
+            wait = max(wait, bucket_wait)
+
+        with self._lock:
+            now = self.clock()
+            self.stats.requests += 1
+            self.stats.queue_wait_seconds += wait
+            self.stats.max_queue_wait_seconds = max(self.stats.max_queue_wait_seconds, wait)
+            self._recent.append(now + wait)
+            while self._recent and self._recent[0] < now - 60.0:
+                self._recent.popleft()
+        return wait
+
+    def _observed_rpm(self, now: float) -> float:
+        if not self._recent:
+            return self.min_requests_per_minute
+        window = max(1.0, min(60.0, now - self._recent[0]))
+        return len(self._recent) * 60.0 / window
+
+    def _set_rate(self, requests_per_minute: float):
+        self.requests_per_minute = requests_per_minute
+        rate = requests_per_minute / 60.0
+        capacity = max(1.0, rate * self.burst_seconds)
+        if self._requests is None:
+            self._requests = TokenBucket(rate, capacity, self.clock)
+            # Start empty so the first calls after a 429 are paced too
+            self._requests.reserve(capacity)
+        else:
+            self._requests.set_rate(rate, capacity)
+
+    # --- Feedback ---
+
+    def _on_throttled(self):
+        """Multiplicative decrease, at most once per second so one burst of 429s counts once."""
+        with self._lock:
+            self.stats.throttled += 1
+            now = self.clock()
+            if not self.adaptive or now - self._last_decrease < 1.0:
+                return
+            self._last_decrease = now
+            current = min(self.requests_per_minute or float("inf"), self._observed_rpm(now))
+            self._set_rate(max(self.min_requests_per_minute, current / 2))
+
+    def _on_success(self):
+        """Additive increase back towards the configured quota."""
+        with self._lock:
+            if not self.adaptive or self.requests_per_minute is None:
+                return
+            rate = self.requests_per_minute + self.increase_per_success
+            if self.ceiling_rpm is not None:
+                rate = min(rate, self.ceiling_rpm)
+            if rate != self.requests_per_minute:
+                self._set_rate(rate)
+
+    def _record_api_time(self, started: float):
+        with self._lock:
+            self.stats.api_seconds += self.clock() - started
+
+    def _retry_delay(self, error: BaseException, attempt: int) -> Optional[float]:
+        """Backoff before the next attempt, None if `error` should propagate, or LoadShedError."""
+        status = error_status(error)
+        if status not in RETRYABLE_STATUS:
+            return None
+        if status == THROTTLED_STATUS:
+            self._on_throttled()
+        hint = retry_delay_hint(error)
+        if attempt >= self.max_retries:
+            if status != THROTTLED_STATUS:
+                return None
+            with self._lock:
+                self.stats.shed += 1
+            raise LoadShedError(
+                f"Gemini quota still exhausted after {self.max_retries} retries",
+                retry_after=hint or self.max_delay,
+            ) from error
+        delay = self.jitter() * min(self.max_delay, self.base_delay * 2 ** attempt)
+        if hint is not None:
+            delay = max(delay, min(hint, self.max_delay))
+        with self._lock:
+            self.stats.retries += 1
+            self.stats.backoff_seconds += delay
+        return delay
+
+    # --- Calls ---
+
+    def call(self, request: Callable[[], Any], tokens: int = 0) -> Any:
+        """Runs `request()` within the limits, retrying retryable errors."""
+        attempt = 0
+        while True:
+            wait = self._reserve(tokens)
+            if wait:
+                self.sleep(wait)
+            started = self.clock()
+            try:
+                result = request()
+            except Exception as e:
+                self._record_api_time(started)
+                delay = self._retry_delay(e, attempt)
+                if delay is None:
+                    raise
+                attempt += 1
+                self.sleep(delay)
+                continue
+            self._record_api_time(started)
+            self._on_success()
+            return result
+
+    async def call_async(self, request: Callable[[], Awaitable[Any]], tokens: int = 0) -> Any:
+        """Async counterpart of `call`; waits with asyncio.sleep instead of blocking."""
+        attempt = 0
+        while True:
+            wait = self._reserve(tokens)
+            if wait:
+                await asyncio.sleep(wait)
+            started = self.clock()
+            try:
+                result = await request()
+            except Exception as e:
+                self._record_api_time(started)
+                delay = self._retry_delay(e, attempt)
+                if delay is None:
+                    raise
+                attempt += 1
+                await asyncio.sleep(delay)
+                continue
+            self._record_api_time(started)
+            self._on_success()
+            return result
+
+    def snapshot(self) -> dict:
+        """Current learned rate plus counters, for health endpoints and logs."""
+        with self._lock:
+            return {"requests_per_minute": self.requests_per_minute, **self.stats.as_dict()}
+
+
+def build_rate_limiter(settings: dict) -> Optional[RateLimiter]:
+    """Creates the limiter described by the `rate_limit` section of scope.yaml (or None)."""
+    if not settings.get("enabled", True):
+        return None
+    return RateLimiter(
+        requests_per_minute=float(settings.get("requests_per_minute", 0)),
+        tokens_per_minute=float(settings.get("tokens_per_minute", 0)),
+        burst_seconds=float(settings.get("burst_seconds", 1.0)),
+        max_retries=int(settings.get("max_retries", 4)),
+        base_delay=float(settings.get("base_delay", 0.5)),
+        max_delay=float(settings.get("max_delay", 30.0)),
+        max_queue_wait=float(settings.get("max_queue_wait", 30.0)),
+        adaptive=bool(settings.get("adaptive", True)),
+    )
@@ -1,12 +1,21 @@
+import asyncio
 import json
 import os
-import yaml
+import threading
 from pathlib import Path
-from dotenv import load_dotenv
-from google import genai
-from google.genai import types
 from risk_controls.pii_filters import contains_pii
+from governance import audit_log
 from datetime import datetime, timezone
+from time import perf_counter_ns
+from typing import AsyncIterator, Iterable, Optional
+from .cache import build_cache, make_cache_key
+from .circuit_breaker import CircuitOpenError, build_circuit_breaker
+from .config import ConfigSnapshot, ConfigStore
+from .metrics import REGISTRY as metrics_registry
+from .near_duplicate import build_near_duplicate_index
+from .preclassifier import build_preclassifier
+from .prompt_registry import PromptRegistry
+from .rate_limit import LoadShedError, build_rate_limiter, estimate_tokens
 
 # --- Configuration Loading ---
 
@@ -14,84 +23,401 @@ def get_project_root() -> Path:
     """Returns the project root directory."""
     return Path(__file__).parent.parent
 
+# Validated snapshots of scope.yaml; an edited file is picked up without a restart
+config_store = ConfigStore(
+    get_project_root() / "governance" / "config" / "scope.yaml",
+    cache_path=get_project_root() / "governance" / "cache" / "scope.snapshot.json",
+)
+
 def load_config():
-    """Loads the main configuration from the YAML file."""
-    config_path = get_project_root() / "governance" / "config" / "scope.yaml"
-    with config_path.open("r") as f:
-        return yaml.safe_load(f)
+    """Returns the current configuration (read-only mappings) from the YAML file."""
+    return config_store.current().data
+
+def apply_config(snapshot: ConfigSnapshot):
+    """
+    Points the module settings at `snapshot`. Only the categories, threshold,
+    model, timeouts and escalation rules follow reloads; the cache, rate limiter, circuit breaker
+    and other components keep the settings they were built with.
+    """
+    global config, bot_config, TICKET_TYPES, CONFIDENCE_THRESHOLD, MODEL_NAME
+    global REQUEST_TIMEOUT_SECONDS, escalation_policy, _categories, _applied_snapshot
+    config = snapshot.data
+    bot_config = snapshot.section("bot_config")
+    TICKET_TYPES = snapshot.ticket_types
+    _categories = (snapshot.ticket_types, snapshot.categories)
+    CONFIDENCE_THRESHOLD = snapshot.confidence_threshold
+    MODEL_NAME = snapshot.model_name
+    REQUEST_TIMEOUT_SECONDS = snapshot.request_timeout_seconds
+    escalation_policy = snapshot.escalation
+    _applied_snapshot = snapshot
+
+def refresh_config():
+    """Applies a changed scope.yaml; costs a clock read unless a check is due."""
+    snapshot = config_store.current()
+    if snapshot is not _applied_snapshot:
+        apply_config(snapshot)
 
-# Load configuration and environment variables
-config = load_config()
-bot_config = config.get("bot_config", {})
-TICKET_TYPES = config.get("ticket_types", [])
-CONFIDENCE_THRESHOLD = bot_config.get("confidence_threshold", 0.5)
-MODEL_NAME = bot_config.get("model_name", "gemini-1.5-flash")
+def ticket_categories() -> frozenset:
+    """TICKET_TYPES as a frozenset for membership tests, rebuilt only when TICKET_TYPES is replaced."""
+    global _categories
+    source, categories = _categories
+    if source is not TICKET_TYPES:
+        categories = frozenset(TICKET_TYPES)
+        _categories = (TICKET_TYPES, categories)
+    return categories
 
-load_dotenv(get_project_root() / ".env")
+apply_config(config_store.current())
+
+# Audit entries are written by a shared background writer (see governance/audit_log.py)
+audit_log.configure(**config.get("audit_log", {}))
 
 # --- Gemini API Initialization ---
 
-try:
-    client = genai.Client(api_key=os.getenv("GEMINI_API_KEY"))
-except (TypeError, ValueError) as e:
-    print(f"Error: Gemini API key not configured. Please set GEMINI_API_KEY in a .env file. Details: {e}")
-    client = None
+# google.genai takes most of a second to import, so the SDK, .env and the client
+# are loaded on the first LLM call (see get_client). Tests and tools assign a
+# fake to `client` directly.
+client = None
+_client_created = False
+_client_lock = threading.Lock()
+
+def create_client():
+    """Loads .env and builds the Gemini client, or returns None if no API key is configured."""
+    from dotenv import load_dotenv
+    from google import genai
+    from google.genai import types
+
+    load_dotenv(get_project_root() / ".env")
+    try:
+        return genai.Client(
+            api_key=os.getenv("GEMINI_API_KEY"),
+            http_options=types.HttpOptions(timeout=int(REQUEST_TIMEOUT_SECONDS * 1000)),
+        )
+    except (TypeError, ValueError) as e:
+        print(f"Error: Gemini API key not configured. Please set GEMINI_API_KEY in a .env file. Details: {e}")
+        return None
+
+def get_client():
+    """Returns the Gemini client, creating it once on first use (None if it cannot be created)."""
+    global client, _client_created
+    if client is None and not _client_created:
+        with _client_lock:
+            if client is None and not _client_created:
+                client = create_client()
+                _client_created = True
+    return client
+
+# Shared by every thread and task in the process (see bot_engine/rate_limit.py)
+rate_limiter = build_rate_limiter(config.get("rate_limit", {}))
+
+# Fails fast while Gemini is down; quota shedding says nothing about API health
+breaker_config = config.get("circuit_breaker", {})
+circuit_breaker = build_circuit_breaker(breaker_config, ignore=(LoadShedError,))
+DEGRADED_RESULT = breaker_config.get("degraded", {"ticket_type": "unknown", "route": "support_queue"})
+
+# --- Prompt Templates ---
+
+PROMPT_NAMES = ("classification_prompt", "batch_classification_prompt")
+
+prompt_registry = PromptRegistry(
+    get_project_root() / "prompts",
+    check_interval=bot_config.get("prompt_reload_seconds", 2.0),
+)
+
+def prompt_template_version() -> str:
+    """Returns the combined content hash of the prompt templates in use."""
+    return prompt_registry.version(*PROMPT_NAMES)
+
+def audit_prompt_version() -> Optional[str]:
+    """Prompt version for audit entries; None if the templates cannot be read."""
+    try:
+        return prompt_template_version()
+    except OSError:
+        return None
+
+# --- Classification Cache ---
+
+cache = build_cache(config.get("cache", {}), get_project_root())
+
+def classification_cache_key(ticket_text: str) -> str:
+    """Cache key for a ticket under the current model, prompt template and categories."""
+    return make_cache_key(ticket_text, MODEL_NAME, prompt_template_version(), TICKET_TYPES)
+
+def lookup_cached(ticket_text: str) -> Optional[tuple[str, float]]:
+    """Returns a cached (category, confidence) for the ticket, if any."""
+    if cache is None:
+        return None
+    return cache.get(classification_cache_key(ticket_text))
+
+def store_cached(ticket_text: str, category: str, confidence: float):
+    """
+    Caches a validated LLM classification. Failed calls are never cached, and
+    neither are zero-confidence answers (process_llm_response turns an invalid
+    category into unknown/0.0), so one bad answer is retried next time.
+    """
+    if confidence <= 0.0:
+        return
+    if cache is not None:
+        cache.set(classification_cache_key(ticket_text), (category, confidence))
+    if near_duplicates is not None:
+        near_duplicates.add(ticket_text, category, confidence, classification_context())
+
+# --- Near-duplicate Reuse ---
+
+# Reworded repeats of a recent confident ticket reuse its classification
+near_duplicates = build_near_duplicate_index(config.get("near_duplicates", {}))
+
+def classification_context() -> str:
+    """Model, prompt template and categories a near-duplicate must share to be reused."""
+    return "|".join([MODEL_NAME, prompt_template_version(), *TICKET_TYPES])
+
+def lookup_near_duplicate(ticket_text: str) -> Optional[dict]:
+    """Finalized result reused from a similar recent ticket, with its provenance, if any."""
+    if near_duplicates is None:
+        return None
+    match = near_duplicates.lookup(ticket_text, classification_context())
+    if match is None:
+        return None
+    return finalize_result(ticket_text, match.category, match.confidence,
+                           extra={"near_duplicate": match.provenance()}, stage="near_duplicate")
+
+# --- Local Pre-classifier ---
+
+# Rules and an optional hashed linear model that answer easy tickets without Gemini
+preclassifier = build_preclassifier(config.get("preclassifier", {}), get_project_root())
+
+def local_result(ticket_text: str) -> Optional[dict]:
+    """Finalized result from the pre-classifier, the cache or a near-duplicate, or None if the LLM is needed."""
+    if preclassifier is not None:
+        decision = preclassifier.classify(ticket_text, TICKET_TYPES)
+        if decision is not None:
+            return finalize_result(ticket_text, decision.category, decision.confidence, stage=decision.stage)
+
+    cached = lookup_cached(ticket_text)
+    if cached is not None:
+        return finalize_result(ticket_text, *cached, stage="cache")
+    return lookup_near_duplicate(ticket_text)
+
+# --- Metrics ---
+
+# Per-stage latency (see bot_engine/metrics.py); GET /metrics on the service exports them
+STAGE_TIMERS = {
+    stage: metrics_registry.histogram(
+        "triage_stage_seconds", "Time spent in each classification stage", stage=stage)
+    for stage in ("prompt_build", "llm_call", "response_parse", "pii_scan", "logging")
+}
+LLM_ERRORS = metrics_registry.counter("triage_llm_errors_total", "LLM calls that failed or returned invalid output")
+_result_counters = {}
+
+def count_result(result: dict) -> dict:
+    """Counts a finished result by decision stage and route."""
+    key = (result.get("decision_stage"), result.get("route"))
+    counter = _result_counters.get(key)
+    if counter is None:
+        counter = _result_counters[key] = metrics_registry.counter(
+            "triage_results_total", "Classification results by decision stage and route",
+            decision_stage=key[0], route=key[1] or "")
+    counter.inc()
+    return result
 
 # --- Core Functions ---
 
+# The SDK accepts a plain dict, which keeps google.genai.types off the import path
+GENERATION_CONFIG = {"temperature": 0.1}
+
 def prepare_prompt(ticket_text: str) -> str:
-    """Loads the prompt template and formats it with categories and the ticket text."""
-    prompt_path = get_project_root() / "prompts" / "classification_prompt.txt"
-    with prompt_path.open("r") as f:
-        prompt_template = f.read()
+    """Formats the cached prompt prefix (template plus categories) with the ticket text."""
+    start = perf_counter_ns()
+    prefix = prompt_registry.render("classification_prompt", categories=tuple(TICKET_TYPES))
+    prompt = f"{prefix}\n\nTicket: {ticket_text}"
+    STAGE_TIMERS["prompt_build"].observe_ns(perf_counter_ns() - start)
+    return prompt
 
-    categories_str = ", ".join(TICKET_TYPES)
-    return f"{prompt_template.format(categories=categories_str)}\n\nTicket: {ticket_text}"
+def prepare_batch_prompt(ticket_texts: list[str]) -> str:
+    """Formats several tickets into one numbered prompt so they share a single LLM call."""
+    start = perf_counter_ns()
+    header = prompt_registry.render(
+        "batch_classification_prompt", categories=tuple(TICKET_TYPES), count=len(ticket_texts)
+    )
+    # Tickets are JSON-quoted so embedded newlines cannot break the numbering
+    numbered = "\n".join(f"[{i}] {json.dumps(text)}" for i, text in enumerate(ticket_texts, 1))
+    prompt = f"{header}\n\nTickets:\n{numbered}"
+    STAGE_TIMERS["prompt_build"].observe_ns(perf_counter_ns() - start)
+    return prompt
 
-def invoke_llm(prompt: str) -> dict:
-    """Invokes the Gemini model and returns the parsed JSON response."""
-    if not client:
+def generate_text(prompt: str) -> str:
+    """
+    Sends a prompt to the Gemini model and returns the raw response text.
+
+    The call goes through the shared rate limiter, which retries quota and
+    server errors and raises LoadShedError when the quota cannot absorb it,
+    and the circuit breaker, which raises CircuitOpenError while Gemini is down.
+    """
+    gemini = get_client()
+    if not gemini:
         raise ConnectionError("Gemini client is not initialized. Check API key.")
 
-    try:
-        response = client.models.generate_content(
+    def request():
+        return gemini.models.generate_content(
             model=MODEL_NAME,
             contents=prompt,
-            config=types.GenerateContentConfig(temperature=0.1)
+            config=GENERATION_CONFIG
         )
-        # Extract text from response
-        response_text = response.text
+
+    def limited_request():
+        if rate_limiter is None:
+            return request()
+        return rate_limiter.call(request, estimate_tokens(prompt))
+
+    start = perf_counter_ns()
+    try:
+        if circuit_breaker is None:
+            response = limited_request()
+        else:
+            response = circuit_breaker.call(limited_request)
+        return response.text
+    except (LoadShedError, CircuitOpenError):
+        raise
+    except Exception as e:
+        raise ConnectionError(f"API call to Gemini failed: {e}") from e
+    finally:
+        STAGE_TIMERS["llm_call"].observe_ns(perf_counter_ns() - start)
+
+def invoke_llm(prompt: str) -> dict:
+    """Invokes the Gemini model and returns the parsed JSON response."""
+    response_text = generate_text(prompt)
+    start = perf_counter_ns()
+    try:
         # Assuming response text is a JSON string
         return json.loads(response_text)
-    except json.JSONDecodeError as e:
+    except (TypeError, json.JSONDecodeError) as e:
         raise ValueError(f"LLM returned malformed JSON: {response_text}") from e
-    except Exception as e:
-        raise ConnectionError(f"API call to Gemini failed: {e}") from e
+    finally:
+        STAGE_TIMERS["response_parse"].observe_ns(perf_counter_ns() - start)
+
+def invoke_llm_batch(prompt: str) -> list:
+    """Invokes the Gemini model with a batch prompt and returns the parsed JSON array."""
+    result = invoke_llm(prompt)
+    if not isinstance(result, list):
+        raise ValueError(f"LLM returned {type(result).__name__} where a JSON array was expected")
+    return result
+
+def parse_batch_response(items: list, count: int) -> dict[int, dict]:
+    """
+    Maps a batch response back to ticket positions (1-based).
+
+    Entries with a missing, duplicate or out-of-range id are dropped so the
+    caller can retry just the tickets that were not answered.
+    """
+    answers = {}
+    duplicates = set()
+    for item in items:
+        if not isinstance(item, dict):
+            continue
+        ticket_id = item.get("id")
+        if isinstance(ticket_id, str) and ticket_id.isdigit():
+            ticket_id = int(ticket_id)
+        if not isinstance(ticket_id, int) or isinstance(ticket_id, bool) or not 1 <= ticket_id <= count:
+            continue
+        if ticket_id in answers:
+            duplicates.add(ticket_id)
+        answers[ticket_id] = item
+
+    for ticket_id in duplicates:
+        del answers[ticket_id]
+    return answers
 
 def process_llm_response(result: dict) -> tuple[str, float]:
     """Extracts and validates category and confidence from the LLM response."""
     category = result.get("category", "unknown")
     confidence = result.get("confidence", 0.0)
 
-    if category not in TICKET_TYPES:
+    if category not in ticket_categories():
         category = "unknown"
         confidence = 0.0 # Confidence is unreliable if category is invalid
 
     return category, float(confidence)
 
+def empty_ticket_result() -> dict:
+    """Result returned for blank tickets, which are never sent to the model."""
+    return count_result(escalation_policy.apply({
+        "ticket_type": "unknown",
+        "confidence_score": 0.0,
+        "contains_pii": False,
+        "model": MODEL_NAME,
+        "decision_stage": "empty"
+    }))
+
+def shed_result(ticket_text: str, error: LoadShedError) -> dict:
+    """
+    Result for a ticket in `classify_tickets` whose call the rate limiter
+    refused: `unknown` with decision_stage `shed` and the suggested
+    `retry_after`. It is recorded by `log_shed`, not logged as a fallback.
+    """
+    return count_result(escalation_policy.apply({
+        "ticket_type": "unknown",
+        "confidence_score": 0.0,
+        "contains_pii": contains_pii(ticket_text),
+        "model": MODEL_NAME,
+        "decision_stage": "shed",
+        "retry_after": error.retry_after
+    }))
+
+def finalize_result(ticket_text: str, category: str, confidence: float,
+                    extra: Optional[dict] = None, stage: str = "llm") -> dict:
+    """
+    Applies the governance layers (PII flag, escalation route, fallback logging)
+    to a classification.
+
+    `stage` records what decided it (llm, cache, near_duplicate, rules, model,
+    degraded) in the result and therefore in the audit log. `route` comes from
+    the compiled escalation_rules / fallback_protocol, unless `extra` sets it.
+    """
+    start = perf_counter_ns()
+    pii_flag = contains_pii(ticket_text)
+    STAGE_TIMERS["pii_scan"].observe_ns(perf_counter_ns() - start)
+
+    final_result = {
+        "ticket_type": category,
+        "confidence_score": round(confidence, 2),
+        "contains_pii": pii_flag,
+        "model": MODEL_NAME,
+        "decision_stage": stage,
+        **(extra or {})
+    }
+    escalation_policy.apply(final_result)
+
+    # Audit logging for low-confidence or failed classifications
+    if confidence < CONFIDENCE_THRESHOLD or category == "unknown":
+        log_fallback(ticket_text, final_result)
+
+    return count_result(final_result)
+
+def degraded_result(ticket_text: str) -> dict:
+    """
+    Result used while the circuit breaker is open, per the fallback_protocol:
+    the configured category (normally `unknown`) plus its route (normally
+    `support_queue`), flagged `degraded` and logged as a fallback.
+    """
+    category = DEGRADED_RESULT.get("ticket_type", "unknown")
+    if category not in ticket_categories():
+        category = "unknown"
+    extra = {"route": DEGRADED_RESULT.get("route", "support_queue"), "degraded": True}
+    return finalize_result(ticket_text, category, 0.0, extra, stage="degraded")
+
 def classify_ticket(ticket_text: str) -> dict:
     """
     Classifies a support ticket using the Gemini 2.5 Flash model with governance layers.
     
     Complies with ISO/IEC 42001:2023 requirements for AI system operation and monitoring.
+    While the circuit breaker is open the ticket gets `degraded_result` at once.
     """
+    refresh_config()
     if not ticket_text or ticket_text.isspace():
-        return {
-            "ticket_type": "unknown",
-            "confidence_score": 0.0,
-            "contains_pii": False,
-            "model": MODEL_NAME
-        }
+        return empty_ticket_result()
+
+    local = local_result(ticket_text)
+    if local is not None:
+        return local
 
     category = "unknown"
     confidence = 0.0
@@ -100,51 +426,281 @@ def classify_ticket(ticket_text: str) -> dict:
         prompt = prepare_prompt(ticket_text)
         llm_result = invoke_llm(prompt)
         category, confidence = process_llm_response(llm_result)
+        store_cached(ticket_text, category, confidence)
+    except LoadShedError as e:
+        # Shed calls are refused outright rather than logged as `unknown` fallbacks
+        log_shed(ticket_text, e)
+        raise
+    except CircuitOpenError:
+        return degraded_result(ticket_text)
     except (ConnectionError, ValueError) as e:
         log_llm_error(ticket_text, str(e))
     except Exception as e:
         # Catch-all for unexpected errors during the process
         log_llm_error(ticket_text, f"An unexpected error occurred: {e}")
 
-    # Apply governance layers
-    pii_flag = contains_pii(ticket_text)
-    
-    final_result = {
-        "ticket_type": category,
-        "confidence_score": round(confidence, 2),
-        "contains_pii": pii_flag,
-        "model": MODEL_NAME
-    }
+    return finalize_result(ticket_text, category, confidence)
 
-    # Audit logging for low-confidence or failed classifications
-    if confidence < CONFIDENCE_THRESHOLD or category == "unknown":
-        log_fallback(ticket_text, final_result)
+def classify_tickets(ticket_texts: list[str], batch_size: int = 20) -> list[dict]:
+    """
+    Classifies many tickets, packing up to `batch_size` of them into each LLM call.
+
+    Results are returned in input order and match what `classify_ticket` would
+    produce for each ticket: every answer goes through `process_llm_response`,
+    the PII filter and fallback/error logging individually. When the model
+    returns malformed or partial output, the unanswered tickets are retried in
+    smaller batches, down to single-ticket calls. Tickets whose call the rate
+    limiter sheds get `shed_result` while the other batches are still answered.
+    """
+    if batch_size < 1:
+        raise ValueError("batch_size must be at least 1")
 
-    return final_result
+    refresh_config()
+    results = [None] * len(ticket_texts)
+    pending = []
+    for index, ticket_text in enumerate(ticket_texts):
+        if not ticket_text or ticket_text.isspace():
+            results[index] = empty_ticket_result()
+            continue
+        local = local_result(ticket_text)
+        if local is not None:
+            results[index] = local
+        else:
+            pending.append(index)
+
+    for start in range(0, len(pending), batch_size):
+        _classify_batch(ticket_texts, pending[start:start + batch_size], results)
+
+    return results
+
+def _classify_batch(ticket_texts: list[str], indices: list[int], results: list):
+    """Classifies the tickets at `indices` in one call, splitting on bad output."""
+    if len(indices) == 1:
+        ticket_text = ticket_texts[indices[0]]
+        try:
+            results[indices[0]] = classify_ticket(ticket_text)
+        except LoadShedError as e:
+            # classify_ticket has already logged the shed ticket
+            results[indices[0]] = shed_result(ticket_text, e)
+        return
+
+    answers = {}
+    try:
+        prompt = prepare_batch_prompt([ticket_texts[i] for i in indices])
+        items = invoke_llm_batch(prompt)
+        answers = parse_batch_response(items, len(indices))
+    except ValueError:
+        # Malformed output: fall through and retry in smaller batches
+        pass
+    except LoadShedError as e:
+        for index in indices:
+            log_shed(ticket_texts[index], e)
+            results[index] = shed_result(ticket_texts[index], e)
+        return
+    except CircuitOpenError:
+        for index in indices:
+            results[index] = degraded_result(ticket_texts[index])
+        return
+    except ConnectionError as e:
+        # The API call itself failed, so every ticket in it gets the single-ticket fallback
+        for index in indices:
+            log_llm_error(ticket_texts[index], str(e))
+            results[index] = finalize_result(ticket_texts[index], "unknown", 0.0)
+        return
+
+    missing = []
+    for position, index in enumerate(indices, 1):
+        if position not in answers:
+            missing.append(index)
+            continue
+
+        ticket_text = ticket_texts[index]
+        category = "unknown"
+        confidence = 0.0
+        try:
+            category, confidence = process_llm_response(answers[position])
+            store_cached(ticket_text, category, confidence)
+        except (TypeError, ValueError) as e:
+            log_llm_error(ticket_text, f"LLM returned an invalid batch entry: {e}")
+        results[index] = finalize_result(ticket_text, category, confidence)
+
+    if not missing:
+        return
+    if len(missing) < len(indices):
+        _classify_batch(ticket_texts, missing, results)
+    else:
+        middle = len(missing) // 2
+        _classify_batch(ticket_texts, missing[:middle], results)
+        _classify_batch(ticket_texts, missing[middle:], results)
+
+# --- Async Classification ---
+
+async def generate_text_async(prompt: str) -> str:
+    """Async counterpart of `generate_text` using the SDK's `client.aio` interface."""
+    gemini = get_client()
+    if not gemini:
+        raise ConnectionError("Gemini client is not initialized. Check API key.")
+
+    def request():
+        return gemini.aio.models.generate_content(
+            model=MODEL_NAME,
+            contents=prompt,
+            config=GENERATION_CONFIG
+        )
+
+    def limited_request():
+        if rate_limiter is None:
+            return request()
+        return rate_limiter.call_async(request, estimate_tokens(prompt))
+
+    start = perf_counter_ns()
+    try:
+        if circuit_breaker is None:
+            response = await limited_request()
+        else:
+            response = await circuit_breaker.call_async(limited_request)
+        return response.text
+    except (LoadShedError, CircuitOpenError):
+        raise
+    except Exception as e:
+        raise ConnectionError(f"API call to Gemini failed: {e}") from e
+    finally:
+        STAGE_TIMERS["llm_call"].observe_ns(perf_counter_ns() - start)
+
+async def invoke_llm_async(prompt: str) -> dict:
+    """Async counterpart of `invoke_llm`."""
+    response_text = await generate_text_async(prompt)
+    start = perf_counter_ns()
+    try:
+        return json.loads(response_text)
+    except (TypeError, json.JSONDecodeError) as e:
+        raise ValueError(f"LLM returned malformed JSON: {response_text}") from e
+    finally:
+        STAGE_TIMERS["response_parse"].observe_ns(perf_counter_ns() - start)
+
+async def classify_ticket_async(
+    ticket_text: str,
+    timeout: Optional[float] = None,
+    semaphore: Optional[asyncio.Semaphore] = None,
+    degrade: bool = True,
+) -> dict:
+    """
+    Async counterpart of `classify_ticket`.
+
+    `timeout` bounds the LLM call in seconds; a ticket that misses it is logged
+    as an LLM error and falls back to `unknown`. When `semaphore` is given, the
+    LLM call only starts once a slot is free. Cancelling the task cancels the
+    in-flight request and logs nothing. With `degrade=False`, CircuitOpenError
+    is raised instead of returning (and logging) the degraded result.
+    """
+    refresh_config()
+    if not ticket_text or ticket_text.isspace():
+        return empty_ticket_result()
+
+    local = local_result(ticket_text)
+    if local is not None:
+        return local
+
+    category = "unknown"
+    confidence = 0.0
+
+    try:
+        prompt = prepare_prompt(ticket_text)
+        if semaphore is None:
+            llm_result = await asyncio.wait_for(invoke_llm_async(prompt), timeout)
+        else:
+            async with semaphore:
+                llm_result = await asyncio.wait_for(invoke_llm_async(prompt), timeout)
+        category, confidence = process_llm_response(llm_result)
+        store_cached(ticket_text, category, confidence)
+    except LoadShedError as e:
+        log_shed(ticket_text, e)
+        raise
+    except CircuitOpenError:
+        if not degrade:
+            raise
+        return degraded_result(ticket_text)
+    except asyncio.TimeoutError:
+        # The cancelled request was not counted by the breaker; a missed deadline is a failure
+        if circuit_breaker is not None:
+            circuit_breaker.record_failure()
+        log_llm_error(ticket_text, f"API call to Gemini exceeded the {timeout}s deadline")
+    except (ConnectionError, ValueError) as e:
+        log_llm_error(ticket_text, str(e))
+    except Exception as e:
+        log_llm_error(ticket_text, f"An unexpected error occurred: {e}")
+
+    return finalize_result(ticket_text, category, confidence)
+
+async def aclassify_many(
+    ticket_texts: Iterable[str],
+    concurrency: int = 32,
+    timeout: Optional[float] = 30.0,
+    semaphore: Optional[asyncio.Semaphore] = None,
+) -> AsyncIterator[tuple[int, dict]]:
+    """
+    Classifies tickets concurrently, yielding `(index, result)` as each one completes.
+
+    At most `concurrency` tickets are in flight at once; tickets are pulled
+    lazily from `ticket_texts`, so large iterators are never materialized.
+    Pass a shared `semaphore` to bound several callers together. Closing the
+    generator early cancels every ticket still in flight.
+    """
+    if concurrency < 1:
+        raise ValueError("concurrency must be at least 1")
+    if semaphore is None:
+        semaphore = asyncio.Semaphore(concurrency)
+
+    async def run(index: int, ticket_text: str) -> tuple[int, dict]:
+        return index, await classify_ticket_async(ticket_text, timeout=timeout, semaphore=semaphore)
+
+    tickets = enumerate(ticket_texts)
+    pending = set()
+    try:
+        while True:
+            for index, ticket_text in tickets:
+                pending.add(asyncio.ensure_future(run(index, ticket_text)))
+                if len(pending) >= concurrency:
+                    break
+            if not pending:
+                return
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                yield task.result()
+    finally:
+        for task in pending:
+            task.cancel()
 
 # --- Governance and Auditing ---
 
 def log_entry(log_path: Path, entry: dict):
-    """Appends a JSON entry to a specified log file."""
-    log_path.parent.mkdir(parents=True, exist_ok=True)
-    with log_path.open("a") as f:
-        f.write(json.dumps(entry) + "\n")
+    """Queues a JSON entry for the shared audit log writer to append to `log_path`."""
+    start = perf_counter_ns()
+    audit_log.append_jsonl(log_path, entry)
+    STAGE_TIMERS["logging"].observe_ns(perf_counter_ns() - start)
 
 def log_llm_error(ticket_text: str, error_msg: str):
     """Governance: Log when the AI model fails or returns an invalid response."""
+    LLM_ERRORS.inc()
     entry = {
         "error": error_msg,
         "ticket_preview": ticket_text[:100], # Log only a preview
+        "prompt_version": audit_prompt_version(),
         "timestamp": datetime.now(timezone.utc).isoformat()
     }
     log_path = get_project_root() / "governance" / "llm_error_log.jsonl"
     log_entry(log_path, entry)
 
+def log_shed(ticket_text: str, error: LoadShedError):
+    """Governance: Record a ticket the rate limiter refused, so shed tickets leave an audit trail."""
+    log_llm_error(ticket_text, f"shed: {error} (retry after {error.retry_after:.1f}s)")
+
 def log_fallback(ticket_text: str, result: dict):
     """Governance: Log low-confidence or unknown classifications for human review."""
     entry = {
         "ticket": ticket_text,
         "result": result,
+        "prompt_version": audit_prompt_version(),
         "timestamp": datetime.now(timezone.utc).isoformat()
     }
     log_path = get_project_root() / "fallback_log.jsonl"
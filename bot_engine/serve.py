@@ -0,0 +1,373 @@
+"""
+Classification Service
+Long-running worker process that keeps the Gemini client, configuration,
+prompt templates and cache warm, and classifies tickets submitted over a
+local HTTP endpoint or as JSONL on stdin.
+
+Tickets go through a bounded job queue into a pool of worker threads, each
+calling `router.classify_ticket`, so every ticket gets the same governance
+layers (PII flag, fallback and error logging) as a direct call. A full queue
+pushes back on producers: stdin reading pauses, and HTTP requests are
+answered with 503 and Retry-After rather than piling up in memory.
+
+Usage:
+    python -m bot_engine.serve --http 127.0.0.1:8080
+    python -m bot_engine.serve --stdin < tickets.jsonl > results.jsonl
+    python -m bot_engine.serve --http 127.0.0.1:8080 --fake   # no API calls
+"""
+import argparse
+import json
+import math
+import queue
+import signal
+import sys
+import threading
+from concurrent.futures import Future
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Optional, TextIO
+
+from governance import audit_log
+from . import router
+from .metrics import REGISTRY, build_reporter
+from .rate_limit import LoadShedError
+
+# Queue marker telling a worker thread to exit
+_STOP = object()
+
+
+class QueueFullError(RuntimeError):
+    """Raised when a ticket is submitted while the job queue is full."""
+
+
+class ClassificationService:
+    """
+    Bounded job queue feeding a pool of classification worker threads.
+
+    Args:
+        workers: Number of worker threads (concurrent LLM calls).
+        queue_size: Jobs that may wait for a worker before submit() blocks
+            or fails.
+        classify: Function applied to each ticket; defaults to
+            `router.classify_ticket`, looked up per call so tests can patch it.
+    """
+
+    def __init__(self, workers: int = 8, queue_size: int = 1000,
+                 classify: Optional[Callable[[str], dict]] = None):
+        if workers < 1:
+            raise ValueError("workers must be at least 1")
+        if queue_size < 1:
+            raise ValueError("queue_size must be at least 1")
+        self.workers = workers
+        self.classify = classify
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+        self.shed = 0
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._threads = []
+        self._lock = threading.Lock()
+        self._closed = False
+
+    def start(self) -> "ClassificationService":
+        for i in range(self.workers):
+            thread = threading.Thread(target=self._run, name=f"classify-worker-{i}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        return self
+
+    def submit(self, ticket_text: str, block: bool = True, timeout: Optional[float] = None) -> Future:
+        """
+        Queues a ticket and returns a Future for its result dict.
+
+        With `block=False` (or once `timeout` passes) a full queue raises
+        QueueFullError instead of waiting.
+        """
+        if self._closed:
+            raise RuntimeError("Classification service is closed")
+        future = Future()
+        try:
+            self._queue.put((ticket_text, future), block=block, timeout=timeout)
+        except queue.Full:
+            with self._lock:
+                self.rejected += 1
+            raise QueueFullError("Classification queue is full") from None
+        with self._lock:
+            self.submitted += 1
+        return future
+
+    def _run(self):
+        while True:
+            job = self._queue.get()
+            if job is _STOP:
+                return
+            ticket_text, future = job
+            if not future.set_running_or_notify_cancel():
+                continue
+            classify = self.classify or router.classify_ticket
+            try:
+                future.set_result(classify(ticket_text))
+                with self._lock:
+                    self.completed += 1
+            except LoadShedError as e:
+                future.set_exception(e)
+                with self._lock:
+                    self.shed += 1
+            except Exception as e:
+                # classify_ticket handles LLM failures itself; this is a bug or bad input
+                future.set_exception(e)
+                with self._lock:
+                    self.failed += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "queued": self._queue.qsize(),
+                "submitted": self.submitted,
+                "completed": self.completed,
+                "failed": self.failed,
+                "rejected": self.rejected,
+                "shed": self.shed,
+            }
+
+    def close(self, timeout: Optional[float] = None):
+        """Finishes every queued job, then stops the workers."""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+        for _ in self._threads:
+            self._queue.put(_STOP)
+        for thread in self._threads:
+            thread.join(timeout)
+
+
+# --- HTTP front end ---
+
+class ClassificationHandler(BaseHTTPRequestHandler):
+    """
+    POST /classify  {"ticket": "..."}        -> {"result": {...}}
+                    {"tickets": ["...", ...]} -> {"results": [{...}, ...]}
+    GET  /healthz                            -> {"status": "ok", ...queue, rate limit, breaker and config stats}
+    GET  /metrics                            -> stage latencies and counters, Prometheus text format
+
+    Shed calls (LoadShedError) are answered with 503 and Retry-After.
+    """
+    service: ClassificationService = None
+    submit_timeout: float = 0.5
+    max_body_bytes: int = 10 * 1024 * 1024
+
+    def log_message(self, format, *args):
+        # Keep stdout/stderr for results and errors, not per-request access lines
+        pass
+
+    def _send_json(self, status: int, body: dict, headers: Optional[dict] = None):
+        payload = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def do_GET(self):
+        if self.path == "/metrics":
+            self._send_metrics()
+            return
+        if self.path != "/healthz":
+            self._send_json(404, {"error": "not found"})
+            return
+        body = {"status": "ok", **self.service.stats()}
+        if router.rate_limiter is not None:
+            body["rate_limit"] = router.rate_limiter.snapshot()
+        if router.circuit_breaker is not None:
+            body["circuit_breaker"] = router.circuit_breaker.snapshot()
+        body["config"] = router.config_store.snapshot()
+        self._send_json(200, body)
+
+    def _send_metrics(self):
+        stats = self.service.stats()
+        REGISTRY.gauge("triage_service_queued", "Jobs waiting for a worker").set(stats["queued"])
+        REGISTRY.gauge("triage_service_workers", "Worker threads").set(stats["workers"])
+        payload = REGISTRY.prometheus_text().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def do_POST(self):
+        if self.path != "/classify":
+            self._send_json(404, {"error": "not found"})
+            return
+        length = int(self.headers.get("Content-Length") or 0)
+        if length > self.max_body_bytes:
+            self._send_json(413, {"error": "request body too large"})
+            return
+        try:
+            body = json.loads(self.rfile.read(length) or b"null")
+        except ValueError:
+            self._send_json(400, {"error": "request body is not valid JSON"})
+            return
+
+        single = isinstance(body, dict) and isinstance(body.get("ticket"), str)
+        tickets = [body["ticket"]] if single else body.get("tickets") if isinstance(body, dict) else None
+        if not isinstance(tickets, list) or not all(isinstance(t, str) for t in tickets):
+            self._send_json(400, {"error": 'expected {"ticket": str} or {"tickets": [str, ...]}'})
+            return
+
+        try:
+            futures = [self.service.submit(t, timeout=self.submit_timeout) for t in tickets]
+        except QueueFullError:
+            self._send_json(503, {"error": "classification queue is full"}, {"Retry-After": "1"})
+            return
+        try:
+            results = [future.result() for future in futures]
+        except LoadShedError as e:
+            self._send_json(503, {"error": str(e)}, {"Retry-After": str(math.ceil(e.retry_after))})
+            return
+        except Exception as e:
+            self._send_json(500, {"error": f"classification failed: {e}"})
+            return
+        self._send_json(200, {"result": results[0]} if single else {"results": results})
+
+
+def make_http_server(service: ClassificationService, host: str = "127.0.0.1",
+                     port: int = 8080) -> ThreadingHTTPServer:
+    """Builds (but does not start) the HTTP server bound to `service`."""
+    handler = type("BoundClassificationHandler", (ClassificationHandler,), {"service": service})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    return server
+
+
+# --- JSONL stdin front end ---
+
+def serve_jsonl(service: ClassificationService, source: TextIO, sink: TextIO,
+                max_pending: int = 1000) -> int:
+    """
+    Classifies JSONL tickets from `source`, writing results to `sink` in input order.
+
+    Each input line is `{"id": ..., "ticket": "..."}` or a bare JSON string;
+    the output line is `{"id": ..., "result": {...}}` (id defaults to the
+    line number). Reading pauses whenever `max_pending` tickets are
+    unfinished, so memory stays bounded. Returns the number of tickets.
+    """
+    outstanding = queue.Queue(maxsize=max_pending)
+
+    def write_results():
+        while True:
+            item = outstanding.get()
+            if item is None:
+                return
+            job_id, future = item
+            try:
+                line = {"id": job_id, "result": future.result()}
+            except Exception as e:
+                line = {"id": job_id, "error": str(e)}
+            sink.write(json.dumps(line) + "\n")
+            sink.flush()
+
+    writer = threading.Thread(target=write_results, name="jsonl-writer", daemon=True)
+    writer.start()
+    count = 0
+    try:
+        for line_number, line in enumerate(source, 1):
+            if not line.strip():
+                continue
+            try:
+                job = json.loads(line)
+            except ValueError:
+                print(f"Error: skipping malformed input line {line_number}", file=sys.stderr)
+                continue
+            if isinstance(job, str):
+                job = {"ticket": job}
+            if not isinstance(job, dict) or not isinstance(job.get("ticket"), str):
+                print(f"Error: input line {line_number} has no ticket text", file=sys.stderr)
+                continue
+            future = service.submit(job["ticket"])
+            outstanding.put((job.get("id", line_number), future))
+            count += 1
+    finally:
+        outstanding.put(None)
+        writer.join()
+    return count
+
+
+# --- Entry point ---
+
+def _parse_address(value: str) -> tuple[str, int]:
+    host, _, port = value.rpartition(":")
+    if not port.isdigit():
+        raise argparse.ArgumentTypeError(f"expected HOST:PORT, got {value!r}")
+    return host or "127.0.0.1", int(port)
+
+
+def main(argv=None):
+    settings = router.config.get("serve", {})
+    parser = argparse.ArgumentParser(description="AI Triage Bot classification service")
+    parser.add_argument("--http", type=_parse_address, metavar="HOST:PORT",
+                        help="Serve POST /classify on this address")
+    parser.add_argument("--stdin", action="store_true",
+                        help="Classify JSONL tickets from stdin, writing JSONL results to stdout")
+    parser.add_argument("--workers", type=int, default=settings.get("workers", 8),
+                        help="Worker threads (concurrent LLM calls)")
+    parser.add_argument("--queue-size", type=int, default=settings.get("queue_size", 1000),
+                        help="Jobs allowed to wait for a worker before producers are pushed back")
+    parser.add_argument("--fake", action="store_true",
+                        help="Answer from the local fake LLM instead of calling Gemini")
+    args = parser.parse_args(argv)
+    if args.http is None and not args.stdin:
+        default = settings.get("http")
+        if not default:
+            parser.error("choose at least one front end: --http HOST:PORT and/or --stdin")
+        args.http = _parse_address(default)
+
+    if args.fake:
+        from .fake_client import FakeGeminiClient
+        router.client = FakeGeminiClient()
+    else:
+        # Import the SDK and build the client now rather than on the first ticket, and fail fast
+        try:
+            ready = router.get_client() is not None
+        except ImportError as e:
+            print(f"Error: the Gemini SDK could not be loaded: {e}", file=sys.stderr)
+            ready = False
+        if not ready:
+            print("Error: Gemini client could not be created. Set GEMINI_API_KEY or run with --fake.",
+                  file=sys.stderr)
+            sys.exit(2)
+
+    service = ClassificationService(workers=args.workers, queue_size=args.queue_size).start()
+    reporter = build_reporter(router.config.get("metrics", {}), router.get_project_root())
+    if reporter is not None:
+        reporter.start()
+    server = None
+    stopped = threading.Event()
+    signal.signal(signal.SIGTERM, lambda *_: stopped.set())
+    try:
+        if args.http:
+            server = make_http_server(service, *args.http)
+            threading.Thread(target=server.serve_forever, name="http-server", daemon=True).start()
+            print(f"Serving on http://{args.http[0]}:{server.server_address[1]}/classify", file=sys.stderr)
+        if args.stdin:
+            serve_jsonl(service, sys.stdin, sys.stdout, max_pending=args.queue_size)
+            if server is None:
+                stopped.set()
+        while not stopped.wait(0.5):
+            pass
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if server is not None:
+            server.shutdown()
+        service.close()
+        if reporter is not None:
+            reporter.stop()
+        audit_log.flush()
+
+
+if __name__ == "__main__":
+    main()
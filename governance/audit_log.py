@@ -0,0 +1,318 @@
+"""
+Audit Log Writer
+Background writer for the JSONL audit and monitoring logs.
+
+Callers enqueue entries and return immediately; a single writer thread keeps
+the log files open and group-commits queued lines when a batch fills up or a
+time threshold passes. Because one thread owns every file handle, lines from
+concurrent callers can no longer interleave.
+
+With a rotation policy (see log_rotation), the writer also moves files that
+grow too large or too old into compressed shards; sealing runs on a
+background thread so it never holds up logging. Other processes may write
+and rotate the same files: each batch is written under the log's lock file,
+after reopening the name if another writer has rotated it (like
+logging.handlers.WatchedFileHandler).
+
+Supports ISO/IEC 42001:2023 Clause 9.1 (Monitoring) and Clause 7.5
+(Documented Information): entries are flushed on shutdown, and the fsync
+policy controls how much can be lost on a crash.
+"""
+import atexit
+import json
+import os
+import queue
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Optional
+
+from .log_rotation import FileLock, RotationPolicy, lock_path, rotate, seal_shard, started_at, unsealed_shards
+
+FSYNC_POLICIES = ("none", "interval", "every_batch")
+
+# Queue marker asking the writer thread to commit, close its files and exit
+_STOP = object()
+
+
+class AuditLogWriter:
+    """
+    Queue-fed single writer for append-only JSONL files.
+
+    Args:
+        max_batch: Commit once this many entries are queued.
+        flush_interval: Commit at most this many seconds after the first
+            queued entry, even if the batch is not full.
+        fsync: "none" (leave it to the OS), "interval" (fsync at most every
+            `fsync_interval` seconds) or "every_batch".
+        queue_size: Bound on queued entries; callers block when it is full
+            rather than dropping audit records.
+        rotation: Optional `RotationPolicy` settings (max_bytes,
+            max_age_seconds, compression) applied to every file written.
+    """
+
+    def __init__(self, max_batch: int = 256, flush_interval: float = 0.2, fsync: str = "none",
+                 fsync_interval: float = 1.0, queue_size: int = 10000, rotation: Optional[dict] = None):
+        if fsync not in FSYNC_POLICIES:
+            raise ValueError(f"fsync must be one of {FSYNC_POLICIES}, got {fsync!r}")
+        self.rotation = RotationPolicy(**rotation) if rotation else None
+        self.max_batch = max_batch
+        self.flush_interval = flush_interval
+        self.fsync = fsync
+        self.fsync_interval = fsync_interval
+        self.entries_written = 0
+        self.batches_written = 0
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._handles = {}
+        self._started_at = {}
+        self._locks = {}
+        self._recovered = set()
+        self._sealers = []
+        self.rotations = 0
+        self._last_fsync = time.monotonic()
+        self._thread = None
+        self._closed = False
+        self._lock = threading.Lock()
+
+    def write(self, path: Path, entry: dict):
+        """Queues one JSON entry to be appended to `path`."""
+        line = json.dumps(entry) + "\n"
+        path = Path(path).absolute()
+        if self._closed:
+            # Late writes during interpreter shutdown go straight to disk
+            _append_lines(path, [line])
+            return
+        self._ensure_started()
+        self._queue.put((path, line))
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Blocks until everything queued so far is written. Returns False on timeout."""
+        if self._thread is None or self._closed:
+            return True
+        done = threading.Event()
+        self._queue.put(done)
+        return done.wait(timeout)
+
+    def close(self, timeout: Optional[float] = 5.0):
+        """Writes everything still queued, closes the files and stops the thread."""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            thread = self._thread
+        if thread is not None:
+            self._queue.put(_STOP)
+            thread.join(timeout)
+        for sealer in self._sealers:
+            sealer.join(timeout)
+
+    def _ensure_started(self):
+        if self._thread is not None:
+            return
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="audit-log-writer", daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        pending = {}
+        count = 0
+        deadline = None
+        waiters = []
+        while True:
+            timeout = None if deadline is None else max(0.0, deadline - time.monotonic())
+            try:
+                item = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                item = None
+
+            if item is _STOP:
+                self._commit(pending, final=True)
+                self._close_handles()
+                for waiter in waiters:
+                    waiter.set()
+                return
+            if isinstance(item, threading.Event):
+                waiters.append(item)
+            elif item is not None:
+                path, line = item
+                pending.setdefault(path, []).append(line)
+                count += 1
+                if deadline is None:
+                    deadline = time.monotonic() + self.flush_interval
+
+            if item is None or waiters or count >= self.max_batch:
+                self._commit(pending)
+                pending = {}
+                count = 0
+                deadline = None
+                for waiter in waiters:
+                    waiter.set()
+                waiters = []
+
+    def _commit(self, pending: dict, final: bool = False):
+        if not pending and not final:
+            return
+        sync = self.fsync == "every_batch" or (
+            self.fsync == "interval"
+            and (final or time.monotonic() - self._last_fsync >= self.fsync_interval)
+        )
+        for path, lines in pending.items():
+            shard = None
+            try:
+                with self._lock_for(path):
+                    handle = self._handle_for(path)
+                    handle.write("".join(lines))
+                    handle.flush()
+                    self.entries_written += len(lines)
+                    if self.rotation is not None and self.rotation.due(
+                            os.fstat(handle.fileno()).st_size, time.time() - self._started_at[path]):
+                        if sync:
+                            os.fsync(handle.fileno())
+                        shard = self._rotate(path)
+            except OSError as e:
+                print(f"Error: could not write {len(lines)} audit entries to {path}: {e}", file=sys.stderr)
+                self._drop_handle(path)
+                continue
+            if shard is not None:
+                self._seal_in_background(path, shard)
+        if sync:
+            for handle in self._handles.values():
+                os.fsync(handle.fileno())
+            self._last_fsync = time.monotonic()
+        if pending:
+            self.batches_written += 1
+
+    def _lock_for(self, path: Path) -> FileLock:
+        lock = self._locks.get(path)
+        if lock is None:
+            lock = self._locks[path] = FileLock(lock_path(path))
+        return lock
+
+    def _handle_for(self, path: Path):
+        """Open handle for `path`; called with the log's lock held."""
+        handle = self._handles.get(path)
+        if handle is not None:
+            try:
+                moved = not os.path.samestat(os.stat(path), os.fstat(handle.fileno()))
+            except FileNotFoundError:
+                moved = True
+            if moved:
+                # Another process rotated the file; follow the name instead of writing into its shard
+                self._drop_handle(path)
+                handle = None
+        if handle is None:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            handle = path.open("a", encoding="utf-8")
+            self._handles[path] = handle
+            self._started_at[path] = started_at(path)
+            if self.rotation is not None and path not in self._recovered:
+                # Finish sealing shards an earlier process rotated but never compressed
+                self._recovered.add(path)
+                for shard in unsealed_shards(path):
+                    self._seal_in_background(path, shard)
+        return handle
+
+    def _rotate(self, path: Path) -> Optional[Path]:
+        """Moves the log into its shard directory (lock held); returns the shard to seal."""
+        self._drop_handle(path)
+        try:
+            shard = rotate(path)
+        except OSError as e:
+            print(f"Error: could not rotate {path}: {e}", file=sys.stderr)
+            return None
+        if shard is not None:
+            self.rotations += 1
+        return shard
+
+    def _seal_in_background(self, path: Path, shard: Path):
+        def seal():
+            try:
+                seal_shard(path, shard, self.rotation.compression)
+            except FileNotFoundError:
+                pass  # already sealed by another writer
+            except OSError as e:
+                print(f"Error: could not seal log shard {shard}: {e}", file=sys.stderr)
+
+        self._sealers = [t for t in self._sealers if t.is_alive()]
+        sealer = threading.Thread(target=seal, name="audit-log-sealer", daemon=True)
+        sealer.start()
+        self._sealers.append(sealer)
+
+    def _drop_handle(self, path: Path):
+        self._started_at.pop(path, None)
+        handle = self._handles.pop(path, None)
+        if handle is not None:
+            try:
+                handle.close()
+            except OSError:
+                pass
+
+    def _close_handles(self):
+        for path in list(self._handles):
+            self._drop_handle(path)
+        for lock in self._locks.values():
+            lock.close()
+        self._locks.clear()
+
+
+def _append_lines(path: Path, lines: list):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with path.open("a", encoding="utf-8") as f:
+        f.write("".join(lines))
+
+
+# --- Shared writer ---
+
+_settings = {}
+_default_writer = None
+_default_lock = threading.Lock()
+
+
+def configure(**settings):
+    """
+    Sets the options (see `AuditLogWriter`) for the shared writer.
+
+    Takes effect when the shared writer is first used; an already running
+    writer is flushed and replaced.
+    """
+    global _default_writer
+    AuditLogWriter(**settings)  # validate before swapping anything
+    with _default_lock:
+        _settings.clear()
+        _settings.update(settings)
+        previous, _default_writer = _default_writer, None
+    if previous is not None:
+        previous.close()
+
+
+def get_writer() -> AuditLogWriter:
+    """Returns the process-wide writer, creating it on first use."""
+    global _default_writer
+    writer = _default_writer
+    if writer is None:
+        with _default_lock:
+            if _default_writer is None:
+                _default_writer = AuditLogWriter(**_settings)
+            writer = _default_writer
+    return writer
+
+
+def append_jsonl(path: Path, entry: dict):
+    """Queues `entry` for the JSONL file at `path` on the shared writer."""
+    get_writer().write(path, entry)
+
+
+def flush(timeout: Optional[float] = None) -> bool:
+    """Blocks until the shared writer has written everything queued so far."""
+    writer = _default_writer
+    return writer.flush(timeout) if writer is not None else True
+
+
+@atexit.register
+def shutdown():
+    """Flushes and closes the shared writer; registered to run at interpreter exit."""
+    writer = _default_writer
+    if writer is not None:
+        writer.close()
@@ -0,0 +1,333 @@
+"""
+Log Rotation
+Size- and time-based rotation of the append-only JSONL logs into compressed,
+dated shards.
+
+A rotated log keeps its name for the active file (e.g. `fallback_log.jsonl`);
+closed shards move to a sibling directory (`fallback_log.shards/`), are
+compressed in the background and are listed in `manifest.json` there with
+the time range and entry count of each shard. Readers use the manifest to
+skip shards outside the window they need.
+
+Supports ISO/IEC 42001:2023 Clause 7.5.3 (Control of Documented
+Information): shards are never rewritten after sealing, so retained
+history stays intact while the active file stays small.
+
+Several processes (the service, bulk jobs, the GUI, scripts) may write the
+same log. Each write, and the rename that rotates a log, happens under an
+exclusive `flock` on a hidden sidecar file (`.fallback_log.jsonl.lock`).
+Writers check under that lock that their handle still points at the file
+behind the name, so no entry lands in a shard after it was moved away.
+Sealing takes a second lock in the shard directory, so a shard is
+compressed, listed and removed by one process only. Without fcntl
+(Windows) there is no cross-process locking; keep one writing process per
+log there.
+"""
+import gzip
+import io
+import json
+import os
+import re
+import threading
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Iterator, List, Optional
+
+try:
+    import fcntl
+except ImportError:  # Windows: no advisory locks, see the module docstring
+    fcntl = None
+
+try:
+    import zstandard
+except ImportError:  # zstd compression is optional
+    zstandard = None
+
+COMPRESSIONS = ("none", "gzip", "zstd")
+SHARD_SUFFIXES = {"none": "", "gzip": ".gz", "zstd": ".zst"}
+MANIFEST_NAME = "manifest.json"
+MANIFEST_FORMAT = 1
+
+_TIMESTAMP = re.compile(rb'"timestamp"\s*:\s*"((?:[^"\\]|\\.)*)"')
+
+# Serializes manifest read-modify-write cycles within the process
+_manifest_lock = threading.Lock()
+
+
+@dataclass(frozen=True)
+class RotationPolicy:
+    """
+    When to rotate and how to store closed shards.
+
+    Args:
+        max_bytes: Rotate once the active file reaches this size.
+        max_age_seconds: Rotate on the first write once the active file's
+            first entry is this old (see `started_at`).
+        compression: "gzip" (default), "zstd" (needs the zstandard package)
+            or "none".
+    """
+    max_bytes: Optional[int] = None
+    max_age_seconds: Optional[float] = None
+    compression: str = "gzip"
+
+    def __post_init__(self):
+        if self.compression not in COMPRESSIONS:
+            raise ValueError(f"compression must be one of {COMPRESSIONS}, got {self.compression!r}")
+        if self.compression == "zstd" and zstandard is None:
+            raise ValueError("zstd compression requires the zstandard package")
+
+    def due(self, size: int, age_seconds: float) -> bool:
+        return (
+            (self.max_bytes is not None and size >= self.max_bytes)
+            or (self.max_age_seconds is not None and age_seconds >= self.max_age_seconds)
+        )
+
+
+class FileLock:
+    """
+    Exclusive advisory lock on a sidecar file, held across processes.
+
+    `flock` locks belong to the open file, so two FileLock objects on the
+    same path also exclude each other within one process. The descriptor is
+    kept open between uses; `close` releases it.
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self._fd = None
+
+    def __enter__(self):
+        if fcntl is not None:
+            if self._fd is None:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                self._fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+            fcntl.flock(self._fd, fcntl.LOCK_EX)
+        return self
+
+    def __exit__(self, *exc):
+        if self._fd is not None:
+            fcntl.flock(self._fd, fcntl.LOCK_UN)
+
+    def close(self):
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+
+
+def lock_path(log_path: Path) -> Path:
+    """Sidecar file that writers and rotation of `log_path` lock."""
+    log_path = Path(log_path)
+    return log_path.with_name(f".{log_path.name}.lock")
+
+
+def started_at(log_path: Path) -> float:
+    """
+    When the active log began, in epoch seconds: the timestamp of its first
+    entry, else its mtime, else now (empty or missing file). Age-based
+    rotation counts from here rather than from when a process opened the
+    file, so short-lived CLI and GUI runs rotate too.
+    """
+    log_path = Path(log_path)
+    try:
+        with log_path.open("rb") as f:
+            first = f.readline()
+            mtime = os.fstat(f.fileno()).st_mtime
+    except FileNotFoundError:
+        first, mtime = b"", None
+    if not first.strip():
+        return datetime.now(timezone.utc).timestamp()
+    match = _TIMESTAMP.search(first)
+    moment = _parse_timestamp(match.group(1)) if match else None
+    return moment.timestamp() if moment is not None else mtime
+
+
+def shard_dir(log_path: Path) -> Path:
+    log_path = Path(log_path)
+    return log_path.with_name(log_path.stem + ".shards")
+
+
+def manifest_path(log_path: Path) -> Path:
+    return shard_dir(log_path) / MANIFEST_NAME
+
+
+def read_manifest(log_path: Path) -> dict:
+    """Returns the shard manifest for a log (empty if it has never rotated)."""
+    try:
+        manifest = json.loads(manifest_path(log_path).read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        manifest = None
+    if not isinstance(manifest, dict) or manifest.get("format") != MANIFEST_FORMAT:
+        manifest = {"format": MANIFEST_FORMAT, "log": Path(log_path).name, "shards": []}
+    return manifest
+
+
+def _write_manifest(log_path: Path, manifest: dict):
+    path = manifest_path(log_path)
+    tmp_path = path.with_name(path.name + ".tmp")
+    tmp_path.write_text(json.dumps(manifest, indent=2), encoding="utf-8")
+    os.replace(tmp_path, path)
+
+
+def rotate(log_path: Path, now: Optional[datetime] = None) -> Optional[Path]:
+    """
+    Moves the active log into the shard directory and returns the raw shard.
+
+    The caller must have closed its handle to the log. Returns None when
+    there is nothing to rotate.
+    """
+    log_path = Path(log_path)
+    try:
+        if log_path.stat().st_size == 0:
+            return None
+    except FileNotFoundError:
+        return None
+    directory = shard_dir(log_path)
+    directory.mkdir(parents=True, exist_ok=True)
+    stamp = (now or datetime.now(timezone.utc)).strftime("%Y%m%dT%H%M%SZ")
+    for sequence in range(10000):
+        suffix = f"-{sequence}" if sequence else ""
+        target = directory / f"{log_path.stem}.{stamp}{suffix}{log_path.suffix}"
+        if not any(target.with_name(target.name + ext).exists() for ext in SHARD_SUFFIXES.values()):
+            break
+    os.replace(log_path, target)
+    return target
+
+
+def _parse_timestamp(raw: bytes) -> Optional[datetime]:
+    try:
+        moment = datetime.fromisoformat(raw.decode("utf-8").replace("Z", "+00:00"))
+    except (ValueError, UnicodeDecodeError):
+        return None
+    return moment if moment.tzinfo else moment.replace(tzinfo=timezone.utc)
+
+
+def _open_compressed_writer(path: Path, compression: str):
+    if compression == "zstd":
+        return zstandard.ZstdCompressor(level=3).stream_writer(path.open("wb"), closefd=True)
+    return gzip.open(path, "wb", compresslevel=6)
+
+
+def seal_shard(log_path: Path, raw_shard: Path, compression: str = "gzip") -> dict:
+    """
+    Compresses a rotated shard and records it in the manifest.
+
+    One pass over the shard both compresses it and collects its entry count
+    and time range. Safe to re-run on a shard left behind by a crash. The
+    seal lock makes a second process that picks up the same shard wait and
+    then get FileNotFoundError once the first has removed it.
+    """
+    seal_lock = FileLock(shard_dir(log_path) / ".seal.lock")
+    try:
+        with seal_lock:
+            return _seal_shard(log_path, Path(raw_shard), compression)
+    finally:
+        seal_lock.close()
+
+
+def _seal_shard(log_path: Path, raw_shard: Path, compression: str) -> dict:
+    sealed = raw_shard.with_name(raw_shard.name + SHARD_SUFFIXES[compression])
+    first = last = None
+    entries = 0
+    tmp_path = sealed.with_name(sealed.name + ".tmp")
+    with raw_shard.open("rb") as src:
+        dst = _open_compressed_writer(tmp_path, compression) if sealed != raw_shard else None
+        try:
+            for line in src:
+                if dst is not None:
+                    dst.write(line)
+                if not line.strip():
+                    continue
+                entries += 1
+                match = _TIMESTAMP.search(line)
+                moment = _parse_timestamp(match.group(1)) if match else None
+                if moment is not None:
+                    first = moment if first is None or moment < first else first
+                    last = moment if last is None or moment > last else last
+        finally:
+            if dst is not None:
+                dst.close()
+    if dst is not None:
+        os.replace(tmp_path, sealed)
+
+    record = {
+        "file": sealed.name,
+        "first_timestamp": first.isoformat() if first else None,
+        "last_timestamp": last.isoformat() if last else None,
+        "entries": entries,
+        "bytes": raw_shard.stat().st_size,
+        "compression": compression,
+    }
+    with _manifest_lock:
+        manifest = read_manifest(log_path)
+        manifest["shards"] = [s for s in manifest["shards"] if s["file"] != sealed.name] + [record]
+        manifest["shards"].sort(key=lambda s: s["file"])
+        _write_manifest(log_path, manifest)
+    if sealed != raw_shard:
+        raw_shard.unlink()
+    return record
+
+
+def unsealed_shards(log_path: Path) -> List[Path]:
+    """Rotated shards that were not compressed and listed yet (e.g. after a crash)."""
+    directory = shard_dir(log_path)
+    if not directory.is_dir():
+        return []
+    listed = {s["file"] for s in read_manifest(log_path)["shards"]}
+    pattern = f"{Path(log_path).stem}.*{Path(log_path).suffix}"
+    return sorted(
+        path for path in directory.glob(pattern)
+        if not any(path.name + ext in listed for ext in SHARD_SUFFIXES.values())
+    )
+
+
+def open_shard(path: Path):
+    """Opens a shard (compressed or not) for binary line iteration."""
+    path = Path(path)
+    if path.suffix == ".gz":
+        return gzip.open(path, "rb")
+    if path.suffix == ".zst":
+        if zstandard is None:
+            raise ValueError(f"Reading {path.name} requires the zstandard package")
+        return io.BufferedReader(zstandard.ZstdDecompressor().stream_reader(path.open("rb"), closefd=True))
+    return path.open("rb")
+
+
+def shard_paths(log_path: Path, since: Optional[datetime] = None) -> List[Path]:
+    """
+    Shards of a log in time order, skipping sealed shards that end before `since`.
+
+    Unsealed shards have no recorded range and are always included.
+    """
+    directory = shard_dir(log_path)
+    paths = []
+    for shard in sorted(read_manifest(log_path)["shards"], key=lambda s: s["first_timestamp"] or ""):
+        last = shard.get("last_timestamp")
+        if since is not None and last is not None and datetime.fromisoformat(last) < since:
+            continue
+        paths.append(directory / shard["file"])
+    return paths + unsealed_shards(log_path)
+
+
+def iter_log_lines(log_path: Path, since: Optional[datetime] = None,
+                   include_active: bool = True) -> Iterator[bytes]:
+    """Raw lines of every relevant shard, followed by the active log file."""
+    log_path = Path(log_path)
+    for path in shard_paths(log_path, since):
+        try:
+            with open_shard(path) as f:
+                yield from f
+        except FileNotFoundError:
+            # Sealed and removed between listing and opening; its sealed copy is listed next time
+            continue
+    if include_active:
+        try:
+            with log_path.open("rb") as f:
+                yield from f
+        except FileNotFoundError:
+            return
+
+
+def has_shards(log_path: Path) -> bool:
+    return bool(read_manifest(log_path)["shards"]) or bool(unsealed_shards(log_path))
+
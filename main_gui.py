@@ -94,7 +94,12 @@ class TicketClassifierApp:
         pii_status = "Yes" if result.get('contains_pii') else "No"
         self.pii_text.set(f"Contains PII: {pii_status}")
         
-        self.status_text.set("Classification complete.")
+        if result.get('degraded'):
+            self.status_text.set(f"Gemini unavailable - routed to {result.get('route', 'support_queue')}.")
+        elif result.get('route'):
+            self.status_text.set(f"Classification complete - route: {result['route']}.")
+        else:
+            self.status_text.set("Classification complete.")
     
     def show_error(self, error_message):
         """Shows an error message in the status bar and a popup."""
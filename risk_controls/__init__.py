@@ -2,6 +2,10 @@
 Risk Controls Package
 Contains PII detection and governance controls.
 """
-from .pii_filters import contains_pii
+from .bulk_scan import PII_KIND_BITS, contains_pii_batch, decode_mask, scan_many
+from .pii_filters import PIISpan, contains_pii, count_pii, find_pii, redact_pii
 
-__all__ = ['contains_pii']
+__all__ = [
+    'contains_pii', 'find_pii', 'count_pii', 'redact_pii', 'PIISpan',
+    'scan_many', 'contains_pii_batch', 'decode_mask', 'PII_KIND_BITS',
+]
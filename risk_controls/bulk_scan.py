@@ -0,0 +1,87 @@
+# risk_controls/bulk_scan.py
+"""
+Bulk PII detection for large ticket batches (e.g. re-scanning historic exports).
+
+Each ticket gets a bitmask of the PII kinds found in it. A mask is non-zero
+exactly when `contains_pii` returns True for that ticket. Large inputs are
+split into chunks and scanned in a process pool, because regex matching
+holds the GIL and threads would not run in parallel.
+"""
+import os
+from array import array
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import chain, islice
+from typing import Iterable, Optional
+
+from .pii_filters import PII_SCANNER
+
+PII_KIND_BITS = {"ssn": 1, "credit_card": 2, "email": 4, "phone": 8}
+ALL_KINDS_MASK = sum(PII_KIND_BITS.values())
+
+
+def pii_mask(text) -> int:
+    """Bitmask (see PII_KIND_BITS) of the PII kinds found in one ticket."""
+    if not isinstance(text, str):
+        return 0
+    mask = 0
+    for span in PII_SCANNER.iter_spans(text):
+        mask |= PII_KIND_BITS[span.kind]
+        if mask == ALL_KINDS_MASK:
+            break
+    return mask
+
+
+def decode_mask(mask: int) -> tuple[str, ...]:
+    """Names of the PII kinds set in `mask`."""
+    return tuple(kind for kind, bit in PII_KIND_BITS.items() if mask & bit)
+
+
+def _scan_chunk(texts: list) -> bytes:
+    return bytes(pii_mask(text) for text in texts)
+
+
+def _chunks(items, chunk_size: int):
+    iterator = iter(items)
+    while True:
+        chunk = list(islice(iterator, chunk_size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def scan_many(texts: Iterable, workers: Optional[int] = None, chunk_size: int = 2000,
+              parallel_threshold: int = 20000) -> array:
+    """
+    Scans many tickets and returns an `array('B')` with one PII bitmask per ticket.
+
+    Inputs of fewer than `parallel_threshold` tickets are scanned in this
+    process. Larger inputs (or iterators that turn out to be larger) are
+    scanned in a pool of `workers` processes (default: CPU count) with at most
+    two chunks per worker in flight, so memory stays bounded for iterators of
+    any length. `workers=1` always scans serially.
+    """
+    iterator = iter(texts)
+    head = list(islice(iterator, parallel_threshold + 1))
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or len(head) <= parallel_threshold:
+        masks = array("B")
+        for chunk in _chunks(chain(head, iterator), chunk_size):
+            masks.frombytes(_scan_chunk(chunk))
+        return masks
+
+    masks = array("B")
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        in_flight = deque()
+        for chunk in _chunks(chain(head, iterator), chunk_size):
+            in_flight.append(pool.submit(_scan_chunk, chunk))
+            if len(in_flight) >= 2 * workers:
+                masks.frombytes(in_flight.popleft().result())
+        while in_flight:
+            masks.frombytes(in_flight.popleft().result())
+    return masks
+
+
+def contains_pii_batch(texts: Iterable, **options) -> list[bool]:
+    """`[contains_pii(t) for t in texts]`, computed with `scan_many`."""
+    return [bool(mask) for mask in scan_many(texts, **options)]
@@ -1,7 +1,9 @@
 # risk_controls/pii_filters.py
 import re
+from typing import Iterator, NamedTuple
 
 # Pre-compile regex patterns for efficiency. This avoids recompiling them on every call.
+# These are the reference patterns; detection runs on the combined PII_SCANNER below.
 PII_PATTERNS = [
     # Social Security Number (SSN) - US format
     re.compile(r"\b\d{3}-\d{2}-\d{4}\b"),
@@ -20,6 +22,7 @@ PII_PATTERNS = [
 ]
 
 # Secondary validation: Credit card Luhn algorithm check
+# (reference implementation; the scanner uses the table-driven luhn_valid below)
 def _luhn_check(card_number: str) -> bool:
     """
     Validates a credit card number using the Luhn algorithm.
@@ -45,6 +48,197 @@ def _luhn_check(card_number: str) -> bool:
     return checksum % 10 == 0
 
 
+# Luhn digit values by byte: digits in even positions from the right count
+# as-is, odd positions are doubled (with 9 subtracted when over 9).
+_LUHN_PLAIN = bytes.maketrans(b"0123456789", bytes(range(10)))
+_LUHN_DOUBLED = bytes.maketrans(b"0123456789", bytes([0, 2, 4, 6, 8, 1, 3, 5, 7, 9]))
+
+
+def luhn_valid(candidate: str) -> bool:
+    """
+    Luhn check for a card candidate such as "4532 0151 1283 0366".
+
+    Works on bytes with precomputed lookup tables: separators are deleted,
+    alternate digits are mapped through the plain/doubled tables and summed,
+    without building per-digit lists. Accepts 13-19 digit numbers.
+    """
+    try:
+        digits = candidate.encode("ascii").translate(None, b" -")
+    except UnicodeEncodeError:
+        # Non-ASCII digits (\d matches any Unicode digit)
+        return _luhn_check(candidate)
+    if not 13 <= len(digits) <= 19 or not digits.isdigit():
+        return False
+    total = sum(digits[-1::-2].translate(_LUHN_PLAIN)) + sum(digits[-2::-2].translate(_LUHN_DOUBLED))
+    return total % 10 == 0
+
+
+# --- Single-pass scanner ---
+
+class PIISpan(NamedTuple):
+    """One PII finding: its kind and the [start, end) character range."""
+    kind: str
+    start: int
+    end: int
+
+
+# Characters allowed in an email local part, as in the email pattern above
+_EMAIL_LOCAL_CHARS = frozenset("ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789._%+-")
+
+
+def _is_word_char(char: str) -> bool:
+    return char.isalnum() or char == "_"
+
+
+def _email_start(text: str, at: int, floor: int) -> int:
+    """
+    Start of the email local part ending just before the '@' at `at`, or -1.
+
+    Picks the leftmost start with a word boundary, as the leading
+    `\b[A-Za-z0-9._%+-]+` of the email pattern would. Never extends below
+    `floor`, so email spans cannot overlap an earlier finding.
+    """
+    start = at
+    while start > floor and text[start - 1] in _EMAIL_LOCAL_CHARS:
+        start -= 1
+    for candidate in range(start, at):
+        before = _is_word_char(text[candidate - 1]) if candidate > 0 else False
+        if before != _is_word_char(text[candidate]):
+            return candidate
+    return -1
+
+
+class PIIScanner:
+    """
+    Finds several kinds of PII in one left-to-right pass over the text.
+
+    `pattern` is a single regex whose named groups identify what matched;
+    `group_kinds` maps each group name to the reported kind. `validators`
+    maps a kind to a secondary check (e.g. Luhn for cards); a rejected
+    candidate is skipped and scanning resumes one character later, so
+    nothing it overlapped is missed.
+
+    Matches of the `email` group start at the '@' and are extended left over
+    the local part here. Anchoring on '@' (like the digit/paren anchors of
+    the other kinds) lets the regex engine skip quickly over plain text.
+    """
+
+    def __init__(self, pattern: str, group_kinds: dict, validators: dict = None):
+        self.pattern = re.compile(pattern)
+        self.group_kinds = group_kinds
+        self.validators = validators or {}
+
+    def iter_spans(self, text: str) -> Iterator[PIISpan]:
+        """Yields non-overlapping PII spans in text order."""
+        search = self.pattern.search
+        group_kinds = self.group_kinds
+        validators = self.validators
+        pos = 0
+        emitted_end = 0
+        while True:
+            match = search(text, pos)
+            if match is None:
+                return
+            start, end = match.span()
+            kind = group_kinds[match.lastgroup]
+            if kind == "email":
+                start = _email_start(text, start, emitted_end)
+                if start < 0:
+                    # A bare '@domain' is not an email, but a phone/SSN/card may start inside it
+                    pos = match.start() + 1
+                    continue
+            else:
+                validator = validators.get(kind)
+                if validator is not None and not validator(text[start:end]):
+                    pos = start + 1
+                    continue
+            yield PIISpan(kind, start, end)
+            pos = emitted_end = end
+
+    def find(self, text: str) -> list[PIISpan]:
+        return list(self.iter_spans(text))
+
+    def contains(self, text: str) -> bool:
+        return next(self.iter_spans(text), None) is not None
+
+    def count(self, text: str) -> dict[str, int]:
+        counts = {}
+        for span in self.iter_spans(text):
+            counts[span.kind] = counts.get(span.kind, 0) + 1
+        return counts
+
+    def redact(self, text: str, replacements: dict) -> tuple[str, dict[str, int]]:
+        """
+        Replaces each finding with `replacements[kind]` (kinds not listed are kept).
+        Returns the redacted text and the number of redactions per kind.
+        """
+        parts = []
+        counts = {}
+        last = 0
+        for kind, start, end in self.iter_spans(text):
+            replacement = replacements.get(kind)
+            if replacement is None:
+                continue
+            parts.append(text[last:start])
+            parts.append(replacement)
+            counts[kind] = counts.get(kind, 0) + 1
+            last = end
+        parts.append(text[last:])
+        return "".join(parts), counts
+
+
+# The patterns of PII_PATTERNS folded into one alternation. Every branch
+# starts at a digit, '(' or '@' so the engine can skip other text cheaply:
+# the SSN and card branches share their word-boundary digit prefix, and the
+# `\b` before them is written as `(?<!\w\d)` after the first digit.
+# Card branches cover 13-19 digit PANs written without separators, and the
+# usual grouped layouts: 4-4-4-4 and 4-6-4/4-6-5 (Diners/Amex).
+PII_SCANNER = PIIScanner(
+    r"(?=[\d(@])(?:"
+    r"\d(?<!\w\d)\d{2}(?:"
+    r"(?P<ssn>-\d{2}-\d{4}\b)"
+    r"|(?P<card>\d{10,16}\b)"
+    r"|(?P<card_grouped>\d[- ](?:\d{4}[- ]\d{4}[- ]\d{4}|\d{6}[- ]\d{4,5})(?=\s|[.,;!?]|$))"
+    r")"
+    r"|(?P<phone>\(?\d{3}\)?[-.\s]?\d{3}[-.\s]?\d{4}\b)"
+    r"|(?P<email>@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b)"
+    r")",
+    group_kinds={
+        "ssn": "ssn",
+        "card": "credit_card",
+        "card_grouped": "credit_card",
+        "phone": "phone",
+        "email": "email",
+    },
+    validators={"credit_card": luhn_valid},
+)
+
+PII_KINDS = ("ssn", "credit_card", "email", "phone")
+
+REDACTION_LABELS = {kind: f"[{kind.upper()}_REDACTED]" for kind in PII_KINDS}
+
+
+def find_pii(text: str) -> list[PIISpan]:
+    """Returns every PII finding in `text` as typed (kind, start, end) spans."""
+    if not isinstance(text, str):
+        return []
+    return PII_SCANNER.find(text)
+
+
+def count_pii(text: str) -> dict[str, int]:
+    """Counts PII findings in `text` by kind."""
+    if not isinstance(text, str):
+        return {}
+    return PII_SCANNER.count(text)
+
+
+def redact_pii(text: str, replacements: dict = None) -> str:
+    """Replaces every PII finding with a `[KIND_REDACTED]` label (or `replacements[kind]`)."""
+    if not isinstance(text, str):
+        return text
+    return PII_SCANNER.redact(text, replacements or REDACTION_LABELS)[0]
+
+
 def contains_pii(text: str) -> bool:
     """
     Detects Personally Identifiable Information (PII) in the given text using pre-compiled regexes.
@@ -59,16 +253,7 @@ def contains_pii(text: str) -> bool:
     """
     if not isinstance(text, str):
         return False
-    
-    # Check for SSN, emails, and phone numbers (indices 0, 3, 4)
-    for i in [0, 3, 4]:
-        if PII_PATTERNS[i].search(text):
-            return True
-    
-    # Check for credit cards (indices 1, 2) with Luhn validation
-    for i in [1, 2]:
-        match = PII_PATTERNS[i].search(text)
-        if match and _luhn_check(match.group(0)):
-            return True
-    
-    return False
+
+    # One pass over the text; stops at the first finding. Card candidates
+    # are Luhn-checked inside the scanner.
+    return PII_SCANNER.contains(text)
@@ -1,52 +1,66 @@
 """
 latency_tracker.py
 
-Measures and logs function latency with thresholds for performance governance.
+Measures function latency with thresholds for performance governance.
 Aligns with ISO/IEC 42001: Clause 6 (Risk Management), Clause 8 (Auditability).
+
+Every call is timed with `time.perf_counter_ns` into the shared metrics
+registry (histogram `triage_function_seconds`, exported with the pipeline
+stages on GET /metrics and in the periodic snapshots). Only calls that cross
+a threshold are written to monitoring/pipeline_health.txt, so a fast call
+costs no file I/O.
 """
 
 import time
-import json
+import sys
 from functools import wraps
 from pathlib import Path
 
+try:
+    from governance.audit_log import append_jsonl
+    from bot_engine.metrics import REGISTRY
+except ImportError:  # run standalone as python scripts/<area>/<script>.py
+    sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+    from governance.audit_log import append_jsonl
+    from bot_engine.metrics import REGISTRY
+
 LOG_FILE = Path("monitoring/pipeline_health.txt")
 
 def _log(event):
-    LOG_FILE.parent.mkdir(parents=True, exist_ok=True)
-    with LOG_FILE.open("a", encoding="utf-8") as f:
-        f.write(json.dumps(event) + "\n")
+    append_jsonl(LOG_FILE, event)
 
 def track_latency(name: str, warn_ms: int = 500, error_ms: int = 2000):
     """
-    Decorator to measure latency and log with thresholds.
+    Decorator to measure latency and log slow calls with thresholds.
     - name: label for the function being tracked
     - warn_ms: latency threshold for warning (milliseconds)
     - error_ms: latency threshold for error (milliseconds)
     """
+    histogram = REGISTRY.histogram("triage_function_seconds", "Latency of functions wrapped by track_latency",
+                                   function=name)
+    warn_ns, error_ns = warn_ms * 1_000_000, error_ms * 1_000_000
+
     def decorator(func):
         @wraps(func)
         def wrapper(*args, **kwargs):
-            start = time.time()
+            start = time.perf_counter_ns()
             try:
-                result = func(*args, **kwargs)
-                status = "ok"
-                return result
+                return func(*args, **kwargs)
             finally:
-                elapsed_ms = int((time.time() - start) * 1000)
-                if elapsed_ms >= error_ms:
-                    status = "error"
-                elif elapsed_ms >= warn_ms:
-                    status = "warn"
-                event = {
-                    "timestamp": time.strftime("%Y-%m-%d %H:%M:%S"),
-                    "component": name,
-                    "metric": "latency_ms",
-                    "value": elapsed_ms,
-                    "status": status,
-                    "thresholds": {"warn_ms": warn_ms, "error_ms": error_ms}
-                }
-                _log(event)
+                elapsed_ns = time.perf_counter_ns() - start
+                histogram.observe_ns(elapsed_ns)
+                if elapsed_ns >= warn_ns:
+                    status = "error" if elapsed_ns >= error_ns else "warn"
+                    REGISTRY.counter("triage_slow_calls_total", "Calls over a track_latency threshold",
+                                     function=name, status=status).inc()
+                    _log({
+                        "timestamp": time.strftime("%Y-%m-%d %H:%M:%S"),
+                        "component": name,
+                        "metric": "latency_ms",
+                        "value": round(elapsed_ns / 1e6, 3),
+                        "status": status,
+                        "thresholds": {"warn_ms": warn_ms, "error_ms": error_ms}
+                    })
         return wrapper
     return decorator
 
@@ -58,3 +72,4 @@ if __name__ == "__main__":
         return {"type": "routing", "confidence": 0.82}
 
     classify_ticket()
+    print(REGISTRY.prometheus_text())
@@ -5,11 +5,17 @@ Validates LLM outputs for required fields, types, and confidence bounds.
 Aligns with ISO/IEC 42001: Clause 6 (Risk Management), Clause 8 (Auditability).
 """
 
-import json
+import sys
 import time
 from pathlib import Path
 from typing import Dict, Any
 
+try:
+    from governance.audit_log import append_jsonl
+except ImportError:  # run standalone as python scripts/<area>/<script>.py
+    sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+    from governance.audit_log import append_jsonl
+
 LOG_FILE = Path("monitoring/pipeline_health.txt")
 
 REQUIRED_FIELDS = {
@@ -20,9 +26,7 @@ REQUIRED_FIELDS = {
 }
 
 def _log(event):
-    LOG_FILE.parent.mkdir(parents=True, exist_ok=True)
-    with LOG_FILE.open("a", encoding="utf-8") as f:
-        f.write(json.dumps(event) + "\n")
+    append_jsonl(LOG_FILE, event)
 
 def validate_output(payload: Dict[str, Any], min_confidence: float = 0.5) -> bool:
     """
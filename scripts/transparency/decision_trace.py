@@ -10,16 +10,20 @@ Aligns with ISO/IEC 42001: Clause 5 (Accountability), Clause 8 (Auditability).
 - Reviewed weekly by governance team.
 """
 
-import json
+import sys
 import time
 from pathlib import Path
 
+try:
+    from governance.audit_log import append_jsonl
+except ImportError:  # run standalone as python scripts/<area>/<script>.py
+    sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+    from governance.audit_log import append_jsonl
+
 LOG_FILE = Path("governance/decision_trace.jsonl")
 
 def _log(event):
-    LOG_FILE.parent.mkdir(parents=True, exist_ok=True)
-    with LOG_FILE.open("a", encoding="utf-8") as f:
-        f.write(json.dumps(event) + "\n")
+    append_jsonl(LOG_FILE, event)
 
 def log_decision_rationale(decision_id, rationale, confidence, actions, sanitized_input):
     """
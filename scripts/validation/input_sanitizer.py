@@ -6,20 +6,33 @@ Aligns with ISO/IEC 42001: Clause 6 (Risk Management), Clause 8 (Auditability).
 """
 
 import re
-import json
+import sys
 import time
 from pathlib import Path
 from typing import Dict, Any
 
+try:
+    from governance.audit_log import append_jsonl
+except ImportError:  # run standalone as python scripts/<area>/<script>.py
+    sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+    from governance.audit_log import append_jsonl
+from risk_controls.pii_filters import PIIScanner
+
 SANITIZED_LOG = Path("monitoring/pipeline_health.txt")
 
 PHONE_REGEX = re.compile(r"\b(?:\+?1[-.\s]?)?(?:\(?\d{3}\)?[-.\s]?)\d{3}[-.\s]?\d{4}\b")
 EMAIL_REGEX = re.compile(r"\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}\b")
 
+# Both patterns in one pass; the email branch starts at '@' (see PIIScanner)
+SANITIZER_SCANNER = PIIScanner(
+    rf"(?=[\d(+@])(?:(?P<phone>{PHONE_REGEX.pattern})|(?P<email>@[A-Za-z0-9.-]+\.[A-Za-z]{{2,}}\b))",
+    group_kinds={"phone": "phone", "email": "email"},
+)
+
+REDACTIONS = {"phone": "[PHONE_REDACTED]", "email": "[EMAIL_REDACTED]"}
+
 def _log(event):
-    SANITIZED_LOG.parent.mkdir(parents=True, exist_ok=True)
-    with SANITIZED_LOG.open("a", encoding="utf-8") as f:
-        f.write(json.dumps(event) + "\n")
+    append_jsonl(SANITIZED_LOG, event)
 
 def sanitize_input(text: str) -> Dict[str, Any]:
     """
@@ -28,21 +41,9 @@ def sanitize_input(text: str) -> Dict[str, Any]:
     - flags: list of detected risk markers
     - meta: counts of redactions by type
     """
-    flags = []
-    redactions = {"phone": 0, "email": 0}
-
-    def _redact_phone(m):
-        redactions["phone"] += 1
-        flags.append("phone_detected")
-        return "[PHONE_REDACTED]"
-
-    def _redact_email(m):
-        redactions["email"] += 1
-        flags.append("email_detected")
-        return "[EMAIL_REDACTED]"
-
-    sanitized = PHONE_REGEX.sub(_redact_phone, text)
-    sanitized = EMAIL_REGEX.sub(_redact_email, sanitized)
+    sanitized, counts = SANITIZER_SCANNER.redact(text, REDACTIONS)
+    redactions = {"phone": counts.get("phone", 0), "email": counts.get("email", 0)}
+    flags = [f"{kind}_detected" for kind, count in redactions.items() if count]
 
     event = {
         "timestamp": time.strftime("%Y-%m-%d %H:%M:%S"),
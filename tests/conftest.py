@@ -0,0 +1,43 @@
+# tests/conftest.py
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def no_classification_cache():
+    """Keeps the router's classification cache from leaking results between tests."""
+    from unittest.mock import patch
+    with patch('bot_engine.router.cache', None):
+        yield
+
+
+@pytest.fixture(autouse=True)
+def no_circuit_breaker():
+    """Keeps failures injected by one test from opening the shared breaker for the next."""
+    from unittest.mock import patch
+    with patch('bot_engine.router.circuit_breaker', None):
+        yield
+
+
+@pytest.fixture(autouse=True)
+def no_near_duplicates():
+    """Keeps classifications stored by one test from being reused by the next."""
+    from unittest.mock import patch
+    with patch('bot_engine.router.near_duplicates', None):
+        yield
+
+
+@pytest.fixture(autouse=True)
+def isolated_audit_logs(tmp_path):
+    """
+    Sends the router's fallback and LLM error logs to a temporary project
+    root on a writer of its own, so no test appends to (or rotates) the
+    repository's audit logs.
+    """
+    from unittest.mock import patch
+    from governance import audit_log
+    root = tmp_path / "project_root"
+    writer = audit_log.AuditLogWriter(**audit_log._settings)
+    with patch('bot_engine.router.get_project_root', lambda: root), \
+            patch.object(audit_log, '_default_writer', writer):
+        yield root
+        writer.close()
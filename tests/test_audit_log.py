@@ -0,0 +1,87 @@
+# tests/test_audit_log.py
+import json
+import threading
+import pytest
+from unittest.mock import patch
+from governance import audit_log
+from governance.audit_log import AuditLogWriter
+from bot_engine.router import log_entry
+
+def _read(path):
+    return [json.loads(line) for line in path.read_text().splitlines()]
+
+def test_flush_writes_queued_entries(tmp_path):
+    """Test that flush() blocks until every queued entry is on disk."""
+    writer = AuditLogWriter(flush_interval=60)
+    for i in range(10):
+        writer.write(tmp_path / "log.jsonl", {"n": i})
+
+    assert writer.flush(timeout=5)
+    assert [e["n"] for e in _read(tmp_path / "log.jsonl")] == list(range(10))
+    writer.close()
+
+def test_entries_are_group_committed(tmp_path):
+    """Test that a full batch is written in one commit."""
+    writer = AuditLogWriter(max_batch=50, flush_interval=60)
+    for i in range(50):
+        writer.write(tmp_path / "log.jsonl", {"n": i})
+    writer.close()
+
+    assert writer.entries_written == 50
+    assert writer.batches_written == 1
+    assert len(_read(tmp_path / "log.jsonl")) == 50
+
+def test_concurrent_writers_do_not_interleave(tmp_path):
+    """Test that lines from many threads stay intact."""
+    writer = AuditLogWriter(max_batch=64, flush_interval=0.01)
+    path = tmp_path / "log.jsonl"
+    payload = "x" * 5000
+
+    def produce(thread_id):
+        for i in range(100):
+            writer.write(path, {"thread": thread_id, "n": i, "payload": payload})
+
+    threads = [threading.Thread(target=produce, args=(t,)) for t in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    writer.close()
+
+    entries = _read(path)
+    assert len(entries) == 800
+    for thread_id in range(8):
+        assert [e["n"] for e in entries if e["thread"] == thread_id] == list(range(100))
+
+def test_close_flushes_and_late_writes_still_land(tmp_path):
+    """Test that shutdown loses nothing, including writes after close()."""
+    writer = AuditLogWriter(flush_interval=60)
+    writer.write(tmp_path / "a.jsonl", {"n": 1})
+    writer.close()
+    writer.write(tmp_path / "a.jsonl", {"n": 2})
+
+    assert [e["n"] for e in _read(tmp_path / "a.jsonl")] == [1, 2]
+
+@pytest.mark.parametrize("policy, expected", [("none", 0), ("every_batch", 3)])
+def test_fsync_policy(tmp_path, policy, expected):
+    """Test that the fsync policy controls how often data is synced."""
+    writer = AuditLogWriter(flush_interval=60, fsync=policy)
+    with patch("governance.audit_log.os.fsync") as fsync:
+        for i in range(3):
+            writer.write(tmp_path / "log.jsonl", {"n": i})
+            writer.flush(timeout=5)
+        assert fsync.call_count == expected
+        writer.close()
+
+def test_invalid_fsync_policy_rejected():
+    """Test that an unknown fsync policy is rejected up front."""
+    with pytest.raises(ValueError):
+        AuditLogWriter(fsync="sometimes")
+
+def test_router_log_entry_uses_shared_writer(tmp_path):
+    """Test that router.log_entry goes through the shared background writer."""
+    path = tmp_path / "governance" / "llm_error_log.jsonl"
+    log_entry(path, {"error": "boom"})
+
+    assert audit_log.flush(timeout=5)
+    assert _read(path) == [{"error": "boom"}]
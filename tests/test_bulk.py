@@ -0,0 +1,131 @@
+# tests/test_bulk.py
+import asyncio
+import csv
+import json
+import pytest
+from unittest.mock import patch
+from bot_engine.bulk import Checkpoint, read_records, run
+from bot_engine.circuit_breaker import CircuitBreaker, CircuitOpenError
+from bot_engine.fake_client import FakeGeminiClient
+
+MOCK_TICKET_TYPES = [
+    "access_request",
+    "billing_question",
+    "unknown"
+]
+
+def _keyword_responder(prompt):
+    if "invoice" in prompt:
+        return {"category": "billing_question", "confidence": 0.9}
+    return {"category": "access_request", "confidence": 0.8}
+
+def _write_jsonl(path, count):
+    with path.open("w") as f:
+        for i in range(count):
+            f.write(json.dumps({"id": f"t{i}", "ticket": f"invoice {i}" if i % 3 == 0 else f"login {i}"}) + "\n")
+
+@pytest.fixture
+def fake_llm():
+    fake = FakeGeminiClient(_keyword_responder, latency=0.005)
+    with patch('bot_engine.router.client', fake), \
+            patch('bot_engine.router.TICKET_TYPES', MOCK_TICKET_TYPES), \
+            patch('bot_engine.router.log_fallback'):
+        yield fake
+
+@pytest.mark.parametrize("ordered", [True, False])
+def test_classifies_whole_file(tmp_path, fake_llm, ordered):
+    source, output = tmp_path / "tickets.jsonl", tmp_path / "results.jsonl"
+    _write_jsonl(source, 50)
+
+    checkpoint = run(source, output, concurrency=4, ordered=ordered)
+
+    lines = [json.loads(line) for line in output.read_text().splitlines()]
+    ids = [line["id"] for line in lines]
+    expected = [f"t{i}" for i in range(50)]
+    assert ids == expected if ordered else sorted(ids) == sorted(expected)
+    types = {line["id"]: line["result"]["ticket_type"] for line in lines}
+    assert (types["t0"], types["t1"]) == ("billing_question", "access_request")
+    assert fake_llm.max_in_flight <= 4
+    assert checkpoint.complete and checkpoint.next_index == 50
+    assert checkpoint.input_offset == source.stat().st_size
+
+def test_csv_input_and_output(tmp_path, fake_llm):
+    source, output = tmp_path / "export.csv", tmp_path / "results.csv"
+    with source.open("w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["id", "body"])
+        writer.writerow(["1", "invoice is wrong\nplease check"])
+        writer.writerow(["2", "cannot log in"])
+
+    run(source, output, text_field="body", concurrency=2)
+
+    with output.open(newline="") as f:
+        rows = list(csv.DictReader(f))
+    assert [(r["id"], r["ticket_type"]) for r in rows] == [("1", "billing_question"), ("2", "access_request")]
+    assert [(r["decision_stage"], r["route"]) for r in rows] == [("llm", "automated_response")] * 2
+
+def test_csv_offsets_resume_mid_file(tmp_path):
+    source = tmp_path / "export.csv"
+    source.write_text('id,ticket\n1,"multi\nline"\n2,second\n')
+    first, second = read_records(source, "csv", "ticket", "id")
+    resumed = list(read_records(source, "csv", "ticket", "id", first.end_offset, 1))
+    assert first.text == "multi\nline"
+    assert [(r.index, r.record_id, r.text) for r in resumed] == [(1, "2", "second")]
+    assert resumed[0].end_offset == second.end_offset == source.stat().st_size
+
+@pytest.mark.parametrize("ordered", [True, False])
+def test_resume_after_crash_skips_finished_tickets(tmp_path, ordered):
+    source, output = tmp_path / "tickets.jsonl", tmp_path / "results.jsonl"
+    _write_jsonl(source, 40)
+    calls = []
+    fail_at = [15]
+
+    async def flaky_classify(ticket_text, timeout=None, semaphore=None, degrade=True):
+        calls.append(ticket_text)
+        if len(calls) == fail_at[0]:
+            raise RuntimeError("429 rate limited")
+        await asyncio.sleep(0.001 * (len(calls) % 3))
+        return {"ticket_type": "access_request", "confidence_score": 0.8, "contains_pii": False}
+
+    with patch('bot_engine.router.classify_ticket_async', flaky_classify):
+        with pytest.raises(RuntimeError):
+            run(source, output, concurrency=4, ordered=ordered, checkpoint_every=1)
+        saved = Checkpoint.load(output.with_name(output.name + ".checkpoint.json"))
+        assert not saved.complete
+        finished = saved.next_index + len(saved.done_above)
+        assert 0 < finished < 40
+
+        calls.clear()
+        fail_at[0] = 0
+        run(source, output, concurrency=4, ordered=ordered)
+
+    assert len(calls) == 40 - finished
+    ids = [json.loads(line)["id"] for line in output.read_text().splitlines()]
+    assert sorted(ids) == sorted(f"t{i}" for i in range(40))
+    if ordered:
+        assert ids == [f"t{i}" for i in range(40)]
+
+def test_checkpoint_for_other_input_is_rejected(tmp_path, fake_llm):
+    output = tmp_path / "results.jsonl"
+    for name in ("a.jsonl", "b.jsonl"):
+        _write_jsonl(tmp_path / name, 2)
+    run(tmp_path / "a.jsonl", output)
+    with pytest.raises(ValueError):
+        run(tmp_path / "b.jsonl", output)
+    run(tmp_path / "b.jsonl", output, restart=True)
+    assert len(output.read_text().splitlines()) == 2
+
+def test_open_circuit_stops_the_run_without_logging_fallbacks(tmp_path, fake_llm):
+    """Tickets refused by an open breaker are left for the resume, not audit-logged as degraded."""
+    source, output = tmp_path / "tickets.jsonl", tmp_path / "results.jsonl"
+    _write_jsonl(source, 10)
+    breaker = CircuitBreaker(window=2, min_calls=1, open_seconds=60)
+    breaker.record_failure()
+
+    with patch('bot_engine.router.circuit_breaker', breaker), \
+            patch('bot_engine.router.log_fallback') as mock_log_fallback:
+        with pytest.raises(CircuitOpenError):
+            run(source, output, concurrency=2)
+    mock_log_fallback.assert_not_called()
+    assert fake_llm.calls == 0
+    assert Checkpoint.load(output.with_name(output.name + ".checkpoint.json")).next_index == 0
@@ -0,0 +1,37 @@
+# tests/test_bulk_scan.py
+import random
+from risk_controls import contains_pii, contains_pii_batch, decode_mask, scan_many
+
+def _corpus(n, seed=7):
+    rng = random.Random(seed)
+    fragments = [
+        "Please reset my password.",
+        "My SSN is 123-45-6789.",
+        "Card 4532015112830366 was charged twice.",
+        "Order 4532015112830367 is late.",
+        "Email me at user@example.com",
+        "Call (555) 123-4567 after 5.",
+        "The printer on floor 3 is jammed.",
+    ]
+    return [" ".join(rng.sample(fragments, rng.randint(0, 3))) for _ in range(n)] + [None, 123]
+
+def test_masks_report_each_kind():
+    """Test that the bitmask records which kinds were found."""
+    masks = scan_many(["SSN 123-45-6789 and user@example.com", "nothing here", None], workers=1)
+    assert list(masks) == [1 | 4, 0, 0]
+    assert decode_mask(masks[0]) == ("ssn", "email")
+
+def test_serial_scan_matches_contains_pii_loop():
+    """Test that bulk results are identical to calling contains_pii per ticket."""
+    corpus = _corpus(500)
+    assert contains_pii_batch(corpus, workers=1) == [contains_pii(t) for t in corpus]
+
+def test_pool_scan_matches_contains_pii_loop_on_iterator():
+    """Test that the process-pool path keeps order and accepts iterators."""
+    corpus = _corpus(3000)
+    result = contains_pii_batch(iter(corpus), workers=2, chunk_size=100, parallel_threshold=500)
+    assert result == [contains_pii(t) for t in corpus]
+
+def test_empty_input():
+    """Test that an empty batch returns an empty result."""
+    assert len(scan_many([])) == 0
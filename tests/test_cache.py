@@ -0,0 +1,174 @@
+# tests/test_cache.py
+import json
+import pytest
+from unittest.mock import patch, MagicMock
+from bot_engine.cache import MemoryCache, SQLiteCache, build_cache, make_cache_key
+from bot_engine.router import classify_ticket
+
+MOCK_TICKET_TYPES = [
+    "access_request",
+    "billing_question",
+    "technical_support",
+    "unknown"
+]
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+# --- Keys ---
+
+def test_key_ignores_whitespace_and_case():
+    """Test that trivially different copies of a ticket share a key."""
+    key = make_cache_key("Reset my  password", "m", "v1", ["a", "b"])
+    assert key == make_cache_key("  reset MY password\n", "m", "v1", ["a", "b"])
+
+@pytest.mark.parametrize("model, version, types", [
+    ("other-model", "v1", ["a", "b"]),
+    ("m", "v2", ["a", "b"]),
+    ("m", "v1", ["a", "b", "c"]),
+])
+def test_key_changes_with_model_prompt_or_categories(model, version, types):
+    """Test that a model, prompt or category change invalidates every key."""
+    assert make_cache_key("ticket", model, version, types) != make_cache_key("ticket", "m", "v1", ["a", "b"])
+
+# --- Backends ---
+
+@pytest.fixture(params=["memory", "sqlite"])
+def make_backend(request, tmp_path):
+    def factory(max_entries=10, ttl_seconds=60, clock=None):
+        clock = clock or FakeClock()
+        if request.param == "memory":
+            return MemoryCache(max_entries=max_entries, ttl_seconds=ttl_seconds, clock=clock)
+        return SQLiteCache(tmp_path / "cache.sqlite3", max_entries=max_entries, ttl_seconds=ttl_seconds, clock=clock)
+    return factory
+
+def test_hit_and_miss_counters(make_backend):
+    """Test that lookups are counted as hits or misses."""
+    cache = make_backend()
+    assert cache.get("k") is None
+    cache.set("k", ("access_request", 0.9))
+    assert cache.get("k") == ("access_request", 0.9)
+    assert cache.stats.hits == 1
+    assert cache.stats.misses == 1
+    assert cache.stats.stores == 1
+
+def test_ttl_expiry(make_backend):
+    """Test that entries older than the TTL are not served."""
+    clock = FakeClock()
+    cache = make_backend(ttl_seconds=10, clock=clock)
+    cache.set("k", ("access_request", 0.9))
+    clock.now += 11
+    assert cache.get("k") is None
+    assert cache.stats.expirations == 1
+    assert len(cache) == 0
+
+def test_lru_eviction(make_backend):
+    """Test that the least recently used entry is evicted first."""
+    clock = FakeClock()
+    cache = make_backend(max_entries=2, clock=clock)
+    cache.set("a", ("access_request", 0.9))
+    clock.now += 1
+    cache.set("b", ("billing_question", 0.8))
+    clock.now += 1
+    cache.get("a")
+    clock.now += 1
+    cache.set("c", ("unknown", 0.1))
+
+    assert cache.get("b") is None
+    assert cache.get("a") == ("access_request", 0.9)
+    assert cache.stats.evictions == 1
+    assert len(cache) == 2
+
+def test_sqlite_cache_survives_restart(tmp_path):
+    """Test that the on-disk backend keeps entries across instances."""
+    path = tmp_path / "cache.sqlite3"
+    first = SQLiteCache(path)
+    first.set("k", ("billing_question", 0.75))
+    first.close()
+
+    second = SQLiteCache(path)
+    assert second.get("k") == ("billing_question", 0.75)
+    assert len(second) == 1
+
+def test_build_cache_backends(tmp_path):
+    """Test that scope.yaml settings select the right backend."""
+    assert build_cache({"backend": "none"}, tmp_path) is None
+    assert isinstance(build_cache({}, tmp_path), MemoryCache)
+    sqlite_cache = build_cache({"backend": "sqlite", "sqlite_path": "c.sqlite3"}, tmp_path)
+    assert isinstance(sqlite_cache, SQLiteCache)
+    assert sqlite_cache.path == tmp_path / "c.sqlite3"
+    with pytest.raises(ValueError):
+        build_cache({"backend": "redis"}, tmp_path)
+
+# --- Router integration ---
+
+@patch('bot_engine.router.TICKET_TYPES', MOCK_TICKET_TYPES)
+@patch('bot_engine.router.client')
+def test_duplicate_ticket_skips_llm(mock_client):
+    """Test that a repeated ticket is answered from the cache with the same result."""
+    mock_client.models.generate_content.return_value.text = json.dumps({
+        "category": "access_request",
+        "confidence": 0.92
+    })
+
+    with patch('bot_engine.router.cache', MemoryCache()):
+        first = classify_ticket("Please reset my password.")
+        second = classify_ticket("please reset my   password.")
+
+    assert mock_client.models.generate_content.call_count == 1
+    assert (first.pop("decision_stage"), second.pop("decision_stage")) == ("llm", "cache")
+    assert first == second
+
+@patch('bot_engine.router.TICKET_TYPES', MOCK_TICKET_TYPES)
+@patch('bot_engine.router.log_llm_error')
+@patch('bot_engine.router.client')
+def test_failed_call_is_not_cached(mock_client, mock_log_error):
+    """Test that LLM failures are retried rather than served from the cache."""
+    mock_client.models.generate_content.side_effect = Exception("API Error")
+
+    with patch('bot_engine.router.cache', MemoryCache()) as cache:
+        classify_ticket("My request is urgent.")
+        classify_ticket("My request is urgent.")
+
+    assert mock_client.models.generate_content.call_count == 2
+    assert len(cache) == 0
+
+@patch('bot_engine.router.TICKET_TYPES', MOCK_TICKET_TYPES)
+@patch('bot_engine.router.log_fallback', MagicMock())
+@patch('bot_engine.router.client')
+def test_invalid_category_is_not_cached(mock_client):
+    """Test that an answer failing validation is retried and routed the same way both times."""
+    mock_client.models.generate_content.return_value.text = json.dumps({
+        "category": "made_up_category",
+        "confidence": 0.95
+    })
+
+    with patch('bot_engine.router.cache', MemoryCache()) as cache:
+        first = classify_ticket("Something odd happened.")
+        second = classify_ticket("Something odd happened.")
+
+    assert mock_client.models.generate_content.call_count == 2
+    assert len(cache) == 0
+    assert first == second
+    assert first["decision_stage"] == "llm"
+
+@patch('bot_engine.router.log_fallback', MagicMock())
+@patch('bot_engine.router.client')
+def test_category_change_invalidates_cache(mock_client):
+    """Test that changing TICKET_TYPES stops old entries from being served."""
+    mock_client.models.generate_content.return_value.text = json.dumps({
+        "category": "access_request",
+        "confidence": 0.92
+    })
+
+    with patch('bot_engine.router.cache', MemoryCache()):
+        with patch('bot_engine.router.TICKET_TYPES', MOCK_TICKET_TYPES):
+            classify_ticket("Grant me access to the share.")
+        with patch('bot_engine.router.TICKET_TYPES', MOCK_TICKET_TYPES + ["security_issue"]):
+            classify_ticket("Grant me access to the share.")
+
+    assert mock_client.models.generate_content.call_count == 2
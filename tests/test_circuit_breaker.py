@@ -0,0 +1,119 @@
+# tests/test_circuit_breaker.py
+import asyncio
+import pytest
+from unittest.mock import patch
+from bot_engine.circuit_breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker, CircuitOpenError
+from bot_engine.fake_client import FakeGeminiClient
+from bot_engine.rate_limit import LoadShedError
+from bot_engine.router import classify_ticket, classify_ticket_async, classify_tickets
+
+MOCK_TICKET_TYPES = [
+    "access_request",
+    "unknown"
+]
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+def _fail():
+    raise ConnectionError("503 Service Unavailable")
+
+def _breaker(clock, **kwargs):
+    settings = dict(window=10, failure_rate=0.5, min_calls=4, open_seconds=30, clock=clock)
+    settings.update(kwargs)
+    return CircuitBreaker(**settings)
+
+def _trip(breaker, failures=4):
+    for _ in range(failures):
+        with pytest.raises(ConnectionError):
+            breaker.call(_fail)
+
+def test_opens_once_failure_rate_is_reached():
+    breaker = _breaker(FakeClock())
+    for _ in range(3):
+        breaker.call(lambda: "ok")
+    _trip(breaker, 2)
+    assert breaker.state == CLOSED
+    _trip(breaker, 1)
+    assert breaker.state == OPEN
+
+    with pytest.raises(CircuitOpenError) as error:
+        breaker.call(lambda: "ok")
+    assert error.value.retry_after == 30
+    assert breaker.snapshot()["rejected"] == 1
+
+def test_half_open_probe_closes_or_reopens():
+    clock = FakeClock()
+    breaker = _breaker(clock)
+    _trip(breaker)
+
+    clock.now = 30
+    _trip(breaker, 1)
+    assert breaker.state == OPEN
+
+    clock.now = 60
+    assert breaker.allow()
+    assert breaker.state == HALF_OPEN
+    assert not breaker.allow()  # one probe at a time
+    breaker.record_success()
+    assert breaker.state == CLOSED
+    assert breaker.snapshot()["opened_count"] == 2
+
+def test_ignored_errors_release_the_probe():
+    clock = FakeClock()
+    breaker = _breaker(clock, ignore=(LoadShedError,))
+    _trip(breaker)
+    clock.now = 30
+
+    def shed():
+        raise LoadShedError("quota")
+
+    with pytest.raises(LoadShedError):
+        breaker.call(shed)
+    assert breaker.state == HALF_OPEN
+    assert breaker.call(lambda: "ok") == "ok"
+    assert breaker.state == CLOSED
+
+def test_open_circuit_routes_tickets_to_degraded_path():
+    def responder(prompt):
+        raise ConnectionError("Gemini is down")
+
+    fake = FakeGeminiClient(responder)
+    breaker = CircuitBreaker(window=10, min_calls=3, open_seconds=60)
+    with patch('bot_engine.router.client', fake), \
+            patch('bot_engine.router.TICKET_TYPES', MOCK_TICKET_TYPES), \
+            patch('bot_engine.router.circuit_breaker', breaker), \
+            patch('bot_engine.router.rate_limiter', None), \
+            patch('bot_engine.router.log_llm_error') as mock_log_error, \
+            patch('bot_engine.router.log_fallback') as mock_log_fallback:
+        for _ in range(3):
+            assert "degraded" not in classify_ticket("I need VPN access")
+        assert breaker.state == OPEN
+
+        result = classify_ticket("I need VPN access")
+        batch = classify_tickets(["printer jam", "vpn"])
+        async_result = asyncio.run(classify_ticket_async("vpn", timeout=5))
+
+    assert fake.calls == 3
+    assert mock_log_error.call_count == 3
+    for degraded in [result, *batch, async_result]:
+        assert degraded["ticket_type"] == "unknown"
+        assert degraded["route"] == "support_queue"
+        assert degraded["degraded"] is True
+    assert mock_log_fallback.call_args.args[1]["route"] == "support_queue"
+
+def test_async_deadline_counts_as_failure():
+    fake = FakeGeminiClient(lambda prompt: {"category": "access_request", "confidence": 0.9}, latency=1.0)
+    breaker = CircuitBreaker(window=2, min_calls=2)
+    with patch('bot_engine.router.client', fake), \
+            patch('bot_engine.router.TICKET_TYPES', MOCK_TICKET_TYPES), \
+            patch('bot_engine.router.circuit_breaker', breaker), \
+            patch('bot_engine.router.log_llm_error'), \
+            patch('bot_engine.router.log_fallback'):
+        for _ in range(2):
+            asyncio.run(classify_ticket_async("vpn", timeout=0.01))
+    assert breaker.state == OPEN
@@ -0,0 +1,108 @@
+# tests/test_config.py
+import dataclasses
+import json
+import os
+from unittest.mock import patch
+import pytest
+import bot_engine.router as router
+from bot_engine.config import ConfigError, ConfigStore, compile_snapshot, load_snapshot
+from bot_engine.fake_client import FakeGeminiClient
+
+SCOPE = """
+bot_config:
+  confidence_threshold: {threshold}
+  model_name: "gemini-test"
+ticket_types: [{types}]
+escalation_rules:
+  - "if contains_pii: escalate_to: human_agent"
+"""
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+def _write(path, threshold=0.5, types="password_reset, unknown"):
+    path.write_text(SCOPE.format(threshold=threshold, types=types))
+    # Make every rewrite visible to the mtime/size check, even within one clock tick
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+def test_snapshot_is_compiled_and_read_only():
+    snapshot = compile_snapshot({
+        "bot_config": {"confidence_threshold": 0.6},
+        "ticket_types": ["billing_question", "unknown"],
+        "cache": {"backend": "memory"},
+    }, "abc")
+    assert snapshot.categories == frozenset({"billing_question", "unknown"})
+    assert snapshot.confidence_threshold == 0.6
+    assert snapshot.section("cache")["backend"] == "memory"
+    assert snapshot.section("serve") == {}
+    with pytest.raises(TypeError):
+        snapshot.data["cache"]["backend"] = "sqlite"
+    with pytest.raises(dataclasses.FrozenInstanceError):
+        snapshot.model_name = "other"
+
+def test_validation_reports_every_problem():
+    with pytest.raises(ConfigError) as error:
+        compile_snapshot({
+            "bot_config": {"confidence_threshold": 1.5, "model_name": ""},
+            "ticket_types": ["billing_question", "billing_question"],
+            "cache": ["memory"],
+        }, "abc")
+    message = str(error.value)
+    for problem in ("confidence_threshold", "model_name", "duplicates", "'unknown'", "cache must be a mapping"):
+        assert problem in message
+    with pytest.raises(ConfigError):
+        compile_snapshot(["not", "a", "mapping"], "abc")
+
+def test_unchanged_file_is_loaded_from_json_snapshot(tmp_path):
+    scope, cache = tmp_path / "scope.yaml", tmp_path / "cache" / "scope.snapshot.json"
+    _write(scope)
+    first, hit = load_snapshot(scope, cache)
+    assert not hit and json.loads(cache.read_text())["source_hash"] == first.source_hash
+    second, hit = load_snapshot(scope, cache)
+    assert hit and second == first
+
+    _write(scope, threshold=0.7)
+    third, hit = load_snapshot(scope, cache)
+    assert not hit and third.confidence_threshold == 0.7
+
+def test_store_swaps_in_edits_and_keeps_last_good_snapshot(tmp_path, capsys):
+    scope, clock = tmp_path / "scope.yaml", FakeClock()
+    _write(scope)
+    store = ConfigStore(scope, check_interval=2, clock=clock)
+    original = store.current()
+
+    _write(scope, threshold=0.8)
+    assert store.current() is original  # not checked again yet
+    clock.now = 2
+    assert store.current().confidence_threshold == 0.8
+
+    _write(scope, threshold=3)
+    clock.now = 4
+    assert store.current().confidence_threshold == 0.8
+    assert "confidence_threshold" in capsys.readouterr().err
+    assert store.stats["reloads"] == 1 and store.stats["reload_errors"] == 1
+
+def test_router_follows_edited_threshold_and_categories(tmp_path):
+    scope, clock = tmp_path / "scope.yaml", FakeClock()
+    _write(scope, threshold=0.5, types="password_reset, unknown")
+    fake = FakeGeminiClient(lambda prompt: {"category": "billing_question", "confidence": 0.9})
+    try:
+        with patch('bot_engine.router.config_store', ConfigStore(scope, check_interval=1, clock=clock)), \
+                patch('bot_engine.router.client', fake), \
+                patch('bot_engine.router.log_fallback'):
+            before = router.classify_ticket("Why was I billed twice?")
+            _write(scope, threshold=0.95, types="password_reset, billing_question, unknown")
+            clock.now = 1
+            after = router.classify_ticket("Why was I billed twice?")
+            assert router.MODEL_NAME == "gemini-test"
+    finally:
+        router.apply_config(router.config_store.current())
+
+    assert before["ticket_type"] == "unknown"
+    assert after["ticket_type"] == "billing_question" and after["model"] == "gemini-test"
+    assert router.CONFIDENCE_THRESHOLD != 0.95
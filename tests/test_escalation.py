@@ -0,0 +1,82 @@
+# tests/test_escalation.py
+import json
+from unittest.mock import patch
+import pytest
+from bot_engine.config import ConfigError, compile_snapshot
+from bot_engine.escalation import EscalationPolicy, EscalationRuleError, parse_rule
+from bot_engine.router import classify_ticket, classify_tickets
+
+ESCALATION_RULES = [
+    "if ticket_type == compliance_flag: escalate_to: human_agent",
+    "if confidence_score < 0.7: escalate_to: human_agent",
+    "if contains_pii: escalate_to: human_agent",
+    "else: route_to: automated_response",
+]
+FALLBACK_PROTOCOL = [
+    "if LLM fails to classify: route_to: support_queue",
+    "if escalation fails: notify: AI Governance Lead",
+]
+
+def _result(ticket_type="billing_question", confidence=0.9, pii=False, stage="llm", **extra):
+    return {"ticket_type": ticket_type, "confidence_score": confidence, "contains_pii": pii,
+            "decision_stage": stage, **extra}
+
+def test_scope_rules_route_in_priority_order():
+    policy = EscalationPolicy(ESCALATION_RULES, FALLBACK_PROTOCOL)
+    assert policy.route(_result()) == "automated_response"
+    assert policy.route(_result("compliance_flag")) == "human_agent"
+    assert policy.route(_result(confidence=0.69)) == "human_agent"
+    assert policy.route(_result(pii=True)) == "human_agent"
+    assert policy.route(_result("unknown", 0.0)) == "support_queue"
+    assert policy.route(_result("unknown", 0.0, stage="cache")) == "support_queue"
+    assert policy.route(_result("unknown", 0.0, stage="near_duplicate")) == "support_queue"
+    assert policy.route(_result("unknown", 0.0, stage="empty")) == "human_agent"
+    assert policy.route(_result(degraded=True)) == "support_queue"
+    assert [rule.target for rule in policy.notifications] == ["AI Governance Lead"]
+
+def test_conditions_support_boolean_operators_and_literals():
+    policy = EscalationPolicy([
+        "if ticket_type == 'hardware_issue' and not contains_pii: route_to: field_team",
+        "if confidence_score >= 0.95 or decision_stage == rules: route_to: auto",
+        "if priority > 2: route_to: on_call",
+    ])
+    assert policy.route(_result("hardware_issue")) == "field_team"
+    assert policy.route(_result("hardware_issue", pii=True)) is None
+    assert policy.route(_result(confidence=0.97)) == "auto"
+    assert policy.route(_result(stage="rules")) == "auto"
+    # A missing field never matches an ordering comparison
+    assert policy.route(_result()) is None
+    assert policy.route_many([_result(priority=3), _result(confidence=0.99)]) == ["on_call", "auto"]
+
+def test_apply_keeps_an_existing_route():
+    policy = EscalationPolicy(ESCALATION_RULES, FALLBACK_PROTOCOL)
+    results = policy.apply_many([_result(), _result(degraded=True, route="pager")])
+    assert [r["route"] for r in results] == ["automated_response", "pager"]
+
+@pytest.mark.parametrize("rule", [
+    "escalate_to: human_agent",
+    "when contains_pii: escalate_to: human_agent",
+    "if contains_pii: page: human_agent",
+    "if confidence_score <: escalate_to: human_agent",
+    "if the moon is full: route_to: support_queue",
+])
+def test_malformed_rules_are_rejected(rule):
+    with pytest.raises(EscalationRuleError):
+        EscalationPolicy([rule])
+
+def test_bad_rules_fail_config_validation():
+    assert parse_rule("else: route_to: queue").condition is None
+    with pytest.raises(ConfigError, match="escalation rules"):
+        compile_snapshot({"ticket_types": ["unknown"], "escalation_rules": ["if x ~ 1: route_to: a"]}, "abc")
+
+@patch('bot_engine.router.log_fallback')
+@patch('bot_engine.router.client')
+def test_router_adds_route_to_every_result(mock_client, mock_log_fallback):
+    mock_client.models.generate_content.return_value.text = json.dumps(
+        {"category": "compliance_flag", "confidence": 0.92})
+
+    result = classify_ticket("Someone shared customer data externally")
+    blank, = classify_tickets(["   "])
+
+    assert result["route"] == "human_agent"
+    assert blank["route"] == "human_agent"
@@ -0,0 +1,66 @@
+# tests/test_fake_client.py
+from unittest.mock import patch
+import pytest
+from bot_engine.fake_client import FakeAPIError, FakeGeminiClient, latency_distribution
+from bot_engine.rate_limit import RateLimiter
+from bot_engine.router import classify_ticket
+
+MOCK_TICKET_TYPES = [
+    "access_request",
+    "unknown"
+]
+
+def _answer(prompt):
+    return {"category": "access_request", "confidence": 0.9}
+
+def _faults(seed):
+    fake = FakeGeminiClient(_answer, error_rate=0.1, rate_limit_rate=0.1, malformed_rate=0.1, seed=seed)
+    outcomes = []
+    for _ in range(2000):
+        try:
+            outcomes.append(fake.models.generate_content(model="m", contents="ticket").text)
+        except FakeAPIError as e:
+            outcomes.append(e.code)
+    return fake, outcomes
+
+def test_faults_are_injected_at_the_configured_rates_and_repeat_per_seed():
+    fake, outcomes = _faults(seed=5)
+    assert fake.calls == 2000
+    for fault in ("server_error", "rate_limited", "malformed"):
+        assert 140 < fake.faults[fault] < 260
+    assert outcomes.count(503) == fake.faults["server_error"]
+    assert outcomes.count(429) == fake.faults["rate_limited"]
+    assert _faults(seed=5)[1] == outcomes
+    assert _faults(seed=6)[1] != outcomes
+
+def test_fault_rates_cannot_exceed_one():
+    with pytest.raises(ValueError):
+        FakeGeminiClient(error_rate=0.6, malformed_rate=0.5)
+
+@pytest.mark.parametrize("spec", ["0.01", "uniform:0.01,0.02", "exp:0.01", "lognormal:0.01,0.5"])
+def test_latency_distributions(spec):
+    delay = latency_distribution(spec, seed=1)
+    delays = [delay() for _ in range(200)]
+    assert all(d >= 0 for d in delays)
+    again = latency_distribution(spec, seed=1)
+    assert [again() for _ in range(200)] == delays
+
+@pytest.mark.parametrize("spec", ["", "slow", "-1", "uniform:1", "lognormal:0,1", "gamma:1,2"])
+def test_invalid_latency_specs(spec):
+    with pytest.raises(ValueError):
+        latency_distribution(spec)
+
+def test_router_retries_injected_quota_errors_and_logs_malformed_answers():
+    fake = FakeGeminiClient(_answer, rate_limit_rate=0.3, malformed_rate=0.2, seed=3)
+    limiter = RateLimiter(adaptive=False, sleep=lambda seconds: None)
+    with patch('bot_engine.router.client', fake), \
+            patch('bot_engine.router.TICKET_TYPES', MOCK_TICKET_TYPES), \
+            patch('bot_engine.router.rate_limiter', limiter), \
+            patch('bot_engine.router.log_fallback'), \
+            patch('bot_engine.router.log_llm_error') as mock_log_error:
+        results = [classify_ticket(f"I need VPN access {i}") for i in range(50)]
+
+    assert limiter.stats.retries == fake.faults["rate_limited"] > 0
+    assert mock_log_error.call_count == fake.faults["malformed"] > 0
+    unknown = sum(1 for r in results if r["ticket_type"] == "unknown")
+    assert unknown == fake.faults["malformed"]
@@ -0,0 +1,102 @@
+import math
+import random
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from tools.fallback_columnar import (
+    ColumnarReader,
+    ColumnarWriter,
+    NULL_CATEGORY,
+    NULL_TIMESTAMP,
+    timestamp_micros,
+)
+
+START = datetime(2026, 2, 1, tzinfo=timezone.utc)
+
+
+def _entries(count, seed=9):
+    rng = random.Random(seed)
+    entries = []
+    for i in range(count):
+        result = {}
+        if rng.random() < 0.9:
+            result["ticket_type"] = rng.choice(["billing_question", "unknown", "software_issue"])
+        if rng.random() < 0.9:
+            result["confidence_score"] = round(rng.random(), 2)
+        result["contains_pii"] = rng.random() < 0.2
+        entry = {"ticket": f"Ticket {i} – café ☕ " * rng.randint(0, 3), "result": result}
+        if rng.random() < 0.9:
+            entry["timestamp"] = (START + timedelta(seconds=rng.randint(0, 10**7))).isoformat()
+        entries.append(entry)
+    return entries
+
+
+def test_round_trip_across_chunks(tmp_path):
+    entries = _entries(1000)
+    path = tmp_path / "export.fbc"
+    with ColumnarWriter(path, chunk_rows=128) as writer:
+        for entry in entries:
+            writer.write(entry)
+
+    reader = ColumnarReader(path)
+    assert reader.rows == 1000
+    assert len(reader.footer["chunks"]) == 8
+
+    for entry, row in zip(entries, reader.iter_rows()):
+        result = entry["result"]
+        assert row["ticket_text"] == entry["ticket"]
+        assert row["ticket_type"] == result.get("ticket_type")
+        assert row["contains_pii"] == result["contains_pii"]
+        if "confidence_score" in result:
+            assert math.isclose(row["confidence_score"], result["confidence_score"], rel_tol=1e-6)
+        else:
+            assert row["confidence_score"] is None
+        if "timestamp" in entry:
+            assert row["timestamp"] == int(datetime.fromisoformat(entry["timestamp"]).timestamp() * 1e6)
+        else:
+            assert row["timestamp"] is None
+
+
+def test_read_columns_returns_typed_arrays(tmp_path):
+    entries = _entries(300)
+    path = tmp_path / "export.fbc"
+    with ColumnarWriter(path, chunk_rows=100) as writer:
+        for entry in entries:
+            writer.write(entry)
+
+    columns = ColumnarReader(path).read_columns()
+    assert columns["timestamp"].typecode == "q"
+    assert columns["confidence_score"].typecode == "f"
+    assert len(columns["ticket_type"]) == 300
+    decoded = [None if code == NULL_CATEGORY else columns["categories"][code] for code in columns["ticket_type"]]
+    assert decoded == [e["result"].get("ticket_type") for e in entries]
+    assert sum(columns["contains_pii"]) == sum(e["result"]["contains_pii"] for e in entries)
+
+
+def test_timestamp_micros_and_bad_files(tmp_path):
+    assert timestamp_micros("1970-01-01T00:00:01.5Z") == 1_500_000
+    assert timestamp_micros("1970-01-01T01:00:00+01:00") == 0
+    assert timestamp_micros("not a date") == NULL_TIMESTAMP
+    assert timestamp_micros(None) == NULL_TIMESTAMP
+
+    bogus = tmp_path / "export.fbc"
+    bogus.write_bytes(b"timestamp,ticket_type\n")
+    with pytest.raises(ValueError):
+        ColumnarReader(bogus)
+
+
+def test_arrow_round_trip(tmp_path):
+    pytest.importorskip("pyarrow")
+    from tools.fallback_columnar import ArrowWriter, read_arrow
+
+    entries = _entries(500)
+    path = tmp_path / "export.arrows"
+    with ArrowWriter(path, chunk_rows=128) as writer:
+        for entry in entries:
+            writer.write(entry)
+
+    table = read_arrow(path)
+    assert table.num_rows == 500
+    assert table.column("ticket_text").to_pylist() == [e["ticket"] for e in entries]
+    assert table.column("ticket_type").to_pylist() == [e["result"].get("ticket_type") for e in entries]
@@ -0,0 +1,68 @@
+import math
+import random
+from datetime import datetime, timedelta, timezone
+
+from tools.fallback_stats import FallbackStats
+
+START = datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+
+def _entries(count, seed=5):
+    rng = random.Random(seed)
+    entries = []
+    for i in range(count):
+        result = {"ticket_type": rng.choice(["billing_question", "unknown", "software_issue"])}
+        if rng.random() < 0.9:
+            result["confidence_score"] = round(rng.random(), 2)
+        if rng.random() < 0.5:
+            result["contains_pii"] = rng.random() < 0.3
+        entry = {"ticket": f"t{i}", "result": result}
+        if rng.random() < 0.95:
+            entry["timestamp"] = (START + timedelta(minutes=rng.randint(0, 10**6))).isoformat()
+        entries.append(entry)
+    return entries
+
+
+def test_single_pass_matches_list_based_summary():
+    entries = _entries(3000)
+    stats = FallbackStats.from_entries(entries)
+
+    scores = [e["result"]["confidence_score"] for e in entries if "confidence_score" in e["result"]]
+    timestamps = [datetime.fromisoformat(e["timestamp"]) for e in entries if "timestamp" in e]
+    assert stats.total == len(entries)
+    assert sum(stats.categories.values()) == len(entries)
+    assert stats.confidence_count == len(scores)
+    assert math.isclose(stats.confidence_mean, sum(scores) / len(scores))
+    assert (stats.confidence_min, stats.confidence_max) == (min(scores), max(scores))
+    assert stats.pii_count == sum(1 for e in entries if e["result"].get("contains_pii"))
+    assert (stats.oldest, stats.newest) == (min(timestamps), max(timestamps))
+
+    ordered = sorted(scores)
+    for percent in (1, 25, 50, 90, 99, 100):
+        rank = math.ceil(percent / 100 * len(ordered))
+        assert stats.confidence_percentile(percent) == ordered[rank - 1]
+
+
+def test_merged_shards_equal_one_pass():
+    entries = _entries(2000)
+    whole = FallbackStats.from_entries(entries)
+    merged = FallbackStats()
+    for shard in (entries[:700], entries[700:701], [], entries[701:]):
+        merged.merge(FallbackStats.from_entries(shard))
+
+    assert merged.total == whole.total
+    assert merged.categories == whole.categories
+    assert merged.confidence_histogram == whole.confidence_histogram
+    assert (merged.confidence_min, merged.confidence_max) == (whole.confidence_min, whole.confidence_max)
+    assert (merged.oldest, merged.newest, merged.pii_count) == (whole.oldest, whole.newest, whole.pii_count)
+
+
+def test_empty_and_folded_histogram():
+    stats = FallbackStats()
+    assert stats.confidence_percentile(50) is None
+    assert stats.confidence_mean is None
+
+    for score in (0.0, 0.05, 0.1, 0.95, 1.0):
+        stats.add({"result": {"confidence_score": score}})
+    counts = [count for _, _, count in stats.confidence_buckets()]
+    assert counts == [2, 1, 0, 0, 0, 0, 0, 0, 0, 2]
@@ -0,0 +1,154 @@
+import json
+import random
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from tools.fallback_index import FallbackIndex
+from tools.fallback_viewer import (
+    FallbackLogStream,
+    FallbackLogViewer,
+    category_filter,
+    confidence_filter,
+    date_range_filter,
+    pii_filter,
+)
+
+NOW = datetime(2026, 3, 1, 12, 0, tzinfo=timezone.utc)
+CATEGORIES = ["billing_question", "software_issue", "access_request", "unknown"]
+
+
+def _entry(rng, i):
+    timestamp = NOW - timedelta(hours=rng.uniform(0, 24 * 30))
+    return {
+        "ticket": f"ticket {i} \"ticket_type\": \"billing_question\" contains_pii true",
+        "result": {
+            "ticket_type": rng.choice(CATEGORIES),
+            "confidence_score": round(rng.random(), 2),
+            "contains_pii": rng.random() < 0.3,
+        },
+        "timestamp": timestamp.isoformat(),
+    }
+
+
+@pytest.fixture
+def log_path(tmp_path):
+    rng = random.Random(7)
+    path = tmp_path / "fallback_log.jsonl"
+    with path.open("w") as f:
+        for i in range(2000):
+            entry = _entry(rng, i)
+            # Mix compact and default separators; prefilters must accept both
+            separators = (",", ":") if i % 3 == 0 else None
+            f.write(json.dumps(entry, separators=separators) + "\n")
+    return path
+
+
+def _tickets(entries):
+    return [e["ticket"] for e in entries]
+
+
+def test_stream_matches_in_memory_filters(log_path, monkeypatch):
+    """Every streaming filter selects exactly what the loaded viewer selects."""
+    viewer = FallbackLogViewer(log_path)
+    monkeypatch.setattr("tools.fallback_viewer.datetime", _FrozenDatetime)
+    viewer.filter_by_date_range(7)
+    viewer.filter_by_confidence(0.2, 0.6)
+    viewer.filter_by_category("billing_question")
+    viewer.filter_by_pii(contains_pii=False)
+
+    stream = FallbackLogStream(log_path, [
+        date_range_filter(7, now=NOW),
+        confidence_filter(0.2, 0.6),
+        category_filter("billing_question"),
+        pii_filter(contains_pii=False),
+    ])
+
+    assert viewer.entries
+    assert _tickets(stream) == _tickets(viewer.entries)
+
+
+@pytest.mark.parametrize("log_filter", [
+    date_range_filter(3, now=NOW),
+    confidence_filter(0.0, 0.25),
+    category_filter("software_issue"),
+    pii_filter(contains_pii=True),
+])
+def test_prefilter_never_rejects_a_match(log_path, log_filter):
+    for line in log_path.read_bytes().splitlines():
+        if log_filter.matches(json.loads(line)):
+            assert log_filter.prefilter(line)
+
+
+def test_limit_stops_reading_early(tmp_path, capsys):
+    path = tmp_path / "fallback_log.jsonl"
+    good = json.dumps({"ticket": "t", "result": {"ticket_type": "unknown"}})
+    path.write_text("\n".join([good] * 5 + ["{not json"] * 5) + "\n")
+
+    assert len(list(FallbackLogStream(path, limit=3))) == 3
+    assert "malformed" not in capsys.readouterr().out
+
+    stream = FallbackLogStream(path)
+    assert len(list(stream)) == 5
+    assert stream.malformed == 5
+
+
+class _FrozenDatetime(datetime):
+    @classmethod
+    def now(cls, tz=None):
+        return NOW
+
+
+# --- Sidecar index ---
+
+def _indexed_stream(path, filters, **kwargs):
+    index = FallbackIndex(path)
+    index.update()
+    return FallbackLogStream(path, filters, index=index, **kwargs)
+
+
+@pytest.mark.parametrize("make_filters", [
+    lambda: [date_range_filter(2, now=NOW)],
+    lambda: [date_range_filter(10, now=NOW), category_filter("access_request")],
+    lambda: [pii_filter(contains_pii=True), confidence_filter(0.5, 1.0)],
+    lambda: [category_filter("never_seen")],
+])
+def test_index_returns_same_entries_as_full_scan(log_path, make_filters):
+    expected = _tickets(FallbackLogStream(log_path, make_filters()))
+    assert _tickets(_indexed_stream(log_path, make_filters())) == expected
+
+
+def test_index_updates_incrementally(log_path):
+    index = FallbackIndex(log_path)
+    assert index.update() == 2000
+    assert index.update() == 0
+
+    late = {"ticket": "late", "result": {"ticket_type": "new_category", "contains_pii": False},
+            "timestamp": NOW.isoformat()}
+    with log_path.open("a") as f:
+        f.write(json.dumps(late) + "\n")
+        f.write(json.dumps(late)[:20])  # still being written
+    assert FallbackIndex(log_path).update() == 1
+
+    stream = _indexed_stream(log_path, [category_filter("new_category")])
+    assert _tickets(stream) == ["late"]
+
+
+def test_index_handles_out_of_order_timestamps(tmp_path):
+    path = tmp_path / "fallback_log.jsonl"
+    times = [NOW - timedelta(days=5), NOW, NOW - timedelta(days=3), NOW - timedelta(hours=1)]
+    path.write_text("".join(
+        json.dumps({"ticket": str(i), "result": {}, "timestamp": t.isoformat()}) + "\n"
+        for i, t in enumerate(times)
+    ))
+    stream = _indexed_stream(path, [date_range_filter(1, now=NOW)])
+    assert _tickets(stream) == ["1", "3"]
+
+
+def test_index_rebuilds_after_log_is_replaced(log_path):
+    FallbackIndex(log_path).update()
+    log_path.write_text(json.dumps({"ticket": "fresh", "result": {"ticket_type": "unknown"}}) + "\n")
+
+    index = FallbackIndex(log_path)
+    assert index.update() == 1
+    assert _tickets(FallbackLogStream(log_path, [], index=index)) == ["fresh"]
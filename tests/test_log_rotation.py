@@ -0,0 +1,132 @@
+import gzip
+import json
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from governance.audit_log import AuditLogWriter
+from governance.log_rotation import (
+    RotationPolicy,
+    iter_log_lines,
+    read_manifest,
+    rotate,
+    seal_shard,
+    shard_dir,
+    shard_paths,
+    unsealed_shards,
+)
+from tools.fallback_viewer import FallbackLogStream, FallbackLogViewer, date_range_filter
+
+START = datetime(2026, 3, 1, tzinfo=timezone.utc)
+
+
+def _entry(i, day=0):
+    return {"ticket": f"ticket {i}", "result": {"ticket_type": "unknown", "confidence_score": 0.1},
+            "timestamp": (START + timedelta(days=day, seconds=i)).isoformat()}
+
+
+def test_writer_rotates_by_size_into_sealed_shards(tmp_path):
+    log_path = tmp_path / "fallback_log.jsonl"
+    writer = AuditLogWriter(max_batch=10, rotation={"max_bytes": 2000})
+    for i in range(100):
+        writer.write(log_path, _entry(i))
+    writer.close()
+
+    assert writer.rotations >= 3
+    manifest = read_manifest(log_path)
+    assert len(manifest["shards"]) == writer.rotations
+    assert all(s["file"].endswith(".jsonl.gz") for s in manifest["shards"])
+    active = log_path.read_text().splitlines() if log_path.exists() else []
+    assert sum(s["entries"] for s in manifest["shards"]) + len(active) == 100
+    assert not unsealed_shards(log_path)
+
+    tickets = [json.loads(line)["ticket"] for line in iter_log_lines(log_path)]
+    assert tickets == [f"ticket {i}" for i in range(100)]
+
+
+def test_writer_rotates_by_age(tmp_path):
+    log_path = tmp_path / "llm_error_log.jsonl"
+    writer = AuditLogWriter(rotation={"max_age_seconds": 0, "compression": "none"})
+    writer.write(log_path, _entry(0))
+    writer.close()
+
+    assert writer.rotations == 1
+    (shard,) = read_manifest(log_path)["shards"]
+    assert shard["compression"] == "none"
+    assert shard["first_timestamp"] == shard["last_timestamp"] == _entry(0)["timestamp"]
+
+
+def test_age_counts_from_the_first_entry_not_from_opening(tmp_path):
+    """A short-lived process still rotates a log whose first entry is older than max_age."""
+    log_path = tmp_path / "fallback_log.jsonl"
+    log_path.write_text(json.dumps(_entry(0)) + "\n")
+    writer = AuditLogWriter(rotation={"max_age_seconds": 86400, "compression": "none"})
+    writer.write(log_path, _entry(1))
+    writer.close()
+    assert writer.rotations == 1
+
+    fresh = tmp_path / "llm_error_log.jsonl"
+    writer = AuditLogWriter(rotation={"max_age_seconds": 86400})
+    writer.write(fresh, _entry(2))
+    writer.close()
+    assert writer.rotations == 0
+
+
+def test_concurrent_writers_lose_no_entries_across_rotations(tmp_path):
+    """Two writers (as in two processes) share one log; each follows the other's rotations."""
+    log_path = tmp_path / "fallback_log.jsonl"
+    writers = [AuditLogWriter(max_batch=5, flush_interval=0.01, rotation={"max_bytes": 3000})
+               for _ in range(2)]
+    for i in range(300):
+        writers[i % 2].write(log_path, _entry(i))
+        if i % 25 == 0:
+            writers[i % 2].flush()
+    for writer in writers:
+        writer.close()
+
+    assert sum(writer.rotations for writer in writers) >= 10
+    assert not unsealed_shards(log_path)
+    tickets = sorted(json.loads(line)["ticket"] for line in iter_log_lines(log_path))
+    assert tickets == sorted(f"ticket {i}" for i in range(300))
+
+
+def test_manifest_ranges_let_readers_skip_old_shards(tmp_path):
+    log_path = tmp_path / "fallback_log.jsonl"
+    for day in range(3):
+        log_path.write_text("".join(json.dumps(_entry(i, day)) + "\n" for i in range(5)))
+        seal_shard(log_path, rotate(log_path, now=START + timedelta(days=day)))
+    log_path.write_text(json.dumps(_entry(0, day=3)) + "\n")
+
+    assert len(shard_paths(log_path)) == 3
+    assert len(shard_paths(log_path, since=START + timedelta(days=2))) == 1
+
+    now = START + timedelta(days=3, hours=1)
+    stream = FallbackLogStream(log_path, [date_range_filter(2, now=now)])
+    assert len(list(stream)) == 6
+
+    viewer = FallbackLogViewer(log_path)
+    assert len(viewer.entries) == 16
+
+
+def test_crashed_seal_is_picked_up(tmp_path):
+    log_path = tmp_path / "fallback_log.jsonl"
+    log_path.write_text(json.dumps(_entry(1)) + "\n")
+    raw = rotate(log_path)
+
+    assert unsealed_shards(log_path) == [raw]
+    assert [json.loads(line)["ticket"] for line in iter_log_lines(log_path)] == ["ticket 1"]
+
+    writer = AuditLogWriter(rotation={"max_bytes": 10**6})
+    writer.write(log_path, _entry(2))
+    writer.close()
+    assert not unsealed_shards(log_path)
+    (shard,) = read_manifest(log_path)["shards"]
+    with gzip.open(shard_dir(log_path) / shard["file"], "rt") as f:
+        assert json.loads(f.read())["ticket"] == "ticket 1"
+
+
+def test_rotation_policy_validation():
+    with pytest.raises(ValueError):
+        RotationPolicy(compression="lz4")
+    assert RotationPolicy(max_bytes=10).due(10, 0)
+    assert not RotationPolicy().due(10**12, 10**9)
@@ -0,0 +1,112 @@
+# tests/test_metrics.py
+import json
+import random
+import threading
+import urllib.request
+from unittest.mock import patch
+import pytest
+from bot_engine import router
+from bot_engine.fake_client import FakeGeminiClient
+from bot_engine.metrics import (MetricsRegistry, MetricsReporter, REGISTRY, bucket_index,
+                                bucket_upper_bound)
+from bot_engine.serve import ClassificationService, make_http_server
+
+MOCK_TICKET_TYPES = [
+    "access_request",
+    "unknown"
+]
+
+def test_buckets_hold_values_within_one_sixteenth():
+    rng = random.Random(2)
+    for value in list(range(200)) + [rng.randrange(1 << 50) for _ in range(2000)]:
+        index = bucket_index(value)
+        assert bucket_upper_bound(index - 1) < value <= bucket_upper_bound(index) if index else value == 0
+        assert bucket_upper_bound(index) - value <= value / 16 + 1
+
+def test_histogram_quantiles_and_concurrent_recording():
+    registry = MetricsRegistry()
+    histogram = registry.histogram("work_seconds", stage="a")
+    assert registry.histogram("work_seconds", stage="a") is histogram
+
+    def record():
+        for value in range(1, 10001):
+            histogram.observe_ns(value * 1000)
+
+    threads = [threading.Thread(target=record) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert histogram.count == 40000
+    assert histogram.max_ns == 10_000_000
+    assert histogram.quantile(0.5) == pytest.approx(5_000_000, rel=1 / 16)
+    assert histogram.quantile(0.99) == pytest.approx(9_900_000, rel=1 / 16)
+    summary = registry.snapshot()["work_seconds"][0]
+    assert summary["labels"] == {"stage": "a"} and summary["count"] == 40000
+
+def test_prometheus_text_format():
+    registry = MetricsRegistry()
+    registry.counter("jobs_total", "Jobs done", kind='say "hi"').inc(3)
+    registry.gauge("queue_depth").set_function(lambda: 7)
+    histogram = registry.histogram("stage_seconds", "Stage time", stage="llm_call")
+    histogram.observe_ns(2_000_000)      # 2 ms
+    histogram.observe_ns(300_000_000)    # 300 ms
+
+    lines = registry.prometheus_text().splitlines()
+    assert "# TYPE jobs_total counter" in lines
+    assert 'jobs_total{kind="say \\"hi\\""} 3' in lines
+    assert "queue_depth 7" in lines
+    assert 'stage_seconds_bucket{stage="llm_call",le="0.001"} 0' in lines
+    assert 'stage_seconds_bucket{stage="llm_call",le="0.005"} 1' in lines
+    assert 'stage_seconds_bucket{stage="llm_call",le="+Inf"} 2' in lines
+    assert 'stage_seconds_sum{stage="llm_call"} 0.302' in lines
+    assert 'stage_seconds_count{stage="llm_call"} 2' in lines
+
+    with pytest.raises(ValueError):
+        registry.gauge("jobs_total")
+    with pytest.raises(ValueError):
+        registry.counter("bad name")
+
+def test_reporter_appends_snapshots():
+    registry = MetricsRegistry()
+    registry.counter("jobs_total").inc()
+    written = []
+    reporter = MetricsReporter(registry, "health.txt", interval=0.01,
+                               append=lambda path, entry: written.append((path, entry)))
+    reporter.start()
+    reporter.stop()
+    path, entry = written[-1]
+    assert path == "health.txt" and entry["metrics"]["jobs_total"][0]["value"] == 1
+
+def test_router_times_each_stage():
+    fake = FakeGeminiClient(lambda prompt: {"category": "access_request", "confidence": 0.9})
+    before = {stage: timer.count for stage, timer in router.STAGE_TIMERS.items()}
+    with patch('bot_engine.router.client', fake), \
+            patch('bot_engine.router.TICKET_TYPES', MOCK_TICKET_TYPES):
+        router.classify_ticket("I need VPN access")
+        router.classify_ticket("Please add me to the VPN group")
+    after = {stage: timer.count for stage, timer in router.STAGE_TIMERS.items()}
+
+    for stage in ("prompt_build", "llm_call", "response_parse", "pii_scan"):
+        assert after[stage] - before[stage] == 2
+    counter = REGISTRY.counter("triage_results_total", decision_stage="llm", route="automated_response")
+    assert counter.value >= 1
+
+def test_service_exports_metrics_endpoint():
+    service = ClassificationService(workers=1, classify=lambda ticket: {"ticket_type": "unknown"}).start()
+    server = make_http_server(service, "127.0.0.1", 0)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        base = f"http://127.0.0.1:{server.server_address[1]}"
+        with urllib.request.urlopen(f"{base}/metrics", timeout=5) as response:
+            assert response.headers["Content-Type"].startswith("text/plain")
+            text = response.read().decode("utf-8")
+        assert "# TYPE triage_stage_seconds histogram" in text
+        assert "triage_service_queued 0" in text
+        with urllib.request.urlopen(f"{base}/healthz", timeout=5) as response:
+            assert json.loads(response.read())["status"] == "ok"
+    finally:
+        server.shutdown()
+        server.server_close()
+        service.close()
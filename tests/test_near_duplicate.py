@@ -0,0 +1,78 @@
+# tests/test_near_duplicate.py
+from unittest.mock import patch
+import pytest
+from bot_engine.fake_client import FakeGeminiClient
+from bot_engine.near_duplicate import NearDuplicateIndex, build_near_duplicate_index, normalize_for_similarity
+from bot_engine.router import classify_ticket, classify_tickets
+
+MOCK_TICKET_TYPES = [
+    "password_reset",
+    "access_request",
+    "unknown"
+]
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+def test_normalization_ignores_case_punctuation_and_contractions():
+    assert normalize_for_similarity("I can't log in to the VPN!!") == "cannot log vpn"
+    assert normalize_for_similarity("Outlook doesn't start") == "outlook does not start"
+    assert normalize_for_similarity("?!") == ""
+
+def test_reworded_ticket_reuses_confident_result():
+    index = NearDuplicateIndex()
+    index.add("can't log in to VPN", "access_request", 0.93, context="v1")
+    index.add("printer on floor 3 is jammed", "hardware_issue", 0.5, context="v1")
+
+    match = index.lookup("cannot login to the VPN!!", context="v1")
+    assert match.category == "access_request" and match.confidence == 0.93
+    assert match.similarity >= 0.6
+    assert match.source == index.signature("can't log in to VPN")[0]
+    # Different context (model or prompt changed), unrelated text, low-confidence source
+    assert index.lookup("cannot login to the VPN!!", context="v2") is None
+    assert index.lookup("my invoice shows the wrong amount", context="v1") is None
+    assert index.lookup("printer on floor 3 is jammed", context="v1") is None
+    assert index.stats["hits"] == 1 and index.stats["misses"] == 3
+
+def test_entries_expire_and_are_evicted_oldest_first():
+    clock = FakeClock()
+    index = NearDuplicateIndex(max_entries=2, ttl_seconds=60, clock=clock)
+    index.add("reset my password please", "password_reset", 0.9)
+    clock.now = 30
+    index.add("vpn will not connect", "access_request", 0.9)
+    index.add("need access to the finance share", "access_request", 0.9)
+    assert len(index) == 2 and index.stats["evictions"] == 1
+    assert index.lookup("reset my password") is None
+
+    clock.now = 95
+    assert index.lookup("vpn won't connect") is None
+    assert len(index) == 0 and index.stats["expirations"] == 2
+    assert all(not bucket for bucket in index._buckets)
+
+def test_build_reads_settings():
+    assert build_near_duplicate_index({}) is None
+    index = build_near_duplicate_index({"enabled": True, "similarity": 0.7, "max_entries": 10})
+    assert index.similarity == 0.7 and index.max_entries == 10
+    with pytest.raises(ValueError):
+        NearDuplicateIndex(num_perm=48, bands=16)
+
+def test_router_reuses_near_duplicate_with_provenance():
+    fake = FakeGeminiClient(lambda prompt: {"category": "access_request", "confidence": 0.95})
+    with patch('bot_engine.router.client', fake), \
+            patch('bot_engine.router.TICKET_TYPES', MOCK_TICKET_TYPES), \
+            patch('bot_engine.router.near_duplicates', NearDuplicateIndex()), \
+            patch('bot_engine.router.log_fallback'):
+        first = classify_ticket("I can't log in to the VPN")
+        second = classify_ticket("cannot login to VPN!!")
+        batch = classify_tickets(["Can't log in to VPN.", "Need a new monitor"])
+
+    assert first["decision_stage"] == "llm"
+    assert second["decision_stage"] == "near_duplicate"
+    assert second["ticket_type"] == "access_request" and second["confidence_score"] == 0.95
+    assert second["near_duplicate"]["similarity"] >= 0.6
+    assert [r["decision_stage"] for r in batch] == ["near_duplicate", "llm"]
+    assert fake.calls == 2
@@ -1,6 +1,9 @@
 # tests/test_pii_filters.py
+import random
 import pytest
-from risk_controls.pii_filters import contains_pii
+from risk_controls.pii_filters import (
+    PII_PATTERNS, _luhn_check, contains_pii, count_pii, find_pii, luhn_valid, redact_pii
+)
 
 # --- Test Cases for PII Detection ---
 
@@ -45,3 +48,109 @@ def test_multiple_pii_types():
     """Test that the function stops at the first PII found."""
     text = "My email is user@example.com and my phone is 555-123-4567."
     assert contains_pii(text)
+
+# --- Single-pass scanner ---
+
+def _per_pattern_reference(text):
+    """The per-pattern scan, checking every card candidate (even overlapping ones) with Luhn."""
+    if not isinstance(text, str):
+        return False
+    if any(PII_PATTERNS[i].search(text) for i in (0, 3, 4)):
+        return True
+    candidates = (PII_PATTERNS[i].match(text, pos) for i in (1, 2) for pos in range(len(text)))
+    return any(m and _luhn_check(m.group(0)) for m in candidates)
+
+def test_find_pii_returns_typed_spans():
+    """Test that every kind is reported with its position in one pass."""
+    text = "SSN 123-45-6789, mail a.b@example.com, call (555) 123-4567, card 4532015112830366."
+    spans = find_pii(text)
+    assert [s.kind for s in spans] == ["ssn", "email", "phone", "credit_card"]
+    assert [text[s.start:s.end] for s in spans] == [
+        "123-45-6789", "a.b@example.com", "(555) 123-4567", "4532015112830366"
+    ]
+
+def test_card_failing_luhn_does_not_hide_later_pii():
+    """Test that a rejected card candidate is skipped without consuming other findings."""
+    assert count_pii("Order 4532015112830367 then card 5425 2334 3010 9903.") == {
+        "phone": 1, "credit_card": 1
+    }
+
+def test_redact_pii_and_counts():
+    """Test that redaction and counting are built on the same spans."""
+    text = "Mail me at user@example.com or user2@example.org, SSN 123-45-6789."
+    assert redact_pii(text) == "Mail me at [EMAIL_REDACTED] or [EMAIL_REDACTED], SSN [SSN_REDACTED]."
+    assert count_pii(text) == {"email": 2, "ssn": 1}
+    assert redact_pii(None) is None
+
+def test_scanner_matches_per_pattern_scan_on_random_text():
+    """Test that the single pass agrees with the per-pattern loop on noisy input."""
+    rng = random.Random(42020)
+    alphabet = "0123456789" * 4 + "-. ()@_+%abcxyzAB\n"
+    fragments = ["@example.com", "123-45-6789", "4532015112830366", "5425 2334 3010 9903", "(555) "]
+    for _ in range(3000):
+        parts = [rng.choice(alphabet) for _ in range(rng.randint(0, 40))]
+        if rng.random() < 0.3:
+            parts.insert(rng.randint(0, len(parts)), rng.choice(fragments))
+        text = "".join(parts)
+        assert contains_pii(text) == _per_pattern_reference(text), repr(text)
+        assert bool(find_pii(text)) == contains_pii(text), repr(text)
+
+@pytest.mark.parametrize("text", [
+    "text me @555-123-4567.thx",
+    "ssn @123-45-6789.x",
+    "card @4532015112830366.com",
+    "@(555) 123-4567.net and more",
+    "see @example.com then a.b@example.com",
+])
+def test_bare_at_sign_does_not_hide_pii_inside_it(text, tmp_path, monkeypatch):
+    """Test that an '@domain' with no local part is rescanned for other kinds."""
+    from scripts.validation import input_sanitizer
+    monkeypatch.setattr(input_sanitizer, "SANITIZED_LOG", tmp_path / "pipeline_health.txt")
+    assert contains_pii(text) == _per_pattern_reference(text) is True
+    old_redaction = input_sanitizer.EMAIL_REGEX.sub(
+        "[EMAIL_REDACTED]", input_sanitizer.PHONE_REGEX.sub("[PHONE_REDACTED]", text))
+    assert input_sanitizer.sanitize_input(text)["sanitized_text"] == old_redaction
+
+# --- Card detection ---
+
+def test_luhn_valid_matches_reference_on_random_candidates():
+    """Property: the table-driven check agrees with _luhn_check on any candidate."""
+    rng = random.Random(8)
+    for _ in range(20000):
+        length = rng.randint(0, 24)
+        candidate = "".join(
+            rng.choice("0123456789") + (rng.choice(" -") if rng.random() < 0.15 else "")
+            for _ in range(length)
+        )
+        assert luhn_valid(candidate) == _luhn_check(candidate), candidate
+
+def test_luhn_valid_non_ascii_digits_fall_back_to_reference():
+    """Test that Unicode digits (which \\d matches) are still validated."""
+    arabic = "".join(chr(0x0660 + int(d)) for d in "4532015112830366")
+    assert luhn_valid(arabic) == _luhn_check(arabic) is True
+
+@pytest.mark.parametrize("length", range(13, 20))
+def test_card_of_every_pan_length_is_detected(length):
+    """Property: any 13-19 digit number is reported as a card iff it passes Luhn."""
+    rng = random.Random(length)
+    for _ in range(200):
+        number = "".join(rng.choice("0123456789") for _ in range(length))
+        kinds = {span.kind for span in find_pii(f"Card {number}.")}
+        assert ("credit_card" in kinds) == _luhn_check(number), number
+
+@pytest.mark.parametrize("text", [
+    "Amex 3782 822463 10005 on file.",
+    "Diners 3056-930902-5904.",
+    "Visa 4532 0151 1283 0366!",
+    "Old Visa 4222222222222.",
+    "Maestro 6759649826438453 and 5019717010103742.",
+    "Nineteen 6304000000000000000",
+])
+def test_card_layouts_detected(text):
+    """Test that common PAN lengths and groupings are all recognized as cards."""
+    assert "credit_card" in {span.kind for span in find_pii(text)}
+
+def test_every_card_candidate_is_validated():
+    """Test that a Luhn-failing order ID does not hide a real card later on."""
+    text = "Order 4532-0151-1283-0367, card 4532-0151-1283-0366."
+    assert count_pii(text) == {"credit_card": 1}
@@ -0,0 +1,74 @@
+# tests/test_preclassifier.py
+from array import array
+from unittest.mock import patch
+from bot_engine.fake_client import FakeGeminiClient
+from bot_engine.preclassifier import HashedLinearModel, PreClassifier, RuleSet, hashed_features
+from bot_engine.router import classify_ticket, classify_tickets
+
+MOCK_TICKET_TYPES = [
+    "password_reset",
+    "billing_question",
+    "access_request",
+    "unknown"
+]
+
+RULES = [
+    {"ticket_type": "password_reset", "confidence": 0.95, "patterns": [r"\bforgot (my )?password\b"]},
+    {"ticket_type": "billing_question", "confidence": 0.92, "patterns": [r"\binvoice\b", r"\brefund\b"]},
+    {"ticket_type": "hardware_issue", "confidence": 0.95, "patterns": [r"\bprinter\b"]},
+    {"ticket_type": "access_request", "confidence": 0.6, "patterns": [r"\baccess\b"]},
+]
+
+def _model(bits=8):
+    """Tiny model that puts weight on the 'vpn' unigram for access_request."""
+    classes = ["access_request", "billing_question"]
+    weights = array("f", [0.0]) * ((1 << bits) * len(classes))
+    (feature,) = hashed_features("vpn", bits, ngram=1)
+    weights[feature * 2] = 8.0
+    return HashedLinearModel(classes, weights, [0.0, 0.0], bits=bits, ngram=1)
+
+def test_rules_decide_only_unambiguous_confident_tickets():
+    pre = PreClassifier(RuleSet(RULES), threshold=0.9)
+    assert pre.classify("I FORGOT my password again", MOCK_TICKET_TYPES) == ("password_reset", 0.95, "rules")
+    assert pre.classify("refund the invoice", MOCK_TICKET_TYPES).category == "billing_question"
+    # Two categories match, a low-confidence rule, and a category not in ticket_types
+    assert pre.classify("forgot password for the invoice portal", MOCK_TICKET_TYPES) is None
+    assert pre.classify("need access to the share", MOCK_TICKET_TYPES) is None
+    assert pre.classify("printer offline", MOCK_TICKET_TYPES) is None
+    assert pre.stats["rules"] == 2 and pre.stats["deferred"] == 3
+
+def test_model_round_trips_through_memory_mapped_file(tmp_path):
+    model = _model()
+    path = tmp_path / "model.bin"
+    model.save(path)
+    loaded = HashedLinearModel.load(path)
+
+    assert isinstance(loaded.weights, memoryview)
+    assert loaded.classes == model.classes
+    category, confidence = loaded.predict("vpn")
+    assert category == "access_request" and confidence > 0.99
+    assert loaded.predict("vpn") == model.predict("vpn")
+    assert loaded.predict("hello")[1] == 0.5
+
+def test_model_stage_runs_when_no_rule_matches():
+    pre = PreClassifier(RuleSet(RULES), _model(), threshold=0.9)
+    decision = pre.classify("vpn", MOCK_TICKET_TYPES)
+    assert (decision.category, decision.stage) == ("access_request", "model")
+    assert pre.classify("something else", MOCK_TICKET_TYPES) is None
+
+def test_router_skips_llm_for_preclassified_tickets():
+    fake = FakeGeminiClient(lambda prompt: {"category": "access_request", "confidence": 0.8})
+    pre = PreClassifier(RuleSet(RULES), threshold=0.9)
+    with patch('bot_engine.router.client', fake), \
+            patch('bot_engine.router.TICKET_TYPES', MOCK_TICKET_TYPES), \
+            patch('bot_engine.router.preclassifier', pre), \
+            patch('bot_engine.router.log_fallback'):
+        easy = classify_ticket("I forgot my password")
+        hard = classify_ticket("The VPN drops every hour")
+        batch = classify_tickets(["send me the invoice", "vpn is down", "   "])
+
+    assert easy["ticket_type"] == "password_reset"
+    assert easy["decision_stage"] == "rules"
+    assert hard["decision_stage"] == "llm"
+    assert [r["decision_stage"] for r in batch] == ["rules", "llm", "empty"]
+    assert fake.calls == 2
@@ -0,0 +1,76 @@
+# tests/test_prompt_registry.py
+import os
+from unittest.mock import patch
+from bot_engine import prompt_registry as registry_module
+from bot_engine.prompt_registry import PromptRegistry
+from bot_engine.router import prepare_prompt
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+def _write(path, text, mtime_ns):
+    path.write_text(text)
+    os.utime(path, ns=(mtime_ns, mtime_ns))
+
+def test_template_is_read_once(tmp_path):
+    """Test that repeated renders are served from memory."""
+    _write(tmp_path / "p.txt", "Pick one of: {categories}.", 1_000_000_000)
+    registry = PromptRegistry(tmp_path, check_interval=60, clock=FakeClock())
+
+    with patch.object(registry_module, "_load_template", wraps=registry_module._load_template) as load:
+        for _ in range(100):
+            text = registry.render("p", categories=("a", "b"))
+
+    assert text == "Pick one of: a, b."
+    assert load.call_count == 1
+
+def test_edit_is_picked_up_after_check_interval(tmp_path):
+    """Test that an edited template is reloaded without a restart."""
+    clock = FakeClock()
+    path = tmp_path / "p.txt"
+    _write(path, "Old {categories}", 1_000_000_000)
+    registry = PromptRegistry(tmp_path, check_interval=2, clock=clock)
+    old_version = registry.version("p")
+    assert registry.render("p", categories=("a",)) == "Old a"
+
+    _write(path, "New {categories}", 2_000_000_000)
+    clock.now = 1
+    assert registry.render("p", categories=("a",)) == "Old a"
+
+    clock.now = 3
+    assert registry.render("p", categories=("a",)) == "New a"
+    assert registry.version("p") != old_version
+
+def test_missing_file_keeps_last_template(tmp_path):
+    """Test that a template being replaced on disk does not break rendering."""
+    clock = FakeClock()
+    path = tmp_path / "p.txt"
+    _write(path, "Stable {categories}", 1_000_000_000)
+    registry = PromptRegistry(tmp_path, check_interval=1, clock=clock)
+    registry.get("p")
+
+    path.unlink()
+    clock.now = 5
+    assert registry.render("p", categories=("a",)) == "Stable a"
+
+def test_combined_version_tracks_each_template(tmp_path):
+    """Test that the combined version changes when any template changes."""
+    clock = FakeClock()
+    _write(tmp_path / "a.txt", "A", 1_000_000_000)
+    _write(tmp_path / "b.txt", "B", 1_000_000_000)
+    registry = PromptRegistry(tmp_path, check_interval=0, clock=clock)
+    before = registry.version("a", "b")
+
+    _write(tmp_path / "b.txt", "B2", 2_000_000_000)
+    assert registry.version("a", "b") != before
+
+@patch('bot_engine.router.TICKET_TYPES', ["access_request", "unknown"])
+def test_prepare_prompt_uses_current_categories():
+    """Test that the prompt prefix follows the active category list."""
+    prompt = prepare_prompt("Reset my password.")
+    assert "access_request, unknown" in prompt
+    assert prompt.endswith("\n\nTicket: Reset my password.")
@@ -0,0 +1,176 @@
+# tests/test_rate_limit.py
+import asyncio
+import pytest
+from unittest.mock import patch
+from google.genai import errors
+from bot_engine.fake_client import FakeGeminiClient
+from bot_engine.rate_limit import LoadShedError, RateLimiter, TokenBucket, retry_delay_hint
+from bot_engine.router import classify_ticket, classify_ticket_async
+
+MOCK_TICKET_TYPES = [
+    "access_request",
+    "unknown"
+]
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+        self.sleeps = []
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+def _quota_error(retry_delay=None):
+    details = [{"@type": "type.googleapis.com/google.rpc.RetryInfo", "retryDelay": retry_delay}] if retry_delay else []
+    return errors.APIError(429, {"error": {"code": 429, "status": "RESOURCE_EXHAUSTED", "details": details}})
+
+def _limiter(clock, **kwargs):
+    return RateLimiter(clock=clock, sleep=clock.sleep, jitter=lambda: 1.0, **kwargs)
+
+def _failing_then(answers):
+    """Callable raising each exception in `answers` in turn, then returning "ok"."""
+    answers = list(answers)
+
+    def request():
+        if answers:
+            raise answers.pop(0)
+        return "ok"
+    return request
+
+def test_token_bucket_paces_reservations():
+    clock = FakeClock()
+    bucket = TokenBucket(rate=2.0, capacity=2.0, clock=clock)
+    assert [bucket.reserve(1) for _ in range(4)] == [0.0, 0.0, 0.5, 1.0]
+    assert bucket.reserve(1, max_wait=1.0) is None
+    clock.now += 10
+    assert bucket.reserve(1) == 0.0
+
+def test_requests_per_minute_spaces_calls():
+    clock = FakeClock()
+    limiter = _limiter(clock, requests_per_minute=120)
+    for _ in range(5):
+        limiter.call(lambda: "ok")
+    assert clock.now == pytest.approx(1.5)
+    assert limiter.stats.requests == 5
+    assert limiter.stats.queue_wait_seconds == pytest.approx(1.5)
+
+def test_quota_errors_are_retried_with_backoff():
+    clock = FakeClock()
+    limiter = _limiter(clock, base_delay=0.5, adaptive=False)
+    assert limiter.call(_failing_then([_quota_error(), errors.APIError(503, {})])) == "ok"
+    assert clock.sleeps == [0.5, 1.0]
+    assert limiter.stats.retries == 2
+    assert limiter.stats.throttled == 1
+
+def test_server_retry_delay_is_honored():
+    clock = FakeClock()
+    limiter = _limiter(clock, adaptive=False)
+    limiter.call(_failing_then([_quota_error("7s")]))
+    assert clock.sleeps[0] == 7.0
+    assert retry_delay_hint(_quota_error("2.5s")) == 2.5
+
+def test_non_retryable_errors_propagate_immediately():
+    limiter = _limiter(FakeClock())
+    with pytest.raises(errors.APIError):
+        limiter.call(_failing_then([errors.APIError(400, {})]))
+    assert limiter.stats.retries == 0
+
+def test_exhausted_quota_is_shed():
+    limiter = _limiter(FakeClock(), max_retries=2)
+    with pytest.raises(LoadShedError):
+        limiter.call(_failing_then([_quota_error()] * 3))
+    assert limiter.stats.shed == 1
+
+def test_429_halves_the_learned_rate_and_successes_restore_it():
+    clock = FakeClock()
+    limiter = _limiter(clock, requests_per_minute=600, increase_per_success=10)
+    limiter.call(_failing_then([_quota_error()]))
+    assert limiter.requests_per_minute < 600
+    learned = limiter.requests_per_minute
+    for _ in range(100):
+        limiter.call(lambda: "ok")
+    assert learned < limiter.requests_per_minute <= 600
+
+def test_unknown_quota_is_learned_from_first_429():
+    clock = FakeClock()
+    limiter = _limiter(clock)
+    for _ in range(30):
+        limiter.call(lambda: "ok")
+        clock.now += 0.1
+    assert limiter.requests_per_minute is None
+    limiter.call(_failing_then([_quota_error()]))
+    assert limiter.requests_per_minute is not None
+
+def test_calls_that_would_wait_too_long_are_shed():
+    clock = FakeClock()
+    limiter = _limiter(clock, requests_per_minute=6, max_queue_wait=5)
+    limiter.call(lambda: "ok")
+    with pytest.raises(LoadShedError):
+        limiter.call(lambda: "ok")
+    assert limiter.stats.shed == 1
+
+def test_async_calls_share_the_buckets():
+    limiter = RateLimiter(requests_per_minute=600, burst_seconds=0.1, jitter=lambda: 0.0)
+
+    async def request():
+        return "ok"
+
+    async def main():
+        return await asyncio.gather(*(limiter.call_async(request) for _ in range(5)))
+
+    assert asyncio.run(main()) == ["ok"] * 5
+    assert limiter.stats.queue_wait_seconds > 0
+
+def test_router_retries_quota_errors_instead_of_falling_back():
+    failures = [_quota_error(), _quota_error()]
+
+    def responder(prompt):
+        if failures:
+            raise failures.pop(0)
+        return {"category": "access_request", "confidence": 0.9}
+
+    limiter = RateLimiter(sleep=lambda seconds: None)
+    with patch('bot_engine.router.client', FakeGeminiClient(responder)), \
+            patch('bot_engine.router.TICKET_TYPES', MOCK_TICKET_TYPES), \
+            patch('bot_engine.router.rate_limiter', limiter), \
+            patch('bot_engine.router.log_llm_error') as mock_log_error:
+        result = classify_ticket("I need VPN access")
+    assert result["ticket_type"] == "access_request"
+    assert limiter.stats.retries == 2
+    mock_log_error.assert_not_called()
+
+def test_router_sheds_load_explicitly():
+    def responder(prompt):
+        raise _quota_error()
+
+    limiter = RateLimiter(max_retries=1, adaptive=False, sleep=lambda seconds: None, jitter=lambda: 0.0)
+    with patch('bot_engine.router.client', FakeGeminiClient(responder)), \
+            patch('bot_engine.router.rate_limiter', limiter), \
+            patch('bot_engine.router.log_fallback') as mock_log_fallback:
+        with pytest.raises(LoadShedError):
+            classify_ticket("I need VPN access")
+        with pytest.raises(LoadShedError):
+            asyncio.run(classify_ticket_async("I need VPN access"))
+    mock_log_fallback.assert_not_called()
+
+def test_shed_tickets_are_recorded_in_the_llm_error_log():
+    def responder(prompt):
+        raise _quota_error()
+
+    limiter = RateLimiter(max_retries=0, adaptive=False, sleep=lambda seconds: None, jitter=lambda: 0.0)
+    with patch('bot_engine.router.client', FakeGeminiClient(responder)), \
+            patch('bot_engine.router.rate_limiter', limiter), \
+            patch('bot_engine.router.log_fallback'), \
+            patch('bot_engine.router.log_llm_error') as mock_log_error:
+        with pytest.raises(LoadShedError):
+            classify_ticket("I need VPN access")
+        with pytest.raises(LoadShedError):
+            asyncio.run(classify_ticket_async("Please reset my VPN token"))
+
+    logged = [call.args for call in mock_log_error.call_args_list]
+    assert [ticket for ticket, _ in logged] == ["I need VPN access", "Please reset my VPN token"]
+    assert all(message.startswith("shed: ") for _, message in logged)
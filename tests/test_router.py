@@ -1,8 +1,8 @@
 # tests/test_router.py
-import pytest
 import json
 from unittest.mock import patch, MagicMock
-from bot_engine.router import classify_ticket
+from bot_engine.rate_limit import LoadShedError
+from bot_engine.router import classify_ticket, classify_tickets
 
 # Define a consistent set of ticket types for testing purposes
 MOCK_TICKET_TYPES = [
@@ -159,3 +159,112 @@ def test_high_confidence_does_not_trigger_fallback_log(mock_client, mock_log_fal
 
     # Assert
     mock_log_fallback.assert_not_called()
+
+# --- Batch classification ---
+
+def _batch_response(*answers):
+    """Builds a mock LLM response carrying a JSON array of batch answers."""
+    response = MagicMock()
+    response.text = json.dumps([
+        {"id": ticket_id, "category": category, "confidence": confidence}
+        for ticket_id, category, confidence in answers
+    ])
+    return response
+
+@patch('bot_engine.router.TICKET_TYPES', MOCK_TICKET_TYPES)
+@patch('bot_engine.router.log_fallback')
+@patch('bot_engine.router.client')
+def test_classify_tickets_uses_one_call_per_batch(mock_client, mock_log_fallback):
+    """Test that a full batch is answered by a single LLM call, in input order."""
+    mock_client.models.generate_content.return_value = _batch_response(
+        (2, "billing_question", 0.88),
+        (1, "access_request", 0.92),
+        (3, "technical_support", 0.85),
+    )
+
+    results = classify_tickets(
+        ["Reset my password.", "Explain this invoice.", "Call 555-123-4567, the app crashes."],
+        batch_size=3,
+    )
+
+    assert mock_client.models.generate_content.call_count == 1
+    assert [r["ticket_type"] for r in results] == ["access_request", "billing_question", "technical_support"]
+    assert [r["confidence_score"] for r in results] == [0.92, 0.88, 0.85]
+    assert [r["contains_pii"] for r in results] == [False, False, True]
+    mock_log_fallback.assert_not_called()
+
+@patch('bot_engine.router.TICKET_TYPES', MOCK_TICKET_TYPES)
+@patch('bot_engine.router.log_fallback')
+@patch('bot_engine.router.client')
+def test_classify_tickets_retries_partial_batch(mock_client, mock_log_fallback):
+    """Test that tickets missing from a partial answer are retried on their own."""
+    single = MagicMock()
+    single.text = json.dumps({"category": "billing_question", "confidence": 0.8})
+    mock_client.models.generate_content.side_effect = [
+        _batch_response((1, "access_request", 0.9), (7, "unknown", 0.1)),
+        single,
+    ]
+
+    results = classify_tickets(["Reset my password.", "Explain this invoice."])
+
+    assert mock_client.models.generate_content.call_count == 2
+    assert results[0]["ticket_type"] == "access_request"
+    assert results[1]["ticket_type"] == "billing_question"
+
+@patch('bot_engine.router.TICKET_TYPES', MOCK_TICKET_TYPES)
+@patch('bot_engine.router.log_fallback')
+@patch('bot_engine.router.client')
+def test_classify_tickets_splits_malformed_batch(mock_client, mock_log_fallback):
+    """Test that malformed batch output falls back to smaller calls."""
+    def respond(model, contents, config):
+        response = MagicMock()
+        if "Tickets:" in contents:
+            response.text = "not json"
+        else:
+            response.text = json.dumps({"category": "access_request", "confidence": 0.9})
+        return response
+    mock_client.models.generate_content.side_effect = respond
+
+    results = classify_tickets(["one", "two", "three", "four"], batch_size=4)
+
+    # 1 batch of four, 2 batches of two, then 4 single-ticket calls
+    assert mock_client.models.generate_content.call_count == 7
+    assert all(r["ticket_type"] == "access_request" for r in results)
+
+@patch('bot_engine.router.TICKET_TYPES', MOCK_TICKET_TYPES)
+@patch('bot_engine.router.log_llm_error')
+@patch('bot_engine.router.log_fallback')
+@patch('bot_engine.router.client')
+def test_classify_tickets_api_failure_logs_each_ticket(mock_client, mock_log_fallback, mock_log_error):
+    """Test that a failed batch call falls back to 'unknown' for every ticket."""
+    mock_client.models.generate_content.side_effect = Exception("API Error")
+
+    results = classify_tickets(["first", "   ", "second"])
+
+    assert mock_client.models.generate_content.call_count == 1
+    assert [r["ticket_type"] for r in results] == ["unknown", "unknown", "unknown"]
+    assert mock_log_error.call_count == 2
+    assert mock_log_fallback.call_count == 2
+
+@patch('bot_engine.router.TICKET_TYPES', MOCK_TICKET_TYPES)
+@patch('bot_engine.router.rate_limiter', None)
+@patch('bot_engine.router.log_llm_error')
+@patch('bot_engine.router.log_fallback')
+@patch('bot_engine.router.client')
+def test_classify_tickets_keeps_results_when_shed_partway(mock_client, mock_log_fallback, mock_log_error):
+    """Test that a batch shed partway returns the earlier results and marks the shed tickets."""
+    mock_client.models.generate_content.side_effect = [
+        _batch_response((1, "access_request", 0.9), (2, "billing_question", 0.8)),
+        LoadShedError("Gemini quota still exhausted after 3 retries", retry_after=30.0),
+        LoadShedError("Rate limit reached", retry_after=5.0),
+    ]
+
+    results = classify_tickets(["one", "two", "three", "four", "five"], batch_size=2)
+
+    assert [r["ticket_type"] for r in results[:2]] == ["access_request", "billing_question"]
+    assert [r["decision_stage"] for r in results] == ["llm", "llm", "shed", "shed", "shed"]
+    assert [r["retry_after"] for r in results[2:]] == [30.0, 30.0, 5.0]
+    # Each shed ticket is recorded exactly once, none as a fallback
+    assert [c.args[0] for c in mock_log_error.call_args_list] == ["three", "four", "five"]
+    assert all(c.args[1].startswith("shed: ") for c in mock_log_error.call_args_list)
+    mock_log_fallback.assert_not_called()
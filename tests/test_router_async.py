@@ -0,0 +1,119 @@
+# tests/test_router_async.py
+import asyncio
+import time
+import pytest
+from unittest.mock import patch
+from bot_engine.fake_client import FakeGeminiClient
+from bot_engine.router import aclassify_many, classify_ticket_async
+
+MOCK_TICKET_TYPES = [
+    "access_request",
+    "billing_question",
+    "technical_support",
+    "unknown"
+]
+
+def _keyword_responder(prompt):
+    """Answers from the ticket text so results can be told apart."""
+    if "invoice" in prompt:
+        return {"category": "billing_question", "confidence": 0.9}
+    return {"category": "access_request", "confidence": 0.8}
+
+async def _collect(agen):
+    return [item async for item in agen]
+
+@patch('bot_engine.router.TICKET_TYPES', MOCK_TICKET_TYPES)
+@patch('bot_engine.router.log_fallback')
+def test_classify_ticket_async_matches_sync_result(mock_log_fallback):
+    """Test that the async path produces the same result shape as classify_ticket."""
+    with patch('bot_engine.router.client', FakeGeminiClient(_keyword_responder)):
+        result = asyncio.run(classify_ticket_async("Can you explain this invoice?"))
+
+    assert result["ticket_type"] == "billing_question"
+    assert result["confidence_score"] == 0.9
+    assert result["contains_pii"] is False
+    mock_log_fallback.assert_not_called()
+
+@patch('bot_engine.router.TICKET_TYPES', MOCK_TICKET_TYPES)
+@patch('bot_engine.router.log_fallback')
+@patch('bot_engine.router.log_llm_error')
+def test_classify_ticket_async_deadline(mock_log_error, mock_log_fallback):
+    """Test that a ticket exceeding its deadline falls back to 'unknown'."""
+    with patch('bot_engine.router.client', FakeGeminiClient(latency=1.0)):
+        result = asyncio.run(classify_ticket_async("The app is crashing.", timeout=0.01))
+
+    assert result["ticket_type"] == "unknown"
+    assert result["confidence_score"] == 0.0
+    mock_log_error.assert_called_once()
+    assert "deadline" in mock_log_error.call_args[0][1]
+
+@patch('bot_engine.router.TICKET_TYPES', MOCK_TICKET_TYPES)
+@patch('bot_engine.router.log_fallback')
+def test_aclassify_many_bounds_concurrency(mock_log_fallback):
+    """Test that no more than `concurrency` LLM calls are in flight at once."""
+    fake = FakeGeminiClient(_keyword_responder, latency=0.02)
+    tickets = [f"Ticket number {i}" for i in range(40)]
+
+    with patch('bot_engine.router.client', fake):
+        start = time.perf_counter()
+        results = asyncio.run(_collect(aclassify_many(tickets, concurrency=8)))
+        elapsed = time.perf_counter() - start
+
+    assert sorted(index for index, _ in results) == list(range(40))
+    assert fake.max_in_flight == 8
+    # Serial execution would take 40 * 0.02 = 0.8s
+    assert elapsed < 0.5
+
+@patch('bot_engine.router.TICKET_TYPES', MOCK_TICKET_TYPES)
+@patch('bot_engine.router.log_fallback')
+def test_aclassify_many_yields_in_completion_order(mock_log_fallback):
+    """Test that fast tickets are yielded before slow ones."""
+    def latency_for(prompt):
+        return 0.1 if "slow" in prompt else 0.0
+
+    class LatencyByPrompt(FakeGeminiClient):
+        async def _generate_content_async(self, model, contents, config=None):
+            fault = self._enter()
+            try:
+                await asyncio.sleep(latency_for(contents))
+                return self._respond(contents, fault)
+            finally:
+                self._exit()
+
+    with patch('bot_engine.router.client', LatencyByPrompt(_keyword_responder)):
+        results = asyncio.run(_collect(aclassify_many(["slow ticket", "fast ticket"], concurrency=2)))
+
+    assert [index for index, _ in results] == [1, 0]
+    assert [result["ticket_type"] for _, result in results] == ["access_request", "access_request"]
+
+@patch('bot_engine.router.TICKET_TYPES', MOCK_TICKET_TYPES)
+@patch('bot_engine.router.log_fallback')
+def test_aclassify_many_cancels_on_early_exit(mock_log_fallback):
+    """Test that closing the generator cancels tickets still in flight."""
+    answered = []
+
+    def responder(prompt):
+        answered.append(prompt)
+        return _keyword_responder(prompt)
+
+    delays = iter([0.0] + [0.5] * 9)
+    fake = FakeGeminiClient(responder, latency=lambda: next(delays))
+
+    async def take_one():
+        agen = aclassify_many([f"Ticket {i}" for i in range(10)], concurrency=10)
+        first = await agen.__anext__()
+        await agen.aclose()
+        await asyncio.sleep(0)
+        return first
+
+    with patch('bot_engine.router.client', fake):
+        asyncio.run(take_one())
+
+    assert fake.in_flight == 0
+    assert fake.calls == 10
+    assert len(answered) == 1
+
+def test_aclassify_many_rejects_zero_concurrency():
+    """Test that an invalid concurrency setting is rejected."""
+    with pytest.raises(ValueError):
+        asyncio.run(_collect(aclassify_many(["ticket"], concurrency=0)))
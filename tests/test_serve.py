@@ -0,0 +1,137 @@
+# tests/test_serve.py
+import io
+import json
+import threading
+import urllib.error
+import urllib.request
+import pytest
+from unittest.mock import patch
+from bot_engine.fake_client import FakeGeminiClient
+from bot_engine.rate_limit import LoadShedError
+from bot_engine.serve import ClassificationService, QueueFullError, make_http_server, serve_jsonl
+
+MOCK_TICKET_TYPES = [
+    "access_request",
+    "billing_question",
+    "unknown"
+]
+
+def _keyword_responder(prompt):
+    if "invoice" in prompt:
+        return {"category": "billing_question", "confidence": 0.9}
+    return {"category": "access_request", "confidence": 0.8}
+
+@pytest.fixture
+def fake_llm():
+    fake = FakeGeminiClient(_keyword_responder, latency=0.01)
+    with patch('bot_engine.router.client', fake), \
+            patch('bot_engine.router.TICKET_TYPES', MOCK_TICKET_TYPES), \
+            patch('bot_engine.router.log_fallback'):
+        yield fake
+
+def test_worker_pool_bounds_concurrency(fake_llm):
+    """All tickets are classified, with at most `workers` LLM calls in flight."""
+    service = ClassificationService(workers=4, queue_size=8).start()
+    futures = [service.submit(f"invoice {i}" if i % 2 else f"login {i}") for i in range(40)]
+    results = [f.result(timeout=5) for f in futures]
+    service.close()
+
+    assert [r["ticket_type"] for r in results] == ["access_request", "billing_question"] * 20
+    assert fake_llm.max_in_flight <= 4
+    assert service.stats()["completed"] == 40
+
+def test_full_queue_pushes_back():
+    """A full queue rejects non-blocking submits instead of growing."""
+    started, release = threading.Event(), threading.Event()
+
+    def slow_classify(ticket_text):
+        started.set()
+        release.wait(5)
+        return {}
+
+    service = ClassificationService(workers=1, queue_size=2, classify=slow_classify).start()
+    service.submit("busy")
+    assert started.wait(5)
+    service.submit("queued 1", block=False)
+    service.submit("queued 2", block=False)
+    with pytest.raises(QueueFullError):
+        service.submit("rejected", block=False)
+    release.set()
+    service.close()
+    assert service.stats()["rejected"] == 1
+    assert service.stats()["completed"] == 3
+
+def test_jsonl_results_keep_input_order(fake_llm):
+    source = io.StringIO(
+        '{"id": "a", "ticket": "login fails"}\n'
+        '"please resend the invoice"\n'
+        '\n'
+        'not json\n'
+        '{"id": 7, "ticket": "invoice total"}\n'
+    )
+    sink = io.StringIO()
+    service = ClassificationService(workers=3).start()
+    assert serve_jsonl(service, source, sink) == 3
+    service.close()
+
+    lines = [json.loads(line) for line in sink.getvalue().splitlines()]
+    assert [line["id"] for line in lines] == ["a", 2, 7]
+    assert [line["result"]["ticket_type"] for line in lines] == [
+        "access_request", "billing_question", "billing_question"
+    ]
+
+def test_http_endpoint(fake_llm):
+    service = ClassificationService(workers=2).start()
+    server = make_http_server(service, "127.0.0.1", 0)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = f"http://127.0.0.1:{server.server_address[1]}"
+
+    def post(body):
+        request = urllib.request.Request(f"{base}/classify", data=json.dumps(body).encode(), method="POST")
+        with urllib.request.urlopen(request, timeout=5) as response:
+            return json.loads(response.read())
+
+    try:
+        assert post({"ticket": "invoice missing"})["result"]["ticket_type"] == "billing_question"
+        results = post({"tickets": ["invoice", "vpn access"]})["results"]
+        assert [r["ticket_type"] for r in results] == ["billing_question", "access_request"]
+        with pytest.raises(urllib.error.HTTPError) as error:
+            post({"ticket": 42})
+        assert error.value.code == 400
+        with urllib.request.urlopen(f"{base}/healthz", timeout=5) as response:
+            assert json.loads(response.read())["completed"] == 3
+    finally:
+        server.shutdown()
+        server.server_close()
+        service.close()
+
+def test_shed_load_answers_503():
+    def shed(ticket_text):
+        raise LoadShedError("quota exhausted", retry_after=12)
+
+    service = ClassificationService(workers=1, classify=shed).start()
+    server = make_http_server(service, "127.0.0.1", 0)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    request = urllib.request.Request(f"http://127.0.0.1:{server.server_address[1]}/classify",
+                                     data=b'{"ticket": "vpn"}', method="POST")
+    try:
+        with pytest.raises(urllib.error.HTTPError) as error:
+            urllib.request.urlopen(request, timeout=5)
+        assert error.value.code == 503
+        assert error.value.headers["Retry-After"] == "12"
+        assert service.stats()["shed"] == 1
+    finally:
+        server.shutdown()
+        server.server_close()
+        service.close()
+
+def test_service_creates_the_client_at_startup_and_fails_fast():
+    """Test that main() builds the Gemini client before serving and exits if it cannot."""
+    from bot_engine import serve
+    with patch('bot_engine.router.get_client', return_value=None) as get_client, \
+            patch('bot_engine.serve.ClassificationService') as service:
+        with pytest.raises(SystemExit) as exit_info:
+            serve.main(["--stdin"])
+    assert exit_info.value.code == 2
+    get_client.assert_called_once_with()
+    service.assert_not_called()
@@ -0,0 +1,43 @@
+# tests/test_startup.py
+import subprocess
+import sys
+from pathlib import Path
+from unittest.mock import patch
+import bot_engine.router as router
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+
+def _loaded_after(statement):
+    code = f"import sys; {statement}; print(' '.join(sorted(sys.modules)))"
+    proc = subprocess.run([sys.executable, "-c", code], cwd=PROJECT_ROOT,
+                          capture_output=True, text=True, check=True)
+    return set(proc.stdout.split()), proc.stdout
+
+def test_importing_router_defers_sdk_and_dotenv():
+    loaded, output = _loaded_after("import bot_engine.router")
+    assert "google.genai" not in loaded
+    assert "dotenv" not in loaded
+    assert "Error:" not in output
+
+def test_package_exports_load_router_on_first_use():
+    loaded, _ = _loaded_after("import bot_engine")
+    assert "bot_engine.router" not in loaded
+    loaded, _ = _loaded_after("from bot_engine import classify_ticket")
+    assert "bot_engine.router" in loaded
+
+def test_client_is_created_once_on_first_use():
+    sentinel = object()
+    with patch('bot_engine.router.client', None), \
+            patch('bot_engine.router._client_created', False), \
+            patch('bot_engine.router.create_client', return_value=sentinel) as create:
+        assert router.get_client() is sentinel
+        assert router.get_client() is sentinel
+    assert create.call_count == 1
+
+def test_missing_api_key_is_not_retried_on_every_call():
+    with patch('bot_engine.router.client', None), \
+            patch('bot_engine.router._client_created', False), \
+            patch('bot_engine.router.create_client', return_value=None) as create:
+        assert router.get_client() is None
+        assert router.get_client() is None
+    assert create.call_count == 1
@@ -0,0 +1,102 @@
+import json
+import random
+
+import pytest
+
+from bot_engine.preclassifier import HashedLinearModel
+from tools.train_preclassifier import DEFAULT_SOURCES, entry_label, evaluate, fit, load_datasets
+
+CLASSES = ["password_reset", "billing_question", "hardware_issue", "unknown"]
+
+WORDS = {
+    "password_reset": ["password", "reset", "locked", "login"],
+    "billing_question": ["invoice", "refund", "charge", "billing"],
+    "hardware_issue": ["laptop", "screen", "keyboard", "boot"],
+    "unknown": ["hello", "thanks", "urgent", "question"],
+}
+
+
+def _write_labels(path, count=600, seed=1):
+    rng = random.Random(seed)
+    with path.open("w") as f:
+        for i in range(count):
+            category = rng.choice(CLASSES)
+            words = [rng.choice(WORDS[category]) for _ in range(3)] + [f"ref{i}"]
+            f.write(json.dumps({"ticket": " ".join(words), "ticket_type": category}) + "\n")
+
+
+def test_entry_labels_prefer_reviews_and_skip_own_output():
+    llm = {"ticket": "t", "result": {"ticket_type": "billing_question", "confidence_score": 0.85}}
+    assert entry_label(llm, min_confidence=None) is None
+    assert entry_label(llm, min_confidence=0.8) == ("t", "billing_question")
+    assert entry_label(llm, min_confidence=0.9) is None
+    assert entry_label(dict(llm, review={"ticket_type": "password_reset"}), None) == ("t", "password_reset")
+    assert entry_label({"ticket": "t", "result": {"ticket_type": "unknown", "confidence_score": 0.9}}, 0.5) is None
+    own = {"ticket": "t", "result": {"ticket_type": "billing_question", "confidence_score": 0.95,
+                                     "decision_stage": "rules"}}
+    assert entry_label(own, 0.5) is None
+
+
+def test_unreviewed_fallback_entries_are_not_labels_by_default(tmp_path):
+    assert [path.name for path in DEFAULT_SOURCES] == ["reviewed_labels.jsonl"]
+    log = tmp_path / "fallback_log.jsonl"
+    log.write_text(
+        json.dumps({"ticket": "invoice missing", "result": {"ticket_type": "billing_question", "confidence_score": 0.45}}) + "\n"
+        + json.dumps({"ticket": "laptop broken", "result": {"ticket_type": "hardware_issue", "confidence_score": 0.9}}) + "\n"
+    )
+    assert load_datasets([log], CLASSES, None, 0.0, 10, 2)[2]["examples"] == 0
+    with pytest.raises(ValueError):
+        load_datasets([log], CLASSES, 0.4, 0.0, 10, 2, confidence_threshold=0.5)
+    train, _, _ = load_datasets([log], CLASSES, 0.5, 0.0, 10, 2, confidence_threshold=0.5)
+    assert [CLASSES[label] for label in train.labels] == ["hardware_issue"]
+
+
+def test_later_labels_win_and_split_is_stable(tmp_path):
+    log = tmp_path / "fallback_log.jsonl"
+    log.write_text(
+        json.dumps({"ticket": "Invoice missing", "result": {"ticket_type": "billing_question", "confidence_score": 0.45}}) + "\n"
+        + "not json\n"
+        + json.dumps({"ticket": "invoice  MISSING", "review": {"ticket_type": "hardware_issue"}}) + "\n"
+        + json.dumps({"ticket": "new laptop", "ticket_type": "procurement"}) + "\n"
+    )
+    train, test, counts = load_datasets([log], CLASSES, None, holdout=0.0, bits=10, ngram=2)
+    assert counts["examples"] == 1 and counts["malformed"] == 1 and counts["unknown_label"] == 1
+    assert [CLASSES[label] for label in train.labels] == ["hardware_issue"]
+
+    labels = tmp_path / "labels.jsonl"
+    _write_labels(labels)
+    first = load_datasets([labels], CLASSES, None, 0.2, 10, 2)[1]
+    second = load_datasets([labels], CLASSES, None, 0.2, 10, 2)[1]
+    assert first.texts == second.texts and 0 < len(first.texts) < 600
+
+
+def test_trained_model_evaluates_and_round_trips(tmp_path):
+    labels = tmp_path / "labels.jsonl"
+    _write_labels(labels)
+    train, test, _ = load_datasets([labels], CLASSES, None, 0.2, 12, 2)
+
+    model = fit(train, CLASSES, bits=12, epochs=5, use_numpy=False)
+    evaluation = evaluate(model, test, thresholds=(0.5, 0.99))
+    assert evaluation["accuracy"] > 0.9
+    assert evaluation["per_class"]["billing_question"]["recall"] > 0.9
+    avoided = [row["llm_calls_avoided"] for row in evaluation["thresholds"]]
+    assert avoided[0] >= avoided[1]
+
+    path = tmp_path / "preclassifier.bin"
+    model.save(path)
+    loaded = HashedLinearModel.load(path)
+    assert loaded.predict("refund my invoice") == model.predict("refund my invoice")
+    assert loaded.metadata["backend"] == "python"
+
+
+def test_numpy_trainer_matches_python(tmp_path):
+    pytest.importorskip("numpy")
+    labels = tmp_path / "labels.jsonl"
+    _write_labels(labels, count=200)
+    train, _, _ = load_datasets([labels], CLASSES, None, 0.0, 10, 2)
+
+    # Same updates on the same batches: one batch covering the whole set
+    python_model = fit(train, CLASSES, bits=10, epochs=3, batch_size=1000, use_numpy=False)
+    numpy_model = fit(train, CLASSES, bits=10, epochs=3, batch_size=1000, use_numpy=True)
+    assert list(numpy_model.weights) == pytest.approx(list(python_model.weights), abs=1e-4)
+    assert numpy_model.bias == pytest.approx(python_model.bias, abs=1e-4)
@@ -0,0 +1 @@
+"""Monitoring and audit tools for the AI Triage Bot."""
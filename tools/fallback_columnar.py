@@ -0,0 +1,347 @@
+"""
+Fallback Log Columnar Export - AI Triage Bot
+Typed, columnar export of fallback log entries for analytics notebooks.
+
+The native format (`.fbc`) needs nothing beyond the standard library.
+Entries are buffered into row groups (chunks) of typed columns and written
+once a chunk fills, so memory stays bounded on multi-GB logs:
+
+    file   = MAGIC | chunk* | footer JSON | footer length (uint32) | MAGIC
+    chunk  = rows (uint32)
+             timestamp     int64[rows]    microseconds since the Unix epoch (UTC)
+             ticket_type   uint16[rows]   code into the footer's category list
+             confidence    float32[rows]
+             contains_pii  uint8[rows]    0 / 1
+             text_offsets  uint64[rows+1] into the chunk's text blob
+             text blob     UTF-8 ticket text
+
+All numbers are little-endian. Missing values are stored as NULL_TIMESTAMP,
+NULL_CATEGORY and NaN. The footer records the category dictionary and where
+each chunk starts, so readers can load whole columns with a few `frombytes`
+calls (or `numpy.frombuffer`) instead of parsing rows.
+
+With pyarrow installed, the same columns can be written as an Arrow IPC
+stream (`.arrows`) instead.
+"""
+
+import json
+import math
+import struct
+import sys
+from array import array
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Iterator, List, Optional
+
+try:
+    import pyarrow as pa
+except ImportError:  # Arrow export is optional
+    pa = None
+
+MAGIC = b'FBCOL1\n\0'
+FORMAT_VERSION = 1
+
+NULL_TIMESTAMP = -(2 ** 63)
+NULL_CATEGORY = 0xFFFF
+
+# Rows per chunk, and the text size at which a chunk is flushed early
+CHUNK_ROWS = 65536
+CHUNK_TEXT_BYTES = 64 << 20
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+_ROWS = struct.Struct('<I')
+_FOOTER_LENGTH = struct.Struct('<I')
+_BIG_ENDIAN = sys.byteorder == 'big'
+
+
+def _little_endian(column: array) -> bytes:
+    if _BIG_ENDIAN:
+        column = array(column.typecode, column)
+        column.byteswap()
+    return column.tobytes()
+
+
+def _from_little_endian(typecode: str, data) -> array:
+    column = array(typecode)
+    column.frombytes(data)
+    if _BIG_ENDIAN:
+        column.byteswap()
+    return column
+
+
+def timestamp_micros(value) -> int:
+    """Microseconds since the epoch for an ISO log timestamp, or NULL_TIMESTAMP."""
+    if not isinstance(value, str):
+        return NULL_TIMESTAMP
+    try:
+        moment = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    except ValueError:
+        return NULL_TIMESTAMP
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    delta = moment - _EPOCH
+    return (delta.days * 86400 + delta.seconds) * 1_000_000 + delta.microseconds
+
+
+def _entry_values(entry: dict):
+    result = entry.get('result')
+    if not isinstance(result, dict):
+        result = {}
+    category = result.get('ticket_type')
+    score = result.get('confidence_score')
+    if not isinstance(score, (int, float)) or isinstance(score, bool):
+        score = math.nan
+    text = entry.get('ticket', '')
+    return (
+        timestamp_micros(entry.get('timestamp')),
+        category if isinstance(category, str) else None,
+        float(score),
+        bool(result.get('contains_pii', False)),
+        text if isinstance(text, str) else str(text),
+    )
+
+
+class ColumnarWriter:
+    """Streams entries into a `.fbc` file one chunk at a time."""
+
+    def __init__(self, path: Path, chunk_rows: int = CHUNK_ROWS):
+        self.path = Path(path)
+        self.chunk_rows = chunk_rows
+        self.rows = 0
+        self.categories: List[str] = []
+        self._category_codes = {}
+        self._chunks = []
+        self._file = self.path.open('wb')
+        self._file.write(MAGIC)
+        self._reset_chunk()
+
+    def _reset_chunk(self):
+        self._timestamps = array('q')
+        self._codes = array('H')
+        self._confidence = array('f')
+        self._pii = array('B')
+        self._offsets = array('Q', [0])
+        self._text = bytearray()
+
+    def _category_code(self, category: Optional[str]) -> int:
+        if category is None:
+            return NULL_CATEGORY
+        code = self._category_codes.get(category)
+        if code is None:
+            if len(self.categories) >= NULL_CATEGORY:
+                raise ValueError(f"More than {NULL_CATEGORY} distinct categories")
+            code = self._category_codes[category] = len(self.categories)
+            self.categories.append(category)
+        return code
+
+    def write(self, entry: dict):
+        timestamp, category, score, pii, text = _entry_values(entry)
+        self._timestamps.append(timestamp)
+        self._codes.append(self._category_code(category))
+        self._confidence.append(score)
+        self._pii.append(pii)
+        self._text += text.encode('utf-8', 'surrogatepass')
+        self._offsets.append(len(self._text))
+        if len(self._timestamps) >= self.chunk_rows or len(self._text) >= CHUNK_TEXT_BYTES:
+            self._flush_chunk()
+
+    def _flush_chunk(self):
+        rows = len(self._timestamps)
+        if not rows:
+            return
+        self._chunks.append({'offset': self._file.tell(), 'rows': rows, 'text_bytes': len(self._text)})
+        self._file.write(_ROWS.pack(rows))
+        for column in (self._timestamps, self._codes, self._confidence, self._pii, self._offsets):
+            self._file.write(_little_endian(column))
+        self._file.write(self._text)
+        self.rows += rows
+        self._reset_chunk()
+
+    def close(self):
+        """Writes the last chunk and the footer."""
+        if self._file.closed:
+            return
+        self._flush_chunk()
+        footer = json.dumps({
+            'format': FORMAT_VERSION,
+            'rows': self.rows,
+            'timestamp_unit': 'us',
+            'categories': self.categories,
+            'chunks': self._chunks,
+        }).encode('utf-8')
+        self._file.write(footer)
+        self._file.write(_FOOTER_LENGTH.pack(len(footer)))
+        self._file.write(MAGIC)
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class ColumnarChunk:
+    """Decoded columns of one chunk."""
+
+    def __init__(self, timestamps, codes, confidence, pii, offsets, text, categories):
+        self.timestamps = timestamps
+        self.codes = codes
+        self.confidence = confidence
+        self.pii = pii
+        self.offsets = offsets
+        self.text = text
+        self.categories = categories
+
+    def __len__(self) -> int:
+        return len(self.timestamps)
+
+    def ticket_text(self, i: int) -> str:
+        return self.text[self.offsets[i]:self.offsets[i + 1]].decode('utf-8', 'surrogatepass')
+
+    def rows(self) -> Iterator[dict]:
+        """Rows in the CSV export's column layout (missing values as None)."""
+        for i in range(len(self)):
+            code = self.codes[i]
+            micros = self.timestamps[i]
+            score = self.confidence[i]
+            yield {
+                'timestamp': None if micros == NULL_TIMESTAMP else micros,
+                'ticket_type': None if code == NULL_CATEGORY else self.categories[code],
+                'confidence_score': None if math.isnan(score) else score,
+                'contains_pii': bool(self.pii[i]),
+                'ticket_text': self.ticket_text(i),
+            }
+
+
+class ColumnarReader:
+    """Reads a `.fbc` file chunk by chunk or column-wise."""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        with self.path.open('rb') as f:
+            if f.read(len(MAGIC)) != MAGIC:
+                raise ValueError(f"{self.path} is not a columnar fallback export")
+            f.seek(-(len(MAGIC) + _FOOTER_LENGTH.size), 2)
+            (length,) = _FOOTER_LENGTH.unpack(f.read(_FOOTER_LENGTH.size))
+            if f.read(len(MAGIC)) != MAGIC:
+                raise ValueError(f"{self.path} is truncated (no footer)")
+            f.seek(-(len(MAGIC) + _FOOTER_LENGTH.size + length), 2)
+            self.footer = json.loads(f.read(length))
+        if self.footer.get('format') != FORMAT_VERSION:
+            raise ValueError(f"Unsupported columnar format: {self.footer.get('format')}")
+        self.categories = self.footer['categories']
+        self.rows = self.footer['rows']
+
+    def chunks(self) -> Iterator[ColumnarChunk]:
+        with self.path.open('rb') as f:
+            for info in self.footer['chunks']:
+                rows = info['rows']
+                f.seek(info['offset'] + _ROWS.size)
+                yield ColumnarChunk(
+                    _from_little_endian('q', f.read(8 * rows)),
+                    _from_little_endian('H', f.read(2 * rows)),
+                    _from_little_endian('f', f.read(4 * rows)),
+                    _from_little_endian('B', f.read(rows)),
+                    _from_little_endian('Q', f.read(8 * (rows + 1))),
+                    f.read(info['text_bytes']),
+                    self.categories,
+                )
+
+    def read_columns(self) -> dict:
+        """
+        Loads the numeric columns of the whole file as typed arrays.
+
+        Returns `timestamp` (int64 us), `ticket_type` (uint16 codes into
+        `categories`), `confidence_score` (float32) and `contains_pii`
+        (uint8). Text is left out; use `chunks()` to get it.
+        """
+        columns = {
+            'timestamp': array('q'),
+            'ticket_type': array('H'),
+            'confidence_score': array('f'),
+            'contains_pii': array('B'),
+            'categories': list(self.categories),
+        }
+        for chunk in self.chunks():
+            columns['timestamp'].extend(chunk.timestamps)
+            columns['ticket_type'].extend(chunk.codes)
+            columns['confidence_score'].extend(chunk.confidence)
+            columns['contains_pii'].extend(chunk.pii)
+        return columns
+
+    def iter_rows(self) -> Iterator[dict]:
+        for chunk in self.chunks():
+            yield from chunk.rows()
+
+
+class ArrowWriter:
+    """Streams entries into an Arrow IPC stream (`.arrows`); requires pyarrow."""
+
+    def __init__(self, path: Path, chunk_rows: int = CHUNK_ROWS):
+        if pa is None:
+            raise ImportError("Arrow export requires pyarrow (pip install pyarrow)")
+        self.path = Path(path)
+        self.chunk_rows = chunk_rows
+        self.rows = 0
+        self.schema = pa.schema([
+            ('timestamp', pa.timestamp('us', tz='UTC')),
+            ('ticket_type', pa.dictionary(pa.int32(), pa.string())),
+            ('confidence_score', pa.float32()),
+            ('contains_pii', pa.bool_()),
+            ('ticket_text', pa.large_string()),
+        ])
+        # The stream format (unlike the file format) allows a new category
+        # dictionary per batch
+        self._writer = pa.ipc.new_stream(str(self.path), self.schema)
+        self._columns = ([], [], [], [], [])
+
+    def write(self, entry: dict):
+        timestamp, category, score, pii, text = _entry_values(entry)
+        values = (
+            None if timestamp == NULL_TIMESTAMP else timestamp,
+            category,
+            None if math.isnan(score) else score,
+            pii,
+            text,
+        )
+        for column, value in zip(self._columns, values):
+            column.append(value)
+        if len(self._columns[0]) >= self.chunk_rows:
+            self._flush_batch()
+
+    def _flush_batch(self):
+        timestamps, categories, scores, pii, texts = self._columns
+        if not timestamps:
+            return
+        batch = pa.record_batch([
+            pa.array(timestamps, pa.timestamp('us', tz='UTC')),
+            pa.array(categories, pa.string()).dictionary_encode(),
+            pa.array(scores, pa.float32()),
+            pa.array(pii, pa.bool_()),
+            pa.array(texts, pa.large_string()),
+        ], schema=self.schema)
+        self._writer.write_batch(batch)
+        self.rows += len(timestamps)
+        self._columns = ([], [], [], [], [])
+
+    def close(self):
+        if self._writer is None:
+            return
+        self._flush_batch()
+        self._writer.close()
+        self._writer = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def read_arrow(path: Path):
+    """Loads an `.arrows` export as a pyarrow Table."""
+    if pa is None:
+        raise ImportError("Reading Arrow exports requires pyarrow (pip install pyarrow)")
+    with pa.ipc.open_stream(str(path)) as reader:
+        return reader.read_all()
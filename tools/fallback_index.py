@@ -0,0 +1,229 @@
+"""
+Fallback Log Index - AI Triage Bot
+Sidecar index that lets the fallback viewer seek straight to the entries a
+query can match instead of scanning the whole log.
+
+Two files sit next to the log:
+  <log>.idx       one fixed-size record per log line: byte offset, hour bucket,
+                  running maximum hour bucket, category id and PII flag
+  <log>.idx.json  metadata: how far the log is indexed and the category names
+
+The index is updated incrementally from the last indexed offset, so keeping
+it current costs one read of the newly appended lines. Index lookups are
+conservative: they may return lines the exact filters reject later, but never
+drop a line that would match.
+"""
+
+import hashlib
+import json
+import mmap
+import os
+import re
+import struct
+from bisect import bisect_left
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Iterator, Optional
+
+INDEX_FORMAT = 1
+
+# offset, hour bucket, running max hour bucket, category id, flags
+RECORD = struct.Struct('<QIIHB')
+
+# Category id for entries whose category could not be read (or did not fit)
+NO_CATEGORY = 0xFFFF
+
+PII_TRUE = 0x1
+PII_FALSE = 0x2
+
+# Bytes at the start of the log hashed to detect rotation or replacement
+HEAD_BYTES = 4096
+
+# Records buffered before they are appended to the index file
+WRITE_BATCH = 65536
+
+_TIMESTAMP = re.compile(rb'"timestamp"\s*:\s*"((?:[^"\\]|\\.)*)"')
+_TICKET_TYPE = re.compile(rb'"ticket_type"\s*:\s*("(?:[^"\\]|\\.)*")')
+_CONTAINS_PII = re.compile(rb'"contains_pii"\s*:\s*(true|false)')
+
+
+def hour_bucket(moment: datetime) -> int:
+    """Hours since the Unix epoch (naive datetimes are taken as UTC)."""
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    return max(0, int(moment.timestamp() // 3600))
+
+
+def _line_hour(line: bytes) -> int:
+    match = _TIMESTAMP.search(line)
+    if match is None:
+        return 0
+    try:
+        return hour_bucket(datetime.fromisoformat(match.group(1).decode().replace('Z', '+00:00')))
+    except (ValueError, UnicodeDecodeError):
+        return 0
+
+
+def _line_category(line: bytes) -> Optional[str]:
+    match = _TICKET_TYPE.search(line)
+    if match is None:
+        return None
+    try:
+        return json.loads(match.group(1))
+    except ValueError:
+        return None
+
+
+def _line_flags(line: bytes) -> int:
+    match = _CONTAINS_PII.search(line)
+    if match is None:
+        return 0
+    return PII_TRUE if match.group(1) == b'true' else PII_FALSE
+
+
+class _HourMaxColumn:
+    """Read-only sequence view of the running-max hour column, for bisect."""
+
+    def __init__(self, buffer, count: int):
+        self.buffer = buffer
+        self.count = count
+
+    def __len__(self) -> int:
+        return self.count
+
+    def __getitem__(self, i: int) -> int:
+        return RECORD.unpack_from(self.buffer, i * RECORD.size)[2]
+
+
+class FallbackIndex:
+    """Sidecar index for one JSONL fallback log."""
+
+    def __init__(self, log_path: Path):
+        self.log_path = Path(log_path)
+        self.index_path = self.log_path.with_name(self.log_path.name + '.idx')
+        self.meta_path = self.log_path.with_name(self.log_path.name + '.idx.json')
+        self.meta = self._load_meta()
+
+    @staticmethod
+    def _empty_meta() -> dict:
+        return {
+            'format': INDEX_FORMAT,
+            'indexed_offset': 0,
+            'records': 0,
+            'hour_max': 0,
+            'categories': [],
+            'head_sha256': hashlib.sha256(b'').hexdigest(),
+        }
+
+    def _load_meta(self) -> dict:
+        try:
+            meta = json.loads(self.meta_path.read_text(encoding='utf-8'))
+        except (OSError, ValueError):
+            return self._empty_meta()
+        if not isinstance(meta, dict) or meta.get('format') != INDEX_FORMAT:
+            return self._empty_meta()
+        return meta
+
+    def _save_meta(self):
+        tmp_path = self.meta_path.with_name(self.meta_path.name + '.tmp')
+        tmp_path.write_text(json.dumps(self.meta), encoding='utf-8')
+        os.replace(tmp_path, self.meta_path)
+
+    def _head_digest(self, f, length: int) -> str:
+        f.seek(0)
+        return hashlib.sha256(f.read(min(HEAD_BYTES, length))).hexdigest()
+
+    def update(self) -> int:
+        """
+        Indexes lines appended since the last update and returns how many.
+
+        Starts over if the log shrank or its first bytes changed (rotated or
+        replaced). A trailing line without a newline is left for next time,
+        since the writer may still be appending it.
+        """
+        with self.log_path.open('rb') as f, self.index_path.open('ab') as out:
+            size = os.fstat(f.fileno()).st_size
+            offset = self.meta['indexed_offset']
+            if (size < offset or out.tell() < self.meta['records'] * RECORD.size
+                    or self._head_digest(f, offset) != self.meta['head_sha256']):
+                self.meta = self._empty_meta()
+                offset = 0
+            # Drop records written after the last saved metadata (interrupted update)
+            out.truncate(self.meta['records'] * RECORD.size)
+
+            category_ids = {name: i for i, name in enumerate(self.meta['categories'])}
+            hour_max = self.meta['hour_max']
+            added = 0
+            pending = bytearray()
+
+            f.seek(offset)
+            for line in f:
+                if not line.endswith(b'\n'):
+                    break
+                start = offset
+                offset += len(line)
+                if not line.strip():
+                    continue
+                hour = _line_hour(line)
+                hour_max = max(hour_max, hour)
+                category = _line_category(line)
+                category_id = category_ids.get(category, NO_CATEGORY)
+                if category_id == NO_CATEGORY and isinstance(category, str) and len(category_ids) < NO_CATEGORY:
+                    category_id = category_ids[category] = len(category_ids)
+                    self.meta['categories'].append(category)
+                pending += RECORD.pack(start, hour, hour_max, category_id, _line_flags(line))
+                added += 1
+                if added % WRITE_BATCH == 0:
+                    out.write(pending)
+                    pending.clear()
+            out.write(pending)
+
+            if self.meta['indexed_offset'] < HEAD_BYTES:
+                self.meta['head_sha256'] = self._head_digest(f, offset)
+        self.meta['indexed_offset'] = offset
+        self.meta['records'] += added
+        self.meta['hour_max'] = hour_max
+        self._save_meta()
+        return added
+
+    def lines(self, since: Optional[datetime] = None, category: Optional[str] = None,
+              contains_pii: Optional[bool] = None) -> Iterator[bytes]:
+        """
+        Yields the raw log lines that can match the given criteria.
+
+        `since` bisects the running-max hour column to skip everything logged
+        before the window; `category` and `contains_pii` are checked against
+        the index records so non-matching lines are never read.
+        """
+        count = self.meta['records']
+        if count == 0:
+            return
+        since_hour = hour_bucket(since) if since is not None else 0
+        if category is None:
+            wanted_category = None
+        elif category in self.meta['categories']:
+            wanted_category = self.meta['categories'].index(category)
+        else:
+            # Categories that never appear can still hide behind NO_CATEGORY
+            wanted_category = NO_CATEGORY
+        excluded_flag = None if contains_pii is None else (PII_FALSE if contains_pii else PII_TRUE)
+
+        def wanted(record) -> bool:
+            _, hour, _, category_id, flags = record
+            return (
+                hour >= since_hour
+                and (wanted_category is None or category_id in (wanted_category, NO_CATEGORY))
+                and (excluded_flag is None or not flags & excluded_flag)
+            )
+
+        with self.log_path.open('rb') as f, self.index_path.open('rb') as fi, \
+                mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as log, \
+                mmap.mmap(fi.fileno(), 0, access=mmap.ACCESS_READ) as idx:
+            first = bisect_left(_HourMaxColumn(idx, count), since_hour) if since_hour else 0
+            previous = None
+            for record in RECORD.iter_unpack(idx[first * RECORD.size:count * RECORD.size]):
+                if previous is not None and wanted(previous):
+                    yield log[previous[0]:record[0]]
+                previous = record
+            if previous is not None and wanted(previous):
+                yield log[previous[0]:self.meta['indexed_offset']]
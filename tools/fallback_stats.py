@@ -0,0 +1,123 @@
+"""
+Fallback Log Statistics - AI Triage Bot
+One-pass, constant-memory summary statistics for fallback log entries.
+
+`FallbackStats.add` folds entries in as they stream past, and `merge`
+combines aggregates computed separately (e.g. one per log shard), so a
+summary over any amount of history is a single sequential read.
+Confidence scores go into fixed 0.01-wide bins; the router rounds scores to
+two decimals, so percentiles from the histogram are exact for its logs.
+"""
+
+from collections import Counter
+from datetime import datetime
+from typing import Iterable, List, Optional, Tuple
+
+# Confidence histogram bins: scores 0.00, 0.01, ..., 1.00
+CONFIDENCE_BINS = 101
+
+
+def _confidence_bin(score: float) -> int:
+    return min(CONFIDENCE_BINS - 1, max(0, round(score * (CONFIDENCE_BINS - 1))))
+
+
+class FallbackStats:
+    """Running aggregate over fallback log entries."""
+
+    def __init__(self):
+        self.total = 0
+        self.categories = Counter()
+        self.confidence_histogram = [0] * CONFIDENCE_BINS
+        self.confidence_count = 0
+        self.confidence_sum = 0.0
+        self.confidence_min: Optional[float] = None
+        self.confidence_max: Optional[float] = None
+        self.pii_count = 0
+        self.oldest: Optional[datetime] = None
+        self.newest: Optional[datetime] = None
+
+    @classmethod
+    def from_entries(cls, entries: Iterable[dict]) -> 'FallbackStats':
+        stats = cls()
+        for entry in entries:
+            stats.add(entry)
+        return stats
+
+    def add(self, entry: dict):
+        """Folds one decoded log entry into the aggregate."""
+        self.total += 1
+        result = entry.get('result')
+        if isinstance(result, dict):
+            self.categories[result.get('ticket_type', 'unknown')] += 1
+            score = result.get('confidence_score')
+            if isinstance(score, (int, float)) and not isinstance(score, bool):
+                self._add_confidence(score)
+            if result.get('contains_pii', False):
+                self.pii_count += 1
+
+        moment = entry.get('timestamp_parsed')
+        if moment is None and isinstance(entry.get('timestamp'), str):
+            try:
+                moment = datetime.fromisoformat(entry['timestamp'].replace('Z', '+00:00'))
+            except ValueError:
+                moment = None
+        if moment is not None:
+            self._add_timestamp(moment)
+
+    def _add_confidence(self, score: float):
+        self.confidence_histogram[_confidence_bin(score)] += 1
+        self.confidence_count += 1
+        self.confidence_sum += score
+        if self.confidence_min is None or score < self.confidence_min:
+            self.confidence_min = score
+        if self.confidence_max is None or score > self.confidence_max:
+            self.confidence_max = score
+
+    def _add_timestamp(self, moment: datetime):
+        if self.oldest is None or moment < self.oldest:
+            self.oldest = moment
+        if self.newest is None or moment > self.newest:
+            self.newest = moment
+
+    def merge(self, other: 'FallbackStats') -> 'FallbackStats':
+        """Adds another aggregate (e.g. from a different shard) into this one."""
+        self.total += other.total
+        self.categories.update(other.categories)
+        for i, count in enumerate(other.confidence_histogram):
+            self.confidence_histogram[i] += count
+        self.confidence_count += other.confidence_count
+        self.confidence_sum += other.confidence_sum
+        for score in (other.confidence_min, other.confidence_max):
+            if score is not None:
+                if self.confidence_min is None or score < self.confidence_min:
+                    self.confidence_min = score
+                if self.confidence_max is None or score > self.confidence_max:
+                    self.confidence_max = score
+        for moment in (other.oldest, other.newest):
+            if moment is not None:
+                self._add_timestamp(moment)
+        self.pii_count += other.pii_count
+        return self
+
+    @property
+    def confidence_mean(self) -> Optional[float]:
+        return self.confidence_sum / self.confidence_count if self.confidence_count else None
+
+    def confidence_percentile(self, percent: float) -> Optional[float]:
+        """Nearest-rank percentile of the confidence scores, to bin precision."""
+        if not self.confidence_count:
+            return None
+        rank = max(1, -(-percent * self.confidence_count // 100))
+        seen = 0
+        for i, count in enumerate(self.confidence_histogram):
+            seen += count
+            if seen >= rank:
+                return i / (CONFIDENCE_BINS - 1)
+        return 1.0
+
+    def confidence_buckets(self, buckets: int = 10) -> List[Tuple[float, float, int]]:
+        """Histogram folded into `buckets` equal ranges: (low, high, count)."""
+        folded = [0] * buckets
+        for i, count in enumerate(self.confidence_histogram):
+            folded[min(buckets - 1, i * buckets // (CONFIDENCE_BINS - 1))] += count
+        return [(i / buckets, (i + 1) / buckets, count) for i, count in enumerate(folded)]
@@ -10,41 +10,75 @@ Usage: python tools/fallback_viewer.py [options]
 import json
 import argparse
 import csv
+import re
+import sys
 from pathlib import Path
 from datetime import datetime, timedelta, timezone
-from collections import Counter
-from typing import List, Dict
+from itertools import islice
+from typing import Callable, Dict, Iterator, List, NamedTuple, Optional
+
+try:
+    from governance.log_rotation import has_shards, iter_log_lines
+    from tools.fallback_columnar import ArrowWriter, ColumnarWriter
+    from tools.fallback_index import FallbackIndex
+    from tools.fallback_stats import FallbackStats
+except ImportError:  # run standalone as python tools/fallback_viewer.py
+    sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+    from governance.log_rotation import has_shards, iter_log_lines
+    from tools.fallback_columnar import ArrowWriter, ColumnarWriter
+    from tools.fallback_index import FallbackIndex
+    from tools.fallback_stats import FallbackStats
+
+CSV_FIELDS = ['timestamp', 'ticket_type', 'confidence_score', 'contains_pii', 'ticket_text']
+
+EXPORT_FORMATS = ('csv', 'columnar', 'arrow')
+
+# Read buffer for streaming through multi-GB logs
+STREAM_BUFFER_BYTES = 1 << 20
+
+# Raw-line patterns used to reject entries before JSON decoding. Quotes inside
+# ticket text are escaped in JSONL, so these only match the real keys.
+_TIMESTAMP_DATE = re.compile(rb'"timestamp"\s*:\s*"(\d{4}-\d{2}-\d{2})')
+_CONFIDENCE_VALUE = re.compile(rb'"confidence_score"\s*:\s*(-?\d+(?:\.\d*)?(?:[eE][-+]?\d+)?)')
+
+
+def parse_timestamp(value: str) -> datetime:
+    """Parses an ISO 8601 log timestamp, accepting a trailing 'Z' for UTC."""
+    return datetime.fromisoformat(value.replace('Z', '+00:00'))
 
 
 class FallbackLogViewer:
     """Interactive viewer for fallback classification logs."""
     
-    def __init__(self, log_path: Path):
-        """Initialize the viewer with the log file path."""
+    def __init__(self, log_path: Path, since: Optional[datetime] = None):
+        """
+        Initialize the viewer with the log file path.
+        
+        If the log has been rotated, its shards are loaded too; `since` skips
+        shards that ended before that time.
+        """
         self.log_path = log_path
+        self.since = since
         self.entries = []
         self.load_entries()
     
     def load_entries(self):
-        """Load all entries from the JSONL fallback log."""
-        if not self.log_path.exists():
+        """Load all entries from the JSONL fallback log and its rotated shards."""
+        if not self.log_path.exists() and not has_shards(self.log_path):
             print(f"⚠️  Warning: Log file not found: {self.log_path}")
             print("    No fallback entries to display.")
             return
         
-        with self.log_path.open('r') as f:
-            for line in f:
-                try:
-                    entry = json.loads(line.strip())
-                    # Parse timestamp if present
-                    if 'timestamp' in entry:
-                        entry['timestamp_parsed'] = datetime.fromisoformat(
-                            entry['timestamp'].replace('Z', '+00:00')
-                        )
-                    self.entries.append(entry)
-                except json.JSONDecodeError:
-                    print(f"⚠️  Warning: Skipping malformed log entry")
-                    continue
+        for line in iter_log_lines(self.log_path, since=self.since):
+            try:
+                entry = json.loads(line.strip())
+                # Parse timestamp if present
+                if 'timestamp' in entry:
+                    entry['timestamp_parsed'] = parse_timestamp(entry['timestamp'])
+                self.entries.append(entry)
+            except ValueError:
+                print(f"⚠️  Warning: Skipping malformed log entry")
+                continue
         
         print(f"✅ Loaded {len(self.entries)} fallback entries")
     
@@ -88,57 +122,7 @@ class FallbackLogViewer:
         if not self.entries:
             print("📊 No entries to analyze")
             return
-        
-        print("\n" + "="*70)
-        print("📊 FALLBACK LOG SUMMARY STATISTICS")
-        print("="*70)
-        
-        # Total entries
-        print(f"\n📈 Total Entries: {len(self.entries)}")
-        
-        # Category distribution
-        categories = Counter(
-            e['result'].get('ticket_type', 'unknown') 
-            for e in self.entries if 'result' in e
-        )
-        print("\n📂 Classification Distribution:")
-        for category, count in categories.most_common():
-            percentage = (count / len(self.entries)) * 100
-            print(f"   {category:20s}: {count:4d} ({percentage:5.1f}%)")
-        
-        # Confidence score statistics
-        confidence_scores = [
-            e['result']['confidence_score'] 
-            for e in self.entries 
-            if 'result' in e and 'confidence_score' in e['result']
-        ]
-        if confidence_scores:
-            avg_conf = sum(confidence_scores) / len(confidence_scores)
-            min_conf = min(confidence_scores)
-            max_conf = max(confidence_scores)
-            print(f"\n🎯 Confidence Scores:")
-            print(f"   Average: {avg_conf:.2f}")
-            print(f"   Range:   {min_conf:.2f} - {max_conf:.2f}")
-        
-        # PII detection statistics
-        pii_count = sum(
-            1 for e in self.entries 
-            if 'result' in e and e['result'].get('contains_pii', False)
-        )
-        pii_percentage = (pii_count / len(self.entries)) * 100 if self.entries else 0
-        print(f"\n🔒 PII Detection:")
-        print(f"   Tickets with PII: {pii_count} ({pii_percentage:.1f}%)")
-        
-        # Date range
-        if any('timestamp_parsed' in e for e in self.entries):
-            timestamps = [e['timestamp_parsed'] for e in self.entries if 'timestamp_parsed' in e]
-            oldest = min(timestamps)
-            newest = max(timestamps)
-            print(f"\n📅 Date Range:")
-            print(f"   Oldest: {oldest.strftime('%Y-%m-%d %H:%M:%S')}")
-            print(f"   Newest: {newest.strftime('%Y-%m-%d %H:%M:%S')}")
-        
-        print("="*70 + "\n")
+        print_summary(FallbackStats.from_entries(self.entries))
     
     def display_entries(self, limit: int = None):
         """Display entries in a human-readable format."""
@@ -153,19 +137,7 @@ class FallbackLogViewer:
         print("="*70 + "\n")
         
         for i, entry in enumerate(entries_to_show, 1):
-            result = entry.get('result', {})
-            ticket_text = entry.get('ticket', 'N/A')
-            timestamp = entry.get('timestamp', 'N/A')
-            
-            print(f"Entry #{i}")
-            print(f"{'─'*70}")
-            print(f"⏰ Timestamp:   {timestamp}")
-            print(f"📂 Category:    {result.get('ticket_type', 'N/A')}")
-            print(f"🎯 Confidence:  {result.get('confidence_score', 'N/A')}")
-            print(f"🔒 Contains PII: {'Yes' if result.get('contains_pii') else 'No'}")
-            print(f"📝 Ticket Text:")
-            print(f"   {ticket_text[:200]}{'...' if len(ticket_text) > 200 else ''}")
-            print()
+            print_entry(i, entry)
         
         if limit and len(self.entries) > limit:
             print(f"... and {len(self.entries) - limit} more entries")
@@ -179,24 +151,339 @@ class FallbackLogViewer:
             return
         
         with output_path.open('w', newline='', encoding='utf-8') as csvfile:
-            fieldnames = [
-                'timestamp', 'ticket_type', 'confidence_score', 
-                'contains_pii', 'ticket_text'
-            ]
-            writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
+            writer = csv.DictWriter(csvfile, fieldnames=CSV_FIELDS)
             
             writer.writeheader()
             for entry in self.entries:
-                result = entry.get('result', {})
-                writer.writerow({
-                    'timestamp': entry.get('timestamp', ''),
-                    'ticket_type': result.get('ticket_type', ''),
-                    'confidence_score': result.get('confidence_score', ''),
-                    'contains_pii': result.get('contains_pii', False),
-                    'ticket_text': entry.get('ticket', '')
-                })
+                writer.writerow(csv_row(entry))
         
         print(f"✅ Exported {len(self.entries)} entries to {output_path}")
+    
+    def export(self, output_path: Path, export_format: Optional[str] = None):
+        """Export filtered entries as CSV, columnar (.fbc) or Arrow (.arrows)."""
+        export_format = export_format or export_format_for(output_path)
+        if export_format == 'csv':
+            self.export_to_csv(output_path)
+            return
+        if not self.entries:
+            print("⚠️  No entries to export")
+            return
+        try:
+            exporter = open_exporter(output_path, export_format)
+        except ImportError as e:
+            print(f"❌ Error: {e}")
+            return
+        with exporter:
+            for entry in self.entries:
+                exporter.write(entry)
+        print(f"✅ Exported {len(self.entries)} entries to {output_path} ({export_format})")
+
+
+class CsvExporter:
+    """Row-at-a-time CSV export with the same interface as the columnar writers."""
+    
+    def __init__(self, output_path: Path):
+        self._file = output_path.open('w', newline='', encoding='utf-8')
+        self._writer = csv.DictWriter(self._file, fieldnames=CSV_FIELDS)
+        self._writer.writeheader()
+    
+    def write(self, entry: dict):
+        self._writer.writerow(csv_row(entry))
+    
+    def close(self):
+        self._file.close()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc):
+        self.close()
+
+
+def export_format_for(output_path: Path) -> str:
+    """Picks the export format from the file extension (CSV unless .fbc/.arrows)."""
+    suffix = output_path.suffix.lower()
+    if suffix == '.fbc':
+        return 'columnar'
+    if suffix in ('.arrow', '.arrows'):
+        return 'arrow'
+    return 'csv'
+
+
+def open_exporter(output_path: Path, export_format: str):
+    """Opens a writer with `write(entry)` / `close()` for the given format."""
+    if export_format == 'columnar':
+        return ColumnarWriter(output_path)
+    if export_format == 'arrow':
+        return ArrowWriter(output_path)
+    if export_format == 'csv':
+        return CsvExporter(output_path)
+    raise ValueError(f"Unknown export format: {export_format}")
+
+
+def print_summary(stats: FallbackStats):
+    """Prints the summary statistics block for an aggregate."""
+    print("\n" + "="*70)
+    print("📊 FALLBACK LOG SUMMARY STATISTICS")
+    print("="*70)
+    
+    # Total entries
+    print(f"\n📈 Total Entries: {stats.total}")
+    
+    # Category distribution
+    print("\n📂 Classification Distribution:")
+    for category, count in stats.categories.most_common():
+        percentage = (count / stats.total) * 100
+        print(f"   {category:20s}: {count:4d} ({percentage:5.1f}%)")
+    
+    # Confidence score statistics
+    if stats.confidence_count:
+        print(f"\n🎯 Confidence Scores:")
+        print(f"   Average: {stats.confidence_mean:.2f}")
+        print(f"   Range:   {stats.confidence_min:.2f} - {stats.confidence_max:.2f}")
+        print(f"   Median:  {stats.confidence_percentile(50):.2f}   "
+              f"P90: {stats.confidence_percentile(90):.2f}   "
+              f"P99: {stats.confidence_percentile(99):.2f}")
+        buckets = stats.confidence_buckets()
+        widest = max(count for _, _, count in buckets)
+        for low, high, count in buckets:
+            if count:
+                bar = '█' * max(1, round(30 * count / widest))
+                print(f"   {low:.1f}-{high:.1f}: {count:6d} {bar}")
+    
+    # PII detection statistics
+    pii_percentage = (stats.pii_count / stats.total) * 100 if stats.total else 0
+    print(f"\n🔒 PII Detection:")
+    print(f"   Tickets with PII: {stats.pii_count} ({pii_percentage:.1f}%)")
+    
+    # Date range
+    if stats.oldest is not None:
+        print(f"\n📅 Date Range:")
+        print(f"   Oldest: {stats.oldest.strftime('%Y-%m-%d %H:%M:%S')}")
+        print(f"   Newest: {stats.newest.strftime('%Y-%m-%d %H:%M:%S')}")
+    
+    print("="*70 + "\n")
+
+
+def print_entry(number: int, entry: dict):
+    """Prints one log entry in the viewer's human-readable layout."""
+    result = entry.get('result', {})
+    ticket_text = entry.get('ticket', 'N/A')
+    timestamp = entry.get('timestamp', 'N/A')
+    
+    print(f"Entry #{number}")
+    print(f"{'─'*70}")
+    print(f"⏰ Timestamp:   {timestamp}")
+    print(f"📂 Category:    {result.get('ticket_type', 'N/A')}")
+    print(f"🎯 Confidence:  {result.get('confidence_score', 'N/A')}")
+    print(f"🔒 Contains PII: {'Yes' if result.get('contains_pii') else 'No'}")
+    print(f"📝 Ticket Text:")
+    print(f"   {ticket_text[:200]}{'...' if len(ticket_text) > 200 else ''}")
+    print()
+
+
+def csv_row(entry: dict) -> dict:
+    """Flattens one log entry into the CSV export columns."""
+    result = entry.get('result', {})
+    return {
+        'timestamp': entry.get('timestamp', ''),
+        'ticket_type': result.get('ticket_type', ''),
+        'confidence_score': result.get('confidence_score', ''),
+        'contains_pii': result.get('contains_pii', False),
+        'ticket_text': entry.get('ticket', '')
+    }
+
+
+# --- Streaming mode ---
+
+class LogFilter(NamedTuple):
+    """
+    One viewer filter in two stages.
+
+    `prefilter` runs on the raw JSONL line and may only reject lines the
+    exact test would also reject; `matches` is the exact test on the decoded
+    entry, with the same semantics as the FallbackLogViewer filter.
+    `index_terms` are the keyword arguments this filter contributes to
+    `FallbackIndex.lines` when the log is read through its index.
+    """
+    prefilter: Callable[[bytes], bool]
+    matches: Callable[[dict], bool]
+    index_terms: Optional[dict] = None
+
+
+def date_range_filter(days: int, now: Optional[datetime] = None) -> LogFilter:
+    """Entries from the last `days` days."""
+    cutoff = (now or datetime.now(timezone.utc)) - timedelta(days=days)
+    # Compare raw dates a day early so timezone offsets can't cause false rejects
+    earliest_date = (cutoff - timedelta(days=1)).date().isoformat().encode()
+
+    def prefilter(line: bytes) -> bool:
+        match = _TIMESTAMP_DATE.search(line)
+        return match is not None and match.group(1) >= earliest_date
+
+    def matches(entry: dict) -> bool:
+        try:
+            return parse_timestamp(entry['timestamp']) >= cutoff
+        except (KeyError, TypeError, ValueError, AttributeError):
+            return False
+
+    return LogFilter(prefilter, matches, {'since': cutoff})
+
+
+def confidence_filter(min_confidence: float, max_confidence: float = 1.0) -> LogFilter:
+    """Entries whose confidence score lies in [min_confidence, max_confidence]."""
+    def prefilter(line: bytes) -> bool:
+        match = _CONFIDENCE_VALUE.search(line)
+        return match is not None and min_confidence <= float(match.group(1)) <= max_confidence
+
+    def matches(entry: dict) -> bool:
+        score = entry.get('result', {}).get('confidence_score')
+        return isinstance(score, (int, float)) and min_confidence <= score <= max_confidence
+
+    return LogFilter(prefilter, matches)
+
+
+def category_filter(category: str) -> LogFilter:
+    """Entries classified as `category`."""
+    if category.isascii():
+        pattern = re.compile(rb'"ticket_type"\s*:\s*' + re.escape(json.dumps(category).encode()))
+        prefilter = lambda line: pattern.search(line) is not None
+    else:
+        # Writers may or may not escape non-ASCII, so leave it to the exact test
+        prefilter = lambda line: True
+    return LogFilter(
+        prefilter,
+        lambda entry: entry.get('result', {}).get('ticket_type') == category,
+        {'category': category},
+    )
+
+
+def pii_filter(contains_pii: bool = True) -> LogFilter:
+    """Entries that are (or are not) flagged as containing PII."""
+    pattern = re.compile(rb'"contains_pii"\s*:\s*' + (b'true' if contains_pii else b'false'))
+    return LogFilter(
+        lambda line: pattern.search(line) is not None,
+        lambda entry: entry.get('result', {}).get('contains_pii') == contains_pii,
+        {'contains_pii': contains_pii},
+    )
+
+
+class FallbackLogStream:
+    """
+    Lazily filtered view of a fallback log for files too large to load.
+
+    Iterating reads the log once, rejects lines with the cheap prefilters,
+    decodes only the survivors and applies the exact filters. Nothing is
+    kept in memory, and iteration stops as soon as `limit` entries matched.
+    Rotated shards are read first, skipping those that ended before a date
+    filter's window. With an up-to-date `index`, only the lines of the
+    active file that the index says can match are read at all.
+    """
+
+    def __init__(self, log_path: Path, filters: Optional[List[LogFilter]] = None,
+                 limit: Optional[int] = None, index: Optional[FallbackIndex] = None):
+        self.log_path = log_path
+        self.filters = list(filters or [])
+        self.limit = limit
+        self.index = index
+        self.malformed = 0
+
+    def _raw_lines(self) -> Iterator[bytes]:
+        terms = {}
+        for log_filter in self.filters:
+            terms.update(log_filter.index_terms or {})
+        yield from iter_log_lines(self.log_path, since=terms.get('since'), include_active=False)
+        if self.index is not None:
+            yield from self.index.lines(**terms)
+            return
+        try:
+            with self.log_path.open('rb', buffering=STREAM_BUFFER_BYTES) as f:
+                yield from f
+        except FileNotFoundError:
+            return
+
+    def __iter__(self) -> Iterator[dict]:
+        if not self.log_path.exists() and not has_shards(self.log_path):
+            print(f"⚠️  Warning: Log file not found: {self.log_path}")
+            print("    No fallback entries to display.")
+            return
+        prefilters = [f.prefilter for f in self.filters]
+        exact = [f.matches for f in self.filters]
+        lines = (line for line in self._raw_lines() if all(test(line) for test in prefilters))
+        entries = (entry for entry in map(self._decode, lines) if entry is not None)
+        matching = (entry for entry in entries if all(test(entry) for test in exact))
+        yield from islice(matching, self.limit)
+
+    def _decode(self, line: bytes) -> Optional[dict]:
+        if not line.strip():
+            return None
+        try:
+            entry = json.loads(line)
+        except ValueError:
+            self.malformed += 1
+            print(f"⚠️  Warning: Skipping malformed log entry")
+            return None
+        return entry if isinstance(entry, dict) else None
+
+
+def build_stream_filters(args) -> List[LogFilter]:
+    """Translates the viewer's command-line filters into streaming filters."""
+    filters = []
+    if args.date_range:
+        filters.append(date_range_filter(args.date_range))
+    if args.min_confidence > 0.0 or args.max_confidence < 1.0:
+        filters.append(confidence_filter(args.min_confidence, args.max_confidence))
+    if args.category:
+        filters.append(category_filter(args.category))
+    if args.contains_pii:
+        filters.append(pii_filter(contains_pii=True))
+    if args.no_pii:
+        filters.append(pii_filter(contains_pii=False))
+    return filters
+
+
+def run_stream(args):
+    """Displays, exports and summarizes matching entries in one pass over the log."""
+    index = None
+    if not args.no_index and args.log_path.exists():
+        index = FallbackIndex(args.log_path)
+        try:
+            added = index.update()
+            print(f"🗂️  Index up to date ({added} new entries indexed)")
+        except OSError as e:
+            print(f"⚠️  Warning: Could not update log index, scanning the full log: {e}")
+            index = None
+    stream = FallbackLogStream(args.log_path, build_stream_filters(args), limit=args.limit, index=index)
+    show = not args.stats_only
+    export_format = args.export_format or (export_format_for(args.export) if args.export else None)
+    try:
+        exporter = open_exporter(args.export, export_format) if args.export else None
+    except ImportError as e:
+        print(f"❌ Error: {e}")
+        return
+    stats = FallbackStats()
+    count = 0
+    try:
+        if show:
+            print("\n" + "="*70)
+            print("📋 FALLBACK LOG ENTRIES (streaming)")
+            print("="*70 + "\n")
+        for count, entry in enumerate(stream, 1):
+            stats.add(entry)
+            if show:
+                print_entry(count, entry)
+            if exporter:
+                exporter.write(entry)
+    finally:
+        if exporter:
+            exporter.close()
+    print(f"✅ Streamed {count} matching entries")
+    if count:
+        print_summary(stats)
+    else:
+        print("📊 No entries to analyze")
+    if args.export:
+        print(f"✅ Exported {count} entries to {args.export} ({export_format})")
 
 
 def main():
@@ -220,6 +507,12 @@ Examples:
   
   # Export filtered results to CSV
   python tools/fallback_viewer.py --date-range 30 --export fallback_report.csv
+  
+  # Export typed columns for analytics notebooks
+  python tools/fallback_viewer.py --stream --export fallback.fbc
+  
+  # Stream a multi-GB log without loading it into memory
+  python tools/fallback_viewer.py --stream --date-range 1 --category billing_question --limit 50
         """
     )
     
@@ -283,7 +576,14 @@ Examples:
         '--export',
         type=Path,
         metavar='FILE',
-        help='Export filtered results to CSV file'
+        help='Export filtered results to FILE (CSV, or columnar for .fbc / Arrow for .arrows)'
+    )
+    
+    parser.add_argument(
+        '--export-format',
+        choices=EXPORT_FORMATS,
+        help='Export format, overriding the one implied by the --export extension '
+             '(arrow requires pyarrow)'
     )
     
     parser.add_argument(
@@ -292,10 +592,29 @@ Examples:
         help='Show only summary statistics (no individual entries)'
     )
     
+    parser.add_argument(
+        '--stream',
+        action='store_true',
+        help='Filter the log lazily in one pass instead of loading it into memory '
+             '(--limit then stops reading early and also caps --export)'
+    )
+    
+    parser.add_argument(
+        '--no-index',
+        action='store_true',
+        help='With --stream, scan the whole log instead of using (and updating) '
+             'the sidecar index next to it'
+    )
+    
     args = parser.parse_args()
     
-    # Initialize viewer
-    viewer = FallbackLogViewer(args.log_path)
+    if args.stream:
+        run_stream(args)
+        return
+    
+    # Initialize viewer (rotated shards older than the date range are skipped)
+    since = datetime.now(timezone.utc) - timedelta(days=args.date_range) if args.date_range else None
+    viewer = FallbackLogViewer(args.log_path, since=since)
     
     # Apply filters
     if args.date_range:
@@ -321,7 +640,7 @@ Examples:
     
     # Export if requested
     if args.export:
-        viewer.export_to_csv(args.export)
+        viewer.export(args.export, args.export_format)
 
 
 if __name__ == "__main__":
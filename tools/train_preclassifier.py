@@ -0,0 +1,386 @@
+#!/usr/bin/env python3
+"""
+Pre-classifier Trainer - AI Triage Bot
+
+Purpose: Fits the local pre-classifier's hashed linear model from labeled
+history (reviewer-corrected classifications by default) and reports how
+many LLM calls it would avoid at each confidence threshold.
+Usage: python tools/train_preclassifier.py [sources ...] [options]
+
+Each source is a JSONL log (rotated shards included). A line is used when it has
+- a reviewer correction: {"ticket": ..., "review": {"ticket_type": ...}}
+- an explicit label: {"ticket": ..., "ticket_type": ...} or {"ticket": ..., "label": ...}
+- only with --min-confidence: an unreviewed LLM classification at or above
+  it (e.g. from the fallback log). The fallback log holds the results the
+  pipeline sent to human review, so the opt-in must be at least the
+  configured confidence_threshold. Results decided by the pre-classifier
+  itself are always skipped so it never trains on its own output.
+Later lines win for the same ticket text, so a review overrides the
+original classification.
+"""
+
+import argparse
+import json
+import math
+import random
+import sys
+import time
+import zlib
+from array import array
+from collections import Counter
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Iterable, Iterator, NamedTuple, Optional, Sequence
+
+import yaml
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+try:
+    from bot_engine.cache import normalize_ticket_text
+    from bot_engine.preclassifier import HashedLinearModel, hashed_features
+    from governance.log_rotation import iter_log_lines
+except ImportError:  # run standalone as python tools/train_preclassifier.py
+    sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+    from bot_engine.cache import normalize_ticket_text
+    from bot_engine.preclassifier import HashedLinearModel, hashed_features
+    from governance.log_rotation import iter_log_lines
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+CONFIG_PATH = PROJECT_ROOT / "governance" / "config" / "scope.yaml"
+DEFAULT_SOURCES = [PROJECT_ROOT / "governance" / "reviewed_labels.jsonl"]
+DEFAULT_OUTPUT = PROJECT_ROOT / "governance" / "models" / "preclassifier.bin"
+
+# bot_config.confidence_threshold when scope.yaml does not set it
+DEFAULT_CONFIDENCE_THRESHOLD = 0.5
+
+THRESHOLDS = (0.5, 0.6, 0.7, 0.8, 0.9, 0.95, 0.99)
+
+# Stages whose labels came from the pre-classifier or the degraded path, not the LLM
+SELF_STAGES = {"rules", "model", "degraded"}
+
+
+class Dataset(NamedTuple):
+    """Sparse binary feature rows in CSR form, plus labels and the source texts."""
+    indptr: array
+    indices: array
+    labels: array
+    texts: list
+
+
+# --- Loading ---
+
+def entry_label(entry: dict, min_confidence: Optional[float]) -> Optional[tuple[str, str]]:
+    """
+    (ticket text, label) for a log entry, or None if it carries no usable label.
+    Unreviewed LLM results count only when `min_confidence` is given.
+    """
+    ticket = entry.get("ticket")
+    if not isinstance(ticket, str) or not ticket.strip():
+        return None
+    review = entry.get("review")
+    if isinstance(review, dict) and isinstance(review.get("ticket_type"), str):
+        return ticket, review["ticket_type"]
+    for key in ("ticket_type", "label"):
+        if isinstance(entry.get(key), str):
+            return ticket, entry[key]
+
+    result = entry.get("result")
+    if min_confidence is None or not isinstance(result, dict) or result.get("decision_stage") in SELF_STAGES:
+        return None
+    category = result.get("ticket_type")
+    confidence = result.get("confidence_score")
+    if (isinstance(category, str) and category != "unknown"
+            and isinstance(confidence, (int, float)) and confidence >= min_confidence):
+        return ticket, category
+    return None
+
+
+def iter_labeled(sources: Iterable[Path], min_confidence: Optional[float], counts: Counter) -> Iterator[tuple[str, str]]:
+    """Streams (ticket text, label) pairs from every source log, shards first."""
+    for path in sources:
+        for line in iter_log_lines(path):
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                counts["malformed"] += 1
+                continue
+            labeled = entry_label(entry, min_confidence) if isinstance(entry, dict) else None
+            if labeled is None:
+                counts["unlabeled"] += 1
+                continue
+            yield labeled
+
+
+def load_datasets(sources: Iterable[Path], classes: Sequence[str], min_confidence: Optional[float],
+                  holdout: float, bits: int, ngram: int,
+                  confidence_threshold: float = DEFAULT_CONFIDENCE_THRESHOLD) -> tuple[Dataset, Dataset, Counter]:
+    """
+    Deduplicates labeled tickets (last label wins) and splits them into train/holdout.
+
+    The split is by a hash of the normalized text, so a ticket lands on the
+    same side on every run and duplicates never straddle it. Raises
+    ValueError if `min_confidence` would accept LLM results below the
+    pipeline's `confidence_threshold`.
+    """
+    if min_confidence is not None and min_confidence < confidence_threshold:
+        raise ValueError(f"--min-confidence {min_confidence} is below confidence_threshold "
+                         f"{confidence_threshold}; those results were sent to human review")
+    class_ids = {name: i for i, name in enumerate(classes)}
+    counts = Counter()
+    latest = {}
+    for ticket, label in iter_labeled(sources, min_confidence, counts):
+        if label not in class_ids:
+            counts["unknown_label"] += 1
+            continue
+        latest[normalize_ticket_text(ticket)] = (ticket, class_ids[label])
+
+    train = Dataset(array("q", [0]), array("l"), array("h"), [])
+    test = Dataset(array("q", [0]), array("l"), array("h"), [])
+    for key, (ticket, label) in latest.items():
+        features = hashed_features(ticket, bits, ngram)
+        if not features:
+            counts["no_features"] += 1
+            continue
+        in_holdout = zlib.crc32(key.encode("utf-8")) % 10_000 < holdout * 10_000
+        target = test if in_holdout else train
+        target.indices.extend(features)
+        target.indptr.append(len(target.indices))
+        target.labels.append(label)
+        target.texts.append(ticket)
+    counts["examples"] = len(train.labels) + len(test.labels)
+    return train, test, counts
+
+
+# --- Training ---
+#
+# Softmax regression on L2-normalized binary features, trained with
+# mini-batch AdaGrad; each touched weight row also gets L2 decay. The NumPy
+# and pure-Python paths run the same updates.
+
+def fit_numpy(data: Dataset, n_classes: int, bits: int, epochs: int, learning_rate: float,
+              l2: float, batch_size: int, seed: int) -> tuple[array, list]:
+    indptr = np.frombuffer(data.indptr, dtype=np.int64)
+    indices = np.asarray(data.indices, dtype=np.int64)
+    labels = np.asarray(data.labels, dtype=np.int64)
+    lengths = np.diff(indptr)
+    scales = (1.0 / np.sqrt(lengths)).astype(np.float32)
+
+    weights = np.zeros((1 << bits, n_classes), dtype=np.float32)
+    squared = np.zeros_like(weights)
+    bias = np.zeros(n_classes, dtype=np.float32)
+    bias_squared = np.zeros_like(bias)
+    rng = np.random.default_rng(seed)
+
+    for _ in range(epochs):
+        order = rng.permutation(len(labels))
+        for start in range(0, len(order), batch_size):
+            rows = order[start:start + batch_size]
+            row_lengths = lengths[rows]
+            offsets = np.concatenate(([0], np.cumsum(row_lengths)[:-1]))
+            positions = np.repeat(indptr[rows] - offsets, row_lengths) + np.arange(row_lengths.sum())
+            features = indices[positions]
+            row_ids = np.repeat(np.arange(len(rows)), row_lengths)
+            row_scales = scales[rows][row_ids][:, None]
+
+            scores = np.add.reduceat(weights[features] * row_scales, offsets, axis=0) + bias
+            scores -= scores.max(axis=1, keepdims=True)
+            probs = np.exp(scores)
+            probs /= probs.sum(axis=1, keepdims=True)
+            probs[np.arange(len(rows)), labels[rows]] -= 1.0
+
+            unique, inverse = np.unique(features, return_inverse=True)
+            gradient = np.zeros((len(unique), n_classes), dtype=np.float32)
+            np.add.at(gradient, inverse.reshape(-1), probs[row_ids] * row_scales)
+            gradient += l2 * weights[unique]
+            squared[unique] += gradient * gradient
+            weights[unique] -= learning_rate * gradient / (np.sqrt(squared[unique]) + 1e-8)
+
+            bias_gradient = probs.sum(axis=0)
+            bias_squared += bias_gradient * bias_gradient
+            bias -= learning_rate * bias_gradient / (np.sqrt(bias_squared) + 1e-8)
+
+    flat = array("f")
+    flat.frombytes(weights.astype("<f4").tobytes())
+    return flat, [float(b) for b in bias]
+
+
+def fit_python(data: Dataset, n_classes: int, bits: int, epochs: int, learning_rate: float,
+               l2: float, batch_size: int, seed: int) -> tuple[array, list]:
+    width = n_classes
+    weights = array("f", bytes(4 * (1 << bits) * width))
+    squared = array("f", bytes(4 * (1 << bits) * width))
+    bias = [0.0] * width
+    bias_squared = [0.0] * width
+    rng = random.Random(seed)
+    order = list(range(len(data.labels)))
+
+    for _ in range(epochs):
+        rng.shuffle(order)
+        for start in range(0, len(order), batch_size):
+            gradients = {}
+            bias_gradient = [0.0] * width
+            for row in order[start:start + batch_size]:
+                features = data.indices[data.indptr[row]:data.indptr[row + 1]]
+                scale = 1.0 / math.sqrt(len(features))
+                scores = list(bias)
+                for feature in features:
+                    offset = feature * width
+                    for j in range(width):
+                        scores[j] += weights[offset + j] * scale
+                top = max(scores)
+                probs = [math.exp(s - top) for s in scores]
+                total = sum(probs)
+                probs = [p / total for p in probs]
+                probs[data.labels[row]] -= 1.0
+                for j in range(width):
+                    bias_gradient[j] += probs[j]
+                for feature in features:
+                    gradient = gradients.setdefault(feature, [0.0] * width)
+                    for j in range(width):
+                        gradient[j] += probs[j] * scale
+
+            for feature, gradient in gradients.items():
+                offset = feature * width
+                for j in range(width):
+                    g = gradient[j] + l2 * weights[offset + j]
+                    squared[offset + j] += g * g
+                    weights[offset + j] -= learning_rate * g / (math.sqrt(squared[offset + j]) + 1e-8)
+            for j in range(width):
+                bias_squared[j] += bias_gradient[j] * bias_gradient[j]
+                bias[j] -= learning_rate * bias_gradient[j] / (math.sqrt(bias_squared[j]) + 1e-8)
+    return weights, bias
+
+
+def fit(data: Dataset, classes: Sequence[str], bits: int = 18, ngram: int = 2, epochs: int = 10,
+        learning_rate: float = 0.5, l2: float = 1e-4, batch_size: int = 256, seed: int = 0,
+        use_numpy: Optional[bool] = None) -> HashedLinearModel:
+    """Trains a HashedLinearModel; uses NumPy when it is installed unless told otherwise."""
+    if use_numpy is None:
+        use_numpy = np is not None
+    if use_numpy and np is None:
+        raise ImportError("NumPy is not installed; pip install numpy or train with --no-numpy")
+    trainer = fit_numpy if use_numpy else fit_python
+    weights, bias = trainer(data, len(classes), bits, epochs, learning_rate, l2, batch_size, seed)
+    return HashedLinearModel(classes, weights, bias, bits=bits, ngram=ngram,
+                             metadata={"backend": "numpy" if use_numpy else "python"})
+
+
+# --- Evaluation ---
+
+def evaluate(model: HashedLinearModel, data: Dataset, thresholds: Sequence[float] = THRESHOLDS) -> dict:
+    """
+    Per-class precision/recall on `data`, plus for each threshold the share of
+    tickets the model would answer locally (LLM calls avoided) and how often
+    those local answers are right.
+    """
+    predictions = [model.predict(text) for text in data.texts]
+    truth = [model.classes[label] for label in data.labels]
+
+    per_class = {}
+    for name in model.classes:
+        predicted = sum(p == name for p, _ in predictions)
+        actual = truth.count(name)
+        correct = sum(p == name == t for (p, _), t in zip(predictions, truth))
+        per_class[name] = {
+            "precision": correct / predicted if predicted else 0.0,
+            "recall": correct / actual if actual else 0.0,
+            "support": actual,
+        }
+
+    total = len(truth)
+    by_threshold = []
+    for threshold in thresholds:
+        local = [(p, t) for (p, confidence), t in zip(predictions, truth)
+                 if confidence >= threshold and p != "unknown"]
+        by_threshold.append({
+            "threshold": threshold,
+            "llm_calls_avoided": len(local) / total if total else 0.0,
+            "local_accuracy": sum(p == t for p, t in local) / len(local) if local else 0.0,
+        })
+    accuracy = sum(p == t for (p, _), t in zip(predictions, truth)) / total if total else 0.0
+    return {"examples": total, "accuracy": accuracy, "per_class": per_class, "thresholds": by_threshold}
+
+
+def print_evaluation(evaluation: dict):
+    print(f"\nHoldout: {evaluation['examples']} tickets, accuracy {evaluation['accuracy']:.1%}")
+    print(f"\n{'Category':20s} {'Precision':>10s} {'Recall':>10s} {'Support':>8s}")
+    for name, row in evaluation["per_class"].items():
+        print(f"{name:20s} {row['precision']:10.1%} {row['recall']:10.1%} {row['support']:8d}")
+    print(f"\n{'Threshold':>10s} {'LLM calls avoided':>18s} {'Local accuracy':>15s}")
+    for row in evaluation["thresholds"]:
+        print(f"{row['threshold']:10.2f} {row['llm_calls_avoided']:18.1%} {row['local_accuracy']:15.1%}")
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Train the local pre-classifier from reviewed labels",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  # Train from governance/reviewed_labels.jsonl
+  python tools/train_preclassifier.py
+
+  # Also use confident unreviewed LLM results, evaluate on 20% of tickets
+  python tools/train_preclassifier.py governance/reviewed_labels.jsonl fallback_log.jsonl \\
+      --min-confidence 0.8 --holdout 0.2
+        """,
+    )
+    parser.add_argument("sources", nargs="*", type=Path, help="Labeled JSONL logs (default: governance/reviewed_labels.jsonl)")
+    parser.add_argument("-o", "--output", type=Path, default=DEFAULT_OUTPUT, help="Model file to write")
+    parser.add_argument("--min-confidence", type=float, default=None,
+                        help="Also use unreviewed LLM labels at or above this confidence "
+                             "(at least bot_config.confidence_threshold)")
+    parser.add_argument("--holdout", type=float, default=0.1, help="Fraction of tickets kept for evaluation")
+    parser.add_argument("--bits", type=int, default=18, help="Hash space size as a power of two")
+    parser.add_argument("--ngram", type=int, default=2, help="Longest word n-gram used as a feature")
+    parser.add_argument("--epochs", type=int, default=10, help="Passes over the training set")
+    parser.add_argument("--learning-rate", type=float, default=0.5, help="AdaGrad learning rate")
+    parser.add_argument("--no-numpy", action="store_true", help="Use the pure-Python trainer")
+    parser.add_argument("--dry-run", action="store_true", help="Evaluate without writing the model")
+    args = parser.parse_args()
+
+    config = yaml.safe_load(CONFIG_PATH.read_text())
+    classes = config["ticket_types"]
+    threshold = (config.get("bot_config") or {}).get("confidence_threshold", DEFAULT_CONFIDENCE_THRESHOLD)
+    sources = args.sources or [path for path in DEFAULT_SOURCES if path.exists()]
+    started = time.perf_counter()
+    try:
+        train, test, counts = load_datasets(sources, classes, args.min_confidence, args.holdout,
+                                            args.bits, args.ngram, confidence_threshold=threshold)
+    except ValueError as e:
+        parser.error(str(e))
+    print(f"Loaded {counts['examples']} labeled tickets ({len(train.labels)} train, {len(test.labels)} holdout) "
+          f"from {len(sources)} source(s); skipped {counts['unlabeled']} unlabeled, "
+          f"{counts['unknown_label']} with unknown categories, {counts['malformed']} malformed lines")
+    if not train.labels:
+        print("❌ Error: no labeled tickets to train on", file=sys.stderr)
+        sys.exit(1)
+
+    try:
+        model = fit(train, classes, bits=args.bits, ngram=args.ngram, epochs=args.epochs,
+                    learning_rate=args.learning_rate, use_numpy=False if args.no_numpy else None)
+    except ImportError as e:
+        print(f"❌ Error: {e}", file=sys.stderr)
+        sys.exit(1)
+    print(f"Trained with {model.metadata['backend']} in {time.perf_counter() - started:.1f}s")
+
+    evaluation = evaluate(model, test) if test.labels else None
+    if evaluation:
+        print_evaluation(evaluation)
+    model.metadata.update({
+        "trained_at": datetime.now(timezone.utc).isoformat(),
+        "train_examples": len(train.labels),
+        "evaluation": evaluation,
+    })
+    if not args.dry_run:
+        model.save(args.output)
+        print(f"\n✅ Wrote {args.output} ({args.output.stat().st_size / 1e6:.1f} MB); "
+              f"set preclassifier.model_path in scope.yaml to use it")
+
+
+if __name__ == "__main__":
+    main()